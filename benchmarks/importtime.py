@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Startup import time of bin/energy-tools measured by `python3 -X importtime`
+
+Usage: python3 benchmarks/importtime.py [-n RUNS]
+
+It prints the median cumulative import time of every energy_tools module and
+of the whole startup, and fails if a module which must only be loaded on
+demand, e.g. by `-e`, is imported on startup."""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only by the options or the product types which need them
+ON_DEMAND = ('unittest', 'xlsxwriter', 'numpy',
+             'energy_tools.excel_output', 'energy_tools.fleet',
+             'energy_tools.energystar70', 'energy_tools.energystar80',
+             'energy_tools.erplot3', 'energy_tools.erplot26')
+
+
+def importtime():
+    """({module: cumulative microseconds}, total microseconds) of one startup"""
+    # Not run as __main__, so it stops right after the imports.
+    code = ("import runpy; runpy.run_path(%r, run_name='importtime')"
+            % os.path.join(ROOT, 'bin', 'energy-tools'))
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            stdin=subprocess.DEVNULL, env=env, cwd=ROOT,
+                            encoding='utf8', check=True).stderr
+    times = {}
+    total = 0
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        (self_us, cumulative, name) = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+        if not name[1:].startswith(' '):
+            total = total + int(cumulative)
+    return (times, total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=10,
+                        help="number of startups to measure")
+    args = parser.parse_args()
+
+    runs = [importtime() for i in range(args.runs)]
+    modules = sorted(set(name for (times, total) in runs for name in times
+                         if name.startswith('energy_tools')))
+    for name in modules:
+        print("%-32s %8.2f ms" % (name, statistics.median(
+            times.get(name, 0) for (times, total) in runs) / 1000))
+    print("%-32s %8.2f ms" % ('all imports', statistics.median(
+        total for (times, total) in runs) / 1000))
+
+    loaded = [name for name in ON_DEMAND if name in runs[0][0]]
+    if loaded:
+        print("Loaded on startup: %s" % ', '.join(loaded))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
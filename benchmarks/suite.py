@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Throughput of the calculators, the profile loading and the exports
+
+Usage: python3 benchmarks/suite.py [-n RUNS] [-f FLEET] [-k PATTERN]
+                                   [--save FILE] [--compare FILE]
+
+Every benchmark is run RUNS times on a synthetic fleet of FLEET generated
+profiles and the median time per profile, or per file written, is printed.
+--save stores the medians as JSON with the machine they were measured on and
+--compare prints the change against such a file and fails if a benchmark is
+slower by more than --threshold percent.  benchmarks/baseline.json is the
+reference, so a change of performance shows up in review next to it."""
+
+import argparse
+import contextlib
+import copy
+import fnmatch
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from energy_tools import batch, core
+from energy_tools.snapshot import SystemSnapshot
+from energy_tools.sysinfo import SysInfo
+from energy_tools.version import __version__
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+
+def generate(count, seed=0):
+    """count profiles of every product type which need no probing
+
+    Most of them are Desktops, Integrated Desktops and Notebooks with random
+    hardware and powers, like the fleets given to energy-tools-batch."""
+    rng = random.Random(seed)
+    templates = dict((profile['Product Type'], profile)
+                     for (comment, profile) in
+                     (core.TEST_CASES[number] for number in (6, 3, 4, 5)))
+    profiles = []
+    for i in range(count):
+        product_type = rng.choice((1, 1, 1, 1, 1, 1, 1, 2, 3, 4))
+        profile = copy.deepcopy(templates[product_type])
+        profile['Product name'] = 'Synthetic %d' % i
+        profile['BIOS version'] = '1.0.%d' % (i % 7)
+        profile['Wake-on-LAN'] = rng.random() < 0.5
+        profile['Gigabit Ethernet'] = rng.randint(0, 2)
+        profile['1~10 Gigabit Ethernet'] = rng.randint(0, 1)
+        profile['10 Gigabit Ethernet'] = rng.randint(0, 1)
+        for key in ('Off Mode', 'Sleep Mode', 'Long Idle Mode',
+                    'Short Idle Mode', 'Off Mode with WOL',
+                    'Sleep Mode with WOL'):
+            if key in profile:
+                profile[key] = round(profile[key] * rng.uniform(0.5, 1.5), 2)
+        if product_type == 1:
+            profile['Computer Type'] = rng.randint(1, 3)
+            graphics = rng.choice(('integrated', 'switchable', 'discrete', 'multiple'))
+            profile['Switchable Graphics'] = graphics == 'switchable'
+            profile['Discrete Graphics'] = graphics in ('discrete', 'multiple')
+            profile['Discrete Graphics Cards'] = {'discrete': 1, 'multiple': 2}.get(graphics, 0)
+            profile['Frame Buffer Bandwidth'] = rng.choice((16, 64, 96, 128, 192, 320))
+            profile['CPU Cores'] = rng.choice((2, 4, 6, 8, 16))
+            profile['CPU Clock'] = round(rng.uniform(1.2, 4.5), 1)
+            profile['Memory Size'] = rng.choice((4, 8, 16, 32, 64))
+            profile['Disk Number'] = rng.randint(1, 3)
+            profile['SSD'] = profile['Disk Number']
+            profile['Screen Area'] = round(rng.uniform(80, 400), 1)
+            profile['Enhanced Display'] = rng.random() < 0.2
+            profile['TV Tuner'] = rng.random() < 0.1
+            profile['Discrete Audio'] = rng.random() < 0.1
+        profiles.append(profile)
+    return profiles
+
+
+def _evaluate_each(function, snapshots):
+    def run():
+        for snapshot in snapshots:
+            function(snapshot)
+    return (run, len(snapshots))
+
+
+def benchmarks(profiles, root):
+    """{name: setup} where setup() returns (run, operations)"""
+    snapshots = [SystemSnapshot.from_profile(copy.deepcopy(profile))
+                 for profile in profiles]
+    by_type = dict((product_type, [snapshot for snapshot in snapshots
+                                   if snapshot.product_type == product_type])
+                   for product_type in (1, 2, 3, 4))
+    computers = by_type[1]
+    suite = {}
+    for (name, function) in (('estar52', core.estar5_results),
+                             ('estar60', core.estar6_results),
+                             ('estar70', core.estar7_results),
+                             ('estar80', core.estar8_results),
+                             ('erplot3', core.erplot3_results),
+                             ('erplot26', core.erplot26_results)):
+        suite['evaluate.%s' % name] = (lambda function=function:
+                                       _evaluate_each(function, computers))
+    for (name, product_type, function) in (
+            ('workstation', 2, core.workstation_results),
+            ('small_scale_server', 3, core.small_scale_server_results),
+            ('thin_client', 4, core.thin_client_results)):
+        suite['evaluate.%s' % name] = (lambda function=function, product_type=product_type:
+                                       _evaluate_each(function, by_type[product_type]))
+
+    def load():
+        def run():
+            for profile in profiles:
+                SystemSnapshot.from_profile(dict(profile))
+        return (run, len(profiles))
+    suite['sysinfo.from_profile'] = load
+
+    def scalar():
+        def run():
+            for profile in profiles:
+                core.evaluate(SystemSnapshot.from_profile(dict(profile)))
+        return (run, len(profiles))
+    suite['batch.scalar'] = scalar
+
+    def incremental():
+        from energy_tools.incremental import IncrementalEvaluator
+        evaluators = [IncrementalEvaluator(snapshot) for snapshot in snapshots]
+        def run():
+            for evaluator in evaluators:
+                evaluator.update(short_idle=evaluator.snapshot.short_idle)
+        return (run, len(evaluators))
+    suite['incremental.update'] = incremental
+
+    def columnar():
+        from energy_tools.fleet import Fleet
+        type1 = [profile for profile in profiles if profile['Product Type'] == 1]
+        def run():
+            fleet = Fleet(type1)
+            fleet.estar70()
+            fleet.estar80()
+            fleet.erplot3_2016()
+        return (run, len(type1))
+    suite['batch.fleet'] = columnar
+
+    def files():
+        directory = os.path.join(root, 'profiles')
+        if not os.path.isdir(directory):
+            os.mkdir(directory)
+            for (i, profile) in enumerate(profiles):
+                with open(os.path.join(directory, '%05d.profile' % i), 'w') as data:
+                    json.dump(profile, data)
+        args = argparse.Namespace(paths=[directory], jobs=1, no_cache=True,
+                                  output=os.path.join(root, 'batch.csv'))
+        return (lambda: batch.process(args), len(profiles))
+    suite['batch.files'] = files
+
+    def workbook():
+        from energy_tools.excel_output import BatchWorkbook
+        results = [core.evaluate(snapshot) for snapshot in snapshots]
+        def run():
+            book = BatchWorkbook(__version__, os.path.join(root, 'batch.xlsx'),
+                                 batch.FIELDS)
+            for (i, outcome) in enumerate(results):
+                book.add('%05d.profile' % i, 'Synthetic', '1.0', outcome)
+            book.close()
+        return (run, len(results))
+    suite['excel.batch'] = workbook
+
+    for (name, number) in (('computer', 6), ('workstation', 3),
+                           ('small_scale_server', 4), ('thin_client', 5)):
+        def excel(number=number):
+            from energy_tools.excel_output import generate_excel
+            profile = dict(profiles[0], **core.TEST_CASES[number][1])
+            def run():
+                sysinfo = SysInfo(copy.deepcopy(profile), interactive=False)
+                generate_excel(sysinfo, __version__, os.path.join(root, 'profile.xlsx'))
+            return (run, 1)
+        suite['excel.%s' % name] = excel
+
+    def report():
+        profile = dict(profiles[0], **core.TEST_CASES[6][1])
+        filename = os.path.join(root, 'profile.report')
+        def run():
+            sysinfo = SysInfo(copy.deepcopy(profile), interactive=False)
+            snapshot = SystemSnapshot.from_sysinfo(sysinfo)
+            with contextlib.redirect_stdout(io.StringIO()):
+                output = core.energystar_calculate(snapshot)
+                core.erplot3_calculate(snapshot)
+                core.erplot26_calculate(snapshot)
+            sysinfo.report(filename)
+            with open(filename, 'a') as target:
+                target.write(output + '\n')
+        return (run, 1)
+    suite['report'] = report
+    return suite
+
+
+def measure(setup, runs):
+    """Median seconds per operation of runs runs
+
+    The garbage collector is disabled while timing like timeit does,
+    otherwise the generated fleet kept alive slows down every benchmark."""
+    (run, operations) = setup()
+    run()
+    times = []
+    for i in range(runs):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return (statistics.median(times) / max(operations, 1), operations)
+
+
+def compare(current, baseline, threshold):
+    """Print the changes and return the names of the regressions"""
+    slower = []
+    for (name, entry) in current.items():
+        if name not in baseline:
+            print("%-28s %12s %12.2f us" % (name, 'new', entry['median'] * 1e6))
+            continue
+        before = baseline[name]['median']
+        change = (entry['median'] - before) * 100 / before
+        print("%-28s %9.2f us %9.2f us %+7.1f%%"
+              % (name, before * 1e6, entry['median'] * 1e6, change))
+        if change > threshold:
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=3,
+                        help="number of timed runs of every benchmark")
+    parser.add_argument("-f", "--fleet", type=int, default=10000,
+                        help="number of generated profiles")
+    parser.add_argument("-k", "--select", action="append",
+                        help="only run the benchmarks matching this glob, repeatable")
+    parser.add_argument("--save", type=str,
+                        help="store the results as JSON in this file")
+    parser.add_argument("--compare", type=str, nargs='?', const=BASELINE,
+                        help="compare with the results of this file (default: %s)"
+                        % os.path.relpath(BASELINE, ROOT))
+    parser.add_argument("--threshold", type=float, default=30.0,
+                        help="percent slower than the compared results which fails")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    root = tempfile.mkdtemp()
+    try:
+        suite = benchmarks(generate(args.fleet), root)
+        results = {}
+        for (name, setup) in suite.items():
+            if args.select and not any(fnmatch.fnmatch(name, pattern)
+                                       for pattern in args.select):
+                continue
+            (median, operations) = measure(setup, args.runs)
+            results[name] = {'median': median, 'operations': operations}
+            print("%-28s %12.2f us %10.1f/s" % (name, median * 1e6, 1 / median))
+    finally:
+        shutil.rmtree(root)
+
+    if args.save:
+        with open(args.save, 'w') as data:
+            json.dump({'version': __version__,
+                       'python': platform.python_version(),
+                       'machine': '%s %s, %d CPUs' % (platform.machine(), platform.processor()
+                                                      or platform.system(), os.cpu_count() or 1),
+                       'fleet': args.fleet,
+                       'runs': args.runs,
+                       'benchmarks': results}, data, indent=4, sort_keys=True)
+            data.write('\n')
+    if args.compare:
+        with open(args.compare, 'r') as data:
+            baseline = json.load(data)
+        print("\nCompared with %s (%s, Python %s):"
+              % (args.compare, baseline['machine'], baseline['python']))
+        slower = compare(results, baseline['benchmarks'], args.threshold)
+        if slower:
+            print("Slower by more than %s%%: %s" % (args.threshold, ', '.join(slower)))
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Evaluate many saved profiles in one run"""
+
+import csv
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from logging import debug, info, warning, error
+from .cache import MAX_ENTRIES, ResultCache, profile_key
+from .common import Result
+from .core import evaluate
+from .schema import problems
+from .snapshot import SystemSnapshot
+from . import timing
+from .version import __version__
+
+__all__ = [
+        "find_profiles",
+        "evaluate_profile",
+        "process"]
+
+FIELDS = ('profile', 'product', 'bios') + Result._fields + ('verdict', 'margin')
+
+
+def _identify(filename, profile):
+    stem = os.path.basename(filename)
+    if stem.endswith('.profile'):
+        stem = stem[:-len('.profile')]
+    product = profile.get('Product name')
+    bios = profile.get('BIOS version')
+    if product is None or bios is None:
+        (name, sep, version) = stem.rpartition('_')
+        if not sep:
+            (name, version) = (stem, '')
+        if product is None:
+            product = name
+        if bios is None:
+            bios = version
+    return (product, bios)
+
+
+def evaluate_profile(filename):
+    """Evaluate one profile file and return (filename, product, bios, results, error)
+
+    Nothing is probed, so the profile must give every value."""
+    try:
+        with open(filename, 'r') as data:
+            profile = json.load(data)
+    except (OSError, ValueError) as err:
+        return (filename, '', '', [], str(err))
+    (product, bios) = _identify(filename, profile)
+    try:
+        results = evaluate(SystemSnapshot.from_profile(profile))
+    except Exception as err:
+        return (filename, product, bios, [], '%s: %s' % (type(err).__name__, err))
+    return (filename, product, bios, results, None)
+
+
+def _evaluate_timed(filename):
+    """(outcome of evaluate_profile, timings of the worker)"""
+    timing.TIMINGS.reset()
+    return (evaluate_profile(filename), timing.TIMINGS.as_dict())
+
+
+def _cached(cache, filename):
+    """(key, outcome) of the profile, the outcome is None if not cached"""
+    try:
+        with open(filename, 'r') as data:
+            profile = json.load(data)
+    except (OSError, ValueError):
+        return (None, None)
+    if problems(profile, strict=True):
+        # Its results may have been cached with probed values by an older
+        # release, now it fails.
+        return (None, None)
+    key = profile_key(profile)
+    results = cache.get(key)
+    if results is None:
+        return (key, None)
+    (product, bios) = _identify(filename, profile)
+    return (key, (filename, product, bios, results, None))
+
+
+def _open_cache(args):
+    if getattr(args, 'no_cache', False):
+        return None
+    try:
+        return ResultCache(getattr(args, 'cache', None),
+                           getattr(args, 'cache_size', None) or MAX_ENTRIES)
+    except (OSError, sqlite3.Error) as err:
+        warning('The result cache is disabled: %s' % err)
+        return None
+
+
+def find_profiles(paths):
+    """Expand directories and glob patterns into a sorted list of profiles"""
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            found.update(glob.glob(os.path.join(path, '*.profile')))
+        else:
+            found.update(p for p in glob.glob(path) if os.path.isfile(p))
+    return sorted(found)
+
+
+def process(args):
+    profiles = find_profiles(args.paths)
+    if not profiles:
+        error('No profile is found in %s.' % ', '.join(args.paths))
+        return 1
+
+    workbook = None
+    output = None
+    if args.output and args.output.endswith('.xlsx'):
+        try:
+            from .excel_output import BatchWorkbook
+            workbook = BatchWorkbook(__version__, args.output, FIELDS)
+        except ImportError:
+            error("You need to install Python xlsxwriter module or you can not output Excel format file.")
+            return 1
+    elif args.output and args.output != '-':
+        output = open(args.output, 'w', newline='')
+    else:
+        output = sys.stdout
+
+    if output:
+        writer = csv.writer(output)
+        writer.writerow(FIELDS)
+
+    failed = 0
+    start = time.monotonic()
+    store = None
+    if getattr(args, 'store', None):
+        from .store import ResultStore
+        try:
+            store = ResultStore(args.store, getattr(args, 'store_format', None))
+        except (OSError, ValueError) as err:
+            error(str(err))
+            return 1
+    cache = _open_cache(args)
+    if cache is not None:
+        entries = [(filename,) + _cached(cache, filename) for filename in profiles]
+    else:
+        entries = [(filename, None, None) for filename in profiles]
+    pending = [filename for (filename, key, outcome) in entries if outcome is None]
+    chunksize = max(1, len(pending) // ((args.jobs or os.cpu_count() or 1) * 4))
+    timed = timing.enabled()
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs,
+                                 initializer=timing.enable if timed else None) as executor:
+            evaluated = executor.map(_evaluate_timed if timed else evaluate_profile,
+                                     pending, chunksize=chunksize)
+            for (filename, key, outcome) in entries:
+                if outcome is None:
+                    outcome = next(evaluated)
+                    if timed:
+                        timing.TIMINGS.merge(outcome[1])
+                        outcome = outcome[0]
+                    if cache is not None and key and not outcome[4]:
+                        cache.put(key, outcome[3])
+                (filename, product, bios, results, err) = outcome
+                if err:
+                    warning('%s: %s' % (filename, err))
+                    failed = failed + 1
+                    if workbook:
+                        workbook.add(filename, product, bios, [], err)
+                    continue
+                debug('%s: %d results' % (filename, len(results)))
+                if store is not None:
+                    with open(filename, 'r') as data:
+                        store.add(filename, product, bios, json.load(data), results)
+                if workbook:
+                    workbook.add(filename, product, bios, results)
+                    continue
+                with timing.section('output.csv'):
+                    for result in results:
+                        writer.writerow((filename, product, bios) + tuple(result)
+                                        + (result.verdict, result.margin))
+    finally:
+        if store is not None:
+            store.close()
+        if cache is not None:
+            cache.close()
+        if workbook:
+            workbook.close()
+        elif output is not sys.stdout:
+            output.close()
+    elapsed = time.monotonic() - start
+
+    info('Evaluated %d profiles in %.2f seconds (%.1f profiles/s), %d cached, %d failed.'
+         % (len(profiles), elapsed, len(profiles) / max(elapsed, 1e-9),
+            len(profiles) - len(pending), failed))
+    if args.output and args.output != '-':
+        info('The result table is saved to "%s".' % args.output)
+    if store is not None:
+        info('%d rows are added to the %s store "%s".' % (store.rows, store.format, args.store))
+    return 1 if failed else 0
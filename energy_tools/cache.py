@@ -0,0 +1,122 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""On-disk cache of the results of profiles
+
+The results are keyed by the SHA-256 of the canonical JSON of the profile
+and the version of Energy Tools, so an edited profile or another release
+never gets stale results.  The least recently used entries are evicted when
+the cache holds more than max_entries profiles."""
+
+import hashlib
+import json
+import os
+import sqlite3
+from logging import debug
+from .common import Result
+from .version import __version__
+
+__all__ = [
+        "MAX_ENTRIES",
+        "default_path",
+        "profile_key",
+        "ResultCache"]
+
+MAX_ENTRIES = 100000
+
+
+def default_path():
+    """$XDG_CACHE_HOME/energy-tools/results.sqlite"""
+    cache = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'energy-tools', 'results.sqlite')
+
+
+def profile_key(profile, version=__version__):
+    """Hash of the profile which doesn't depend on the order of its keys
+
+    1 and 1.0 or 1 and true get different keys because the calculators
+    don't treat them the same way."""
+    canonical = json.dumps(profile, sort_keys=True, separators=(',', ':'),
+                           ensure_ascii=False)
+    return hashlib.sha256(('%s\n%s' % (version, canonical)).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Results of profiles stored in SQLite with LRU eviction"""
+    def __init__(self, path=None, max_entries=MAX_ENTRIES):
+        if path is None:
+            path = default_path()
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS results ("
+                        "key TEXT PRIMARY KEY, "
+                        "used INTEGER NOT NULL, "
+                        "results TEXT NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self.clock = self.db.execute("SELECT MAX(used) FROM results").fetchone()[0] or 0
+        debug("Result cache %s: %d entries" % (path, len(self)))
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _tick(self):
+        self.clock = self.clock + 1
+        return self.clock
+
+    def get(self, key):
+        """The list of Results of the key or None"""
+        row = self.db.execute("SELECT results FROM results WHERE key = ?",
+                              (key,)).fetchone()
+        if row is None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self.db.execute("UPDATE results SET used = ? WHERE key = ?",
+                        (self._tick(), key))
+        return [Result(*fields) for fields in json.loads(row[0])]
+
+    def put(self, key, results):
+        self.db.execute("INSERT OR REPLACE INTO results (key, used, results) "
+                        "VALUES (?, ?, ?)",
+                        (key, self._tick(), json.dumps([list(result) for result in results])))
+
+    def evict(self):
+        """Remove the least recently used entries beyond max_entries"""
+        self.db.execute("DELETE FROM results WHERE key IN ("
+                        "SELECT key FROM results ORDER BY used DESC "
+                        "LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def close(self):
+        if self.db is None:
+            return
+        self.evict()
+        self.db.commit()
+        self.db.close()
+        self.db = None
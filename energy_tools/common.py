@@ -16,6 +16,47 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import namedtuple
+
+
+class Result(namedtuple('Result', ['standard', 'category', 'gpu',
+                                   'allowance_psu', 'allowance_proxy',
+                                   'condition', 'quantity', 'value',
+                                   'maximum'])):
+    """One requirement checked by a calculator
+
+    allowance_psu and allowance_proxy are the fractions added to E_TEC_MAX
+    (e.g. 0.015) or None if the allowance doesn't apply.  maximum is None
+    if the requirement can not be checked."""
+    __slots__ = ()
+
+    @property
+    def verdict(self):
+        if self.maximum is None:
+            return None
+        if self.value <= self.maximum:
+            return 'PASS'
+        return 'FAIL'
+
+    @property
+    def operator(self):
+        if self.maximum is None or self.value <= self.maximum:
+            return '<='
+        return '>'
+
+    @property
+    def margin(self):
+        """Percentage of the maximum left, negative if it fails"""
+        if not self.maximum:
+            return None
+        return (self.maximum - self.value) * 100 / self.maximum
+
+
+def new_result(standard, quantity, value, maximum, category='', gpu='',
+               allowance_psu=None, allowance_proxy=None, condition=''):
+    return Result(standard, category, gpu, allowance_psu, allowance_proxy,
+                  condition, quantity, value, maximum)
+
 
 def result_filter(result, value, maximum):
     if maximum >= value:
@@ -19,307 +19,217 @@
 import copy
 import json
 import os
-import subprocess
 import sys
 from logging import debug, warning, error
-from .excel_output import *
 from .energystar52 import EnergyStar52
 from .energystar60 import EnergyStar60
-from .energystar70 import EnergyStar70
-from .energystar80 import EnergyStar80
+from .schema import ProfileError
 from .sysinfo import SysInfo
-from .erplot3 import ErPLot3
-from .erplot26 import ErPLot26
-from .common import result_filter
+from .snapshot import SystemSnapshot
+from .common import new_result
+from .formatter import (format_estar5, format_estar6, format_estar7,
+                        format_estar8, format_workstation,
+                        format_small_scale_server, format_thin_client)
+from .timing import timed
 from .version import __version__
 
-def calculate_product_type1_estar5(sysinfo):
-    print("Energy Star 5:")
+GPU_CATEGORIES = ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7')
+
+
+def _psu_allowances(sysinfo):
+    """(allowance, multiplier) pairs of the Power Supply Efficiency Allowance"""
+    if sysinfo.computer_type == 2:
+        return ((0, 1), (0.015, 1.015), (0.04, 1.04))
+    return ((0, 1), (0.015, 1.015), (0.03, 1.03))
+
+@timed('calculator.estar52')
+def estar5_results(sysinfo):
     estar52 = EnergyStar52(sysinfo)
     E_TEC = estar52.equation_one()
-
-    over_128 = estar52.equation_two(True, True)
-    between_64_and_128 = estar52.equation_two(False, True)
-    under_64 = estar52.equation_two(False, False)
-    debug(over_128)
-    debug(between_64_and_128)
-    debug(under_64)
-    different=False
-
-    for i,j,k in zip(over_128, between_64_and_128, under_64):
-        (cat1, max1) = i
-        (cat2, max2) = j
-        (cat3, max3) = k
-        if cat1 != cat2 or max1 != max2 or cat2 != cat3 or max2 != max3:
-            different=True
+    if sysinfo.computer_type == 3:
+        widths = (('FB width <= 64-bit', False, False),
+                  ('64-bit < FB width <= 128-bit', False, True),
+                  ('FB width > 128-bit', True, True))
     else:
-        if different is True:
-            if sysinfo.computer_type == 3:
-                print("\n  If GPU Frame Buffer Width <= 64 bits,")
-                for i in under_64:
-                    (category, E_TEC_MAX) = i
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-                print("\n  If 64 bits < GPU Frame Buffer Width <= 128 bits,")
-                for i in between_64_and_128:
-                    (category, E_TEC_MAX) = i
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-            else:
-                print("\n  If GPU Frame Buffer Width <= 128 bits,")
-                for i in between_64_and_128:
-                    (category, E_TEC_MAX) = i
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-            print("\n  If GPU Frame Buffer Width > 128 bits,")
-            for i in over_128:
-                (category, E_TEC_MAX) = i
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                print("    Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-        else:
-            for i in under_64:
-                (category, E_TEC_MAX) = i
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                print("\n  Category %s: %s (E_TEC) %s %s (E_TEC_MAX), %s" % (category, E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-
-def calculate_product_type1_estar6(sysinfo):
-    print("\nEnergy Star 6:\n")
+        widths = (('FB width <= 128-bit', False, True),
+                  ('FB width > 128-bit', True, True))
+    results = []
+    for condition, over_128, over_64 in widths:
+        candidates = estar52.equation_two(over_128, over_64)
+        debug(candidates)
+        for category, E_TEC_MAX in candidates:
+            results.append(new_result('Energy Star 5.2', 'E_TEC', E_TEC,
+                                      E_TEC_MAX, category=category,
+                                      condition=condition))
+    return results
+
+@timed('calculator.estar60')
+def estar6_results(sysinfo):
     estar60 = EnergyStar60(sysinfo)
     E_TEC = estar60.equation_one()
-
-    lower = 1.015
-    if sysinfo.computer_type == 2:
-        higher = 1.04
-    else:
-        higher = 1.03
-
-    for AllowancePSU in (1, lower, higher):
-        if sysinfo.discrete:
-            if AllowancePSU == 1:
-                print("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
-            elif AllowancePSU == lower:
-                print("  If power supplies meet lower efficiency requirements,")
-            elif AllowancePSU == higher:
-                print("  If power supplies meet higher efficiency requirements,")
-            for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
-                E_TEC_MAX = estar60.equation_two(gpu) * AllowancePSU
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                if gpu == 'G1':
-                    gpu = "G1 (FB_BW <= 16)"
-                elif gpu == 'G2':
-                    gpu = "G2 (16 < FB_BW <= 32)"
-                elif gpu == 'G3':
-                    gpu = "G3 (32 < FB_BW <= 64)"
-                elif gpu == 'G4':
-                    gpu = "G4 (64 < FB_BW <= 96)"
-                elif gpu == 'G5':
-                    gpu = "G5 (96 < FB_BW <= 128)"
-                elif gpu == 'G6':
-                    gpu = "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)"
-                elif gpu == 'G7':
-                    gpu = "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"
-                print("    %s (E_TEC) %s %s (E_TEC_MAX) for %s, %s" % (E_TEC, operator, E_TEC_MAX, gpu, result_filter(result, E_TEC, E_TEC_MAX)))
-        else:
-            if AllowancePSU == 1:
-                print("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,")
-            elif AllowancePSU == lower:
-                print("  If power supplies meet lower efficiency requirements,")
-            elif AllowancePSU == higher:
-                print("  If power supplies meet higher efficiency requirements,")
-            E_TEC_MAX = estar60.equation_two('G1') * AllowancePSU
-            if E_TEC <= E_TEC_MAX:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            print("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-
-def tee(mesg, data=None):
-    print(mesg)
-    if data:
-        return data + "\n" + mesg
+    if sysinfo.discrete:
+        gpus = GPU_CATEGORIES
     else:
-        return mesg
-
-def calculate_product_type1_estar7(sysinfo):
-    data = tee("\nEnergy Star 7:\n")
+        gpus = ('',)
+    # E_TEC_MAX without the PSU allowance only depends on the GPU category.
+    maximums = dict((gpu, estar60.equation_two(gpu or 'G1')) for gpu in gpus)
+    results = []
+    for allowance, AllowancePSU in _psu_allowances(sysinfo):
+        for gpu in gpus:
+            E_TEC_MAX = maximums[gpu] * AllowancePSU
+            results.append(new_result('Energy Star 6.0', 'E_TEC', E_TEC,
+                                      E_TEC_MAX, gpu=gpu,
+                                      allowance_psu=allowance))
+    return results
+
+@timed('calculator.estar70')
+def estar7_results(sysinfo):
+    from .energystar70 import EnergyStar70
     estar70 = EnergyStar70(sysinfo)
     E_TEC = estar70.equation_one()
-
-    lower = 1.015
-    if sysinfo.computer_type == 2:
-        higher = 1.04
-    else:
-        higher = 1.03
-
-    if sysinfo.computer_type == 1 or sysinfo.computer_type == 2:
-        for AllowancePSU in (1, lower, higher):
-            if sysinfo.discrete:
-                if AllowancePSU == 1:
-                    data = tee("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-                elif AllowancePSU == lower:
-                    data = tee("  If power supplies meet lower efficiency requirements,", data)
-                elif AllowancePSU == higher:
-                    data = tee("  If power supplies meet higher efficiency requirements,", data)
-                for gpu in ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7'):
-                    E_TEC_MAX = estar70.equation_two(gpu) * AllowancePSU
-                    if E_TEC <= E_TEC_MAX:
-                        result = 'PASS'
-                        operator = '<='
-                    else:
-                        result = 'FAIL'
-                        operator = '>'
-                    if gpu == 'G1':
-                        gpu = "G1 (FB_BW <= 16)"
-                    elif gpu == 'G2':
-                        gpu = "G2 (16 < FB_BW <= 32)"
-                    elif gpu == 'G3':
-                        gpu = "G3 (32 < FB_BW <= 64)"
-                    elif gpu == 'G4':
-                        gpu = "G4 (64 < FB_BW <= 96)"
-                    elif gpu == 'G5':
-                        gpu = "G5 (96 < FB_BW <= 128)"
-                    elif gpu == 'G6':
-                        gpu = "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)"
-                    elif gpu == 'G7':
-                        gpu = "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"
-                    data = tee("    %s (E_TEC) %s %s (E_TEC_MAX) for %s, %s" % (E_TEC, operator, E_TEC_MAX, gpu, result_filter(result, E_TEC, E_TEC_MAX)), data)
-            else:
-                if AllowancePSU == 1:
-                    data = tee("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-                elif AllowancePSU == lower:
-                    data = tee("  If power supplies meet lower efficiency requirements,", data)
-                elif AllowancePSU == higher:
-                    data = tee("  If power supplies meet higher efficiency requirements,", data)
-                E_TEC_MAX = estar70.equation_two('G1') * AllowancePSU
-                if E_TEC <= E_TEC_MAX:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), data)
-    else:
+    if sysinfo.computer_type == 3:
         if sysinfo.discrete:
             E_TEC_MAX = estar70.equation_two('N/A', sysinfo.fb_bw)
-            if E_TEC <= E_TEC_MAX:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), data)
         else:
             E_TEC_MAX = estar70.equation_two('G1')
-            if E_TEC <= E_TEC_MAX:
-                result = 'PASS'
-                operator = '<='
-            else:
-                result = 'FAIL'
-                operator = '>'
-            data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)), data)
-    return data
-
-def calculate_product_type1_estar8(sysinfo):
-    """Calculate Energy Star 8"""
-    data = tee("\nEnergy Star 8:\n")
+        return [new_result('Energy Star 7.0', 'E_TEC', E_TEC, E_TEC_MAX)]
+    if sysinfo.discrete:
+        gpus = GPU_CATEGORIES
+    else:
+        gpus = ('',)
+    maximums = dict((gpu, estar70.equation_two(gpu or 'G1')) for gpu in gpus)
+    results = []
+    for allowance, AllowancePSU in _psu_allowances(sysinfo):
+        for gpu in gpus:
+            E_TEC_MAX = maximums[gpu] * AllowancePSU
+            results.append(new_result('Energy Star 7.0', 'E_TEC', E_TEC,
+                                      E_TEC_MAX, gpu=gpu,
+                                      allowance_psu=allowance))
+    return results
+
+@timed('calculator.estar80')
+def estar8_results(sysinfo):
+    from .energystar80 import EnergyStar80
     estar80 = EnergyStar80(sysinfo)
     e_tec = estar80.equation_one()
     fb_bw = sysinfo.fb_bw
-
-    lower = 0.015
-
+    results = []
+    if sysinfo.computer_type in (1, 2):
+        maximum = estar80.equation_two(fb_bw)
     if sysinfo.computer_type == 1:
-        higher = 0.03
         for allowance_proxy in (0, 0.12):
-            if allowance_proxy == 0:
-                data = tee("  If the desktop computer doesn't implement a full capability - full network proxy solution,", data)
-            elif allowance_proxy == 0.12:
-                data = tee("  If the desktop computer implements a full capability - full network proxy solution,", data)
-            for allowance_psu in (0, lower, higher):
-                if allowance_psu == 0:
-                    data = tee("   If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-                elif allowance_psu == lower:
-                    data = tee("   If power supplies meet lower efficiency requirements,", data)
-                elif allowance_psu == higher:
-                    data = tee("   If power supplies meet higher efficiency requirements,", data)
-                e_tec_max = estar80.equation_two(fb_bw) * (1 + allowance_psu + allowance_proxy)
-                if e_tec <= e_tec_max:
-                    result = 'PASS'
-                    operator = '<='
-                else:
-                    result = 'FAIL'
-                    operator = '>'
-                data = tee("     %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
+            for allowance_psu in (0, 0.015, 0.03):
+                e_tec_max = maximum * (1 + allowance_psu + allowance_proxy)
+                results.append(new_result('Energy Star 8.0', 'E_TEC', e_tec,
+                                          e_tec_max,
+                                          allowance_psu=allowance_psu,
+                                          allowance_proxy=allowance_proxy))
     elif sysinfo.computer_type == 2:
-        higher = 0.04
-        for allowance_psu in (0, lower, higher):
-            if allowance_psu == 0:
-                data = tee("  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,", data)
-            elif allowance_psu == lower:
-                data = tee("  If power supplies meet lower efficiency requirements,", data)
-            elif allowance_psu == higher:
-                data = tee("  If power supplies meet higher efficiency requirements,", data)
-            e_tec_max = estar80.equation_two(fb_bw) * (1 + allowance_psu)
-            if e_tec <= e_tec_max:
-                result = 'PASS'
-                operator = '<='
+        for allowance_psu in (0, 0.015, 0.04):
+            e_tec_max = maximum * (1 + allowance_psu)
+            results.append(new_result('Energy Star 8.0', 'E_TEC', e_tec,
+                                      e_tec_max, allowance_psu=allowance_psu))
+    else:
+        for mobile_workstation in (False, True):
+            e_tec_max = estar80.equation_two(fb_bw, mobile_workstation)
+            if mobile_workstation:
+                condition = 'mobile workstation'
             else:
-                result = 'FAIL'
-                operator = '>'
-            data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
+                condition = ''
+            results.append(new_result('Energy Star 8.0', 'E_TEC', e_tec,
+                                      e_tec_max, condition=condition))
+    return results
+
+@timed('calculator.workstation')
+def workstation_results(sysinfo):
+    estar52 = EnergyStar52(sysinfo)
+    estar60 = EnergyStar60(sysinfo)
+    return [new_result('Energy Star 5.2', 'P_TEC', estar52.equation_three(),
+                       estar52.equation_four()),
+            new_result('Energy Star 6.0', 'P_TEC', estar60.equation_four(),
+                       estar60.equation_five())]
+
+def _wol_condition(wol):
+    if wol:
+        return 'WOL enabled'
+    return 'WOL disabled'
+
+@timed('calculator.small_scale_server')
+def small_scale_server_results(sysinfo):
+    estar52 = EnergyStar52(sysinfo)
+    estar60 = EnergyStar60(sysinfo)
+    results = []
+    for wol in (True, False):
+        (category, P_OFF_MAX, P_IDLE_MAX) = estar52.equation_five(wol)
+        results.append(new_result('Energy Star 5.2', 'P_OFF', sysinfo.off,
+                                  P_OFF_MAX, category=category,
+                                  condition=_wol_condition(wol)))
+        results.append(new_result('Energy Star 5.2', 'P_IDLE',
+                                  sysinfo.short_idle, P_IDLE_MAX,
+                                  category=category,
+                                  condition=_wol_condition(wol)))
+    for wol in (True, False):
+        results.append(new_result('Energy Star 6.0', 'P_OFF', sysinfo.off,
+                                  estar60.equation_six(wol),
+                                  condition=_wol_condition(wol)))
+        results.append(new_result('Energy Star 6.0', 'P_IDLE',
+                                  sysinfo.short_idle,
+                                  estar60.equation_seven(),
+                                  condition=_wol_condition(wol)))
+    return results
+
+@timed('calculator.thin_client')
+def thin_client_results(sysinfo):
+    estar52 = EnergyStar52(sysinfo)
+    estar60 = EnergyStar60(sysinfo)
+    if sysinfo.media_codec:
+        (category, P_IDLE_MAX) = ('B', 15.0)
     else:
-        data = tee("  If the system doesn't meet the full Mobile Workstation definition,", data)
-        e_tec_max = estar80.equation_two(fb_bw, False)
-        if e_tec <= e_tec_max:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
-
-        data = tee("  If the system meets the full Mobile Workstation definition,", data)
-        e_tec_max = estar80.equation_two(fb_bw, True)
-        if e_tec <= e_tec_max:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        data = tee("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (e_tec, operator, e_tec_max, result_filter(result, e_tec, e_tec_max)), data)
-    return data
+        (category, P_IDLE_MAX) = ('A', 12.0)
+    results = []
+    for wol in (True, False):
+        condition = _wol_condition(wol)
+        results.append(new_result('Energy Star 5.2', 'P_OFF', sysinfo.off,
+                                  estar52.equation_six(wol),
+                                  category=category, condition=condition))
+        results.append(new_result('Energy Star 5.2', 'P_SLEEP', sysinfo.sleep,
+                                  estar52.equation_seven(wol),
+                                  category=category, condition=condition))
+        results.append(new_result('Energy Star 5.2', 'P_IDLE',
+                                  sysinfo.short_idle, P_IDLE_MAX,
+                                  category=category, condition=condition))
+    E_TEC = estar60.equation_one()
+    for discrete in (True, False):
+        for wol in (True, False):
+            if discrete:
+                condition = 'dGfx, ' + _wol_condition(wol)
+            else:
+                condition = _wol_condition(wol)
+            results.append(new_result('Energy Star 6.0', 'E_TEC', E_TEC,
+                                      estar60.equation_eight(discrete, wol),
+                                      condition=condition))
+    return results
+
+def calculate_product_type1_estar5(sysinfo):
+    mesg = format_estar5(estar5_results(sysinfo))
+    print(mesg)
+    return mesg
+
+def calculate_product_type1_estar6(sysinfo):
+    mesg = format_estar6(estar6_results(sysinfo))
+    print(mesg)
+    return mesg
+
+def calculate_product_type1_estar7(sysinfo):
+    mesg = format_estar7(estar7_results(sysinfo))
+    print(mesg)
+    return mesg
+
+def calculate_product_type1_estar8(sysinfo):
+    """Calculate Energy Star 8"""
+    mesg = format_estar8(estar8_results(sysinfo))
+    print(mesg)
+    return mesg
 
 def energystar_calculate(sysinfo):
     if sysinfo.product_type == 1:
@@ -328,164 +238,162 @@ def energystar_calculate(sysinfo):
         estar7_result = calculate_product_type1_estar7(sysinfo)
         return estar7_result + "\n" + calculate_product_type1_estar8(sysinfo)
     elif sysinfo.product_type == 2:
-        # Energy Star 5.2
-        print("Energy Star 5.2:")
-        estar52 = EnergyStar52(sysinfo)
-        P_TEC = estar52.equation_three()
-        P_TEC_MAX = estar52.equation_four()
-        if P_TEC <= P_TEC_MAX:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        print("  %s (P_TEC) %s %s (P_TEC_MAX), %s" % (P_TEC, operator, P_TEC_MAX, result_filter(result, P_TEC, P_TEC_MAX)))
-
-        # Energy Star 6.0
-        print("Energy Star 6.0:")
-        estar60 = EnergyStar60(sysinfo)
-        P_TEC = estar60.equation_four()
-        P_TEC_MAX = estar60.equation_five()
-        if P_TEC <= P_TEC_MAX:
-            result = 'PASS'
-            operator = '<='
-        else:
-            result = 'FAIL'
-            operator = '>'
-        print("  %s (P_TEC) %s %s (P_TEC_MAX), %s" % (P_TEC, operator, P_TEC_MAX, result_filter(result, P_TEC, P_TEC_MAX)))
+        mesg = format_workstation(workstation_results(sysinfo))
     elif sysinfo.product_type == 3:
-        # Energy Star 5.2
-        print("Energy Star 5.2:")
-        estar52 = EnergyStar52(sysinfo)
-        for wol in (True, False):
-            (category, P_OFF_MAX, P_IDLE_MAX) = estar52.equation_five(wol)
-            P_OFF = sysinfo.off
-            P_IDLE = sysinfo.short_idle
-
-            if P_OFF <= P_OFF_MAX and P_IDLE <= P_IDLE_MAX:
-                result = 'PASS'
-            else:
-                result = 'FAIL'
-
-            if P_OFF <= P_OFF_MAX:
-                op1 = '<='
-            else:
-                op1 = '>'
-
-            if P_IDLE <= P_IDLE_MAX:
-                op2 = '<='
-            else:
-                op2 = '>'
-            if wol:
-                print("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
-            else:
-                print("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
-            print("    Category %s: %s (P_OFF) %s %s (P_OFF_MAX), %s (P_IDLE) %s %s (P_IDLE_MAX), %s" % (category, P_OFF, op1, P_OFF_MAX, P_IDLE, op2, P_IDLE_MAX, result))
-
-        # Energy Star 6.0
-        print("Energy Star 6.0:")
-        estar60 = EnergyStar60(sysinfo)
-        for wol in (True, False):
-            P_OFF = sysinfo.off
-            P_OFF_MAX = estar60.equation_six(wol)
-            P_IDLE = sysinfo.short_idle
-            P_IDLE_MAX = estar60.equation_seven()
-
-            if P_OFF <= P_OFF_MAX and P_IDLE <= P_IDLE_MAX:
-                result = 'PASS'
-            else:
-                result = 'FAIL'
-
-            if P_OFF <= P_OFF_MAX:
-                op1 = '<='
-            else:
-                op1 = '>'
-
-            if P_IDLE <= P_IDLE_MAX:
-                op2 = '<='
-            else:
-                op2 = '>'
-            if wol:
-                print("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
-            else:
-                print("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
-            print("    %s (P_OFF) %s %s (P_OFF_MAX), %s (P_IDLE) %s %s (P_IDLE_MAX), %s" % (P_OFF, op1, P_OFF_MAX, P_IDLE, op2, P_IDLE_MAX, result))
-
+        mesg = format_small_scale_server(small_scale_server_results(sysinfo))
     elif sysinfo.product_type == 4:
-        # Energy Star 5.2
-        print("Energy Star 5.2:")
-        estar52 = EnergyStar52(sysinfo)
-        for wol in (True, False):
-            if wol:
-                print("  If Wake-On-LAN (WOL) is enabled by default upon shipment.")
-            else:
-                print("  If Wake-On-LAN (WOL) is disabled by default upon shipment.")
-
-            P_OFF = sysinfo.off
-            P_OFF_MAX = estar52.equation_six(wol)
-
-            P_SLEEP = sysinfo.sleep
-            P_SLEEP_MAX = estar52.equation_seven(wol)
-
-            P_IDLE = sysinfo.short_idle
-            if sysinfo.media_codec:
-                P_IDLE_MAX = 15.0
-                category = 'B'
-            else:
-                P_IDLE_MAX = 12.0
-                category = 'A'
-
-            print("    Category %s:" % (category))
-
-            if P_OFF <= P_OFF_MAX:
-                op1 = '<='
-            else:
-                op1 = '>'
-            print("      %s (P_OFF) %s %s (P_OFF_MAX)" % (P_OFF, op1, P_OFF_MAX))
-
-            if P_SLEEP <= P_SLEEP_MAX:
-                op2 = '<='
-            else:
-                op2 = '>'
-            print("      %s (P_SLEEP) %s %s (P_SLEEP_MAX)" % (P_SLEEP, op2, P_SLEEP_MAX))
+        mesg = format_thin_client(thin_client_results(sysinfo))
+    else:
+        raise Exception('This is a bug when you see this.')
+    print(mesg)
+    return mesg
 
-            if P_IDLE <= P_IDLE_MAX:
-                op3 = '<='
-            else:
-                op3 = '>'
-            print("      %s (P_IDLE) %s %s (P_IDLE_MAX)" % (P_IDLE, op3, P_IDLE_MAX))
+def evaluate(sysinfo):
+    """Return the results of all applicable standards for one system"""
+    if sysinfo.product_type == 1:
+        return estar5_results(sysinfo) \
+            + estar6_results(sysinfo) \
+            + estar7_results(sysinfo) \
+            + estar8_results(sysinfo) \
+            + erplot3_results(sysinfo) \
+            + erplot26_results(sysinfo)
+    elif sysinfo.product_type == 2:
+        return workstation_results(sysinfo)
+    elif sysinfo.product_type == 3:
+        return small_scale_server_results(sysinfo)
+    elif sysinfo.product_type == 4:
+        return thin_client_results(sysinfo)
+    raise Exception('This is a bug when you see this.')
 
+TEST_CASES = {
+    1: ("""# Test case from Notebooks of Energy Star 5.2 & 6.0
+# E_TEC: 33.03 kWh/year, E_TEC_MAX: 41.6 kWh/year, PASS for 5.2
+# E_TEC: 40.7 kWh/year, E_TEC_MAX: 39.0 kWh/year, FAIL for 6.0""",
+        {'Product Type': 1,
+         'Computer Type': 3,
+         'CPU Clock': 2.0,
+         'CPU Cores': 2,
+         'Discrete Audio': False,
+         'Discrete Graphics': False,
+         'Discrete Graphics Cards': 0,
+         'Switchable Graphics': False,
+         'Disk Number': 1,
+         "SSD": 1,
+         'Display Diagonal': 14,
+         'Display Height': 768,
+         'Display Width': 1366,
+         'Screen Area': 83.4,
+         'Enhanced Display': False,
+         'Gigabit Ethernet': 1,
+         '10 Gigabit Ethernet': 0,
+         'Memory Size': 8,
+         'TV Tuner': False,
+         'Wake-on-LAN': False,
+         'Off Mode': 1.0,
+         'Off Mode with WOL': 1.0,
+         'Sleep Mode': 1.7,
+         'Sleep Mode with WOL': 1.7,
+         'Long Idle Mode': 8.0,
+         'Short Idle Mode': 10.0}),
+    2: ("""# Test case from Notebooks of Energy Star 7.0
+# E_TEC: 35.7 kWh/year, E_TEC_MAX: 19.7 kWh/year, FAIL for 7.0""",
+        {'Product Type': 1,
+         'Computer Type': 3,
+         'CPU Clock': 2.0,
+         'CPU Cores': 2,
+         'Discrete Audio': False,
+         'Discrete Graphics': False,
+         'Discrete Graphics Cards': 0,
+         'Switchable Graphics': True,
+         'Disk Number': 1,
+         "SSD": 1,
+         'Display Diagonal': 14,
+         'Display Height': 768,
+         'Display Width': 1366,
+         'Screen Area': 83.4,
+         'Enhanced Display': False,
+         'Gigabit Ethernet': 1,
+         '10 Gigabit Ethernet': 0,
+         'Memory Size': 8,
+         'TV Tuner': False,
+         'Wake-on-LAN': False,
+         'Off Mode': 0.5,
+         'Off Mode with WOL': 0.5,
+         'Sleep Mode': 1.0,
+         'Sleep Mode with WOL': 1.0,
+         'Long Idle Mode': 6.0,
+         'Short Idle Mode': 10.0}),
+    3: ("""# Test case from Workstations of Energy Star 5.2
+# P_TEC: 45.1 W, P_MAX: 53.2 W, PASS for 5.2""",
+        {'Product Type': 2,
+         'Disk Number': 2,
+         "SSD": 2,
+         'Gigabit Ethernet': 0,
+         '10 Gigabit Ethernet': 0,
+         'Off Mode': 2.0,
+         'Sleep Mode': 4.0,
+         'Long Idle Mode': 50.0,
+         'Short Idle Mode': 80.0,
+         'Maximum Power': 180.0}),
+    4: ("# Test case from Small-scale Servers of Energy Star 5.2",
+        {'Product Type': 3,
+         'Memory Size': 4,
+         'CPU Clock': 2.0, # TODO: remove this
+         'CPU Cores': 1,
+         'More Discrete Graphics': False,
+         'Gigabit Ethernet': 1,
+         '10 Gigabit Ethernet': 0,
+         'Disk Number': 1,
+         'Off Mode': 2.7,
+         'Short Idle Mode': 65.0}),
+    5: ("# Test case from Thin Clients of Energy Star 5.2",
+        {'Product Type': 4,
+         'Integrated Display': True,
+         'Display Width': 1366,
+         'Display Height': 768,
+         'Display Diagonal': 14,
+         'Screen Area': 83.4,
+         'Enhanced Display': True,
+         'Discrete Graphics': False,
+         'Off Mode': 2.7,
+         'Sleep Mode': 2.7,
+         'Long Idle Mode': 15.0,
+         'Short Idle Mode': 15.0,
+         'Gigabit Ethernet': 1,
+         '10 Gigabit Ethernet': 0,
+         'Media Codec': True}),
+    6: ("""# Test case for Notebooks with discrete graphics of Energy Star 7.0
+# E_TEC: 35.697, E_TEC_MAX: 36.2018334752, PASS for 7.0
+#   P.S. This is a random data for test, the result could be wrong.)""",
+        {'Product Type': 1,
+         'Computer Type': 3,
+         'CPU Clock': 2.0,
+         'CPU Cores': 2,
+         'Discrete Audio': False,
+         'Discrete Graphics': True,
+         'Discrete Graphics Cards': 1,
+         'Switchable Graphics': False,
+         'Disk Number': 1,
+         "SSD": 1,
+         'Display Diagonal': 14,
+         'Display Height': 768,
+         'Display Width': 1366,
+         'Screen Area': 83.4,
+         'Enhanced Display': False,
+         'Gigabit Ethernet': 1,
+         '10 Gigabit Ethernet': 0,
+         'Memory Size': 8,
+         'TV Tuner': False,
+         'Wake-on-LAN': False,
+         'Off Mode': 0.5,
+         'Off Mode with WOL': 0.5,
+         'Sleep Mode': 1.0,
+         'Sleep Mode with WOL': 1.0,
+         'Long Idle Mode': 6.0,
+         'Frame Buffer Bandwidth': 64.0,
+         'Short Idle Mode': 10.0})
+    }
 
-            if P_OFF <= P_OFF_MAX and P_SLEEP <= P_SLEEP_MAX and P_IDLE <= P_IDLE_MAX:
-                result = 'PASS'
-            else:
-                result = 'FAIL'
-            print("        %s" % (result))
-        # Energy Star 6.0
-        print("Energy Star 6.0:")
-        estar60 = EnergyStar60(sysinfo)
-        E_TEC = estar60.equation_one()
-        for discrete in (True, False):
-            for wol in (True, False):
-                E_TEC_MAX = estar60.equation_eight(discrete, wol)
-                if discrete:
-                    msg1 = "it has Discrete Graphics enabled"
-                else:
-                    msg1 = "it doesn't have Discrete Graphics enabled"
-                if wol:
-                    msg2 = "Wake-On-LAN (WOL) is enabled"
-                else:
-                    msg2 = "Wake-On-LAN (WOL) is disabled"
-                print("  If %s and %s by default upon shipment," % (msg1, msg2))
-                if E_TEC <= E_TEC_MAX:
-                    operator = '<='
-                    result = 'PASS'
-                else:
-                    operator = '>'
-                    result = 'FAIL'
-                print("    %s (E_TEC) %s %s (E_TEC_MAX), %s" % (E_TEC, operator, E_TEC_MAX, result_filter(result, E_TEC, E_TEC_MAX)))
-    else:
-        raise Exception('This is a bug when you see this.')
 
 def chown_for_user(filename):
     if os.geteuid() == 0:
@@ -493,143 +401,26 @@ def chown_for_user(filename):
         sudo_gid = int(os.getenv("SUDO_GID"))
         os.chown(filename, sudo_uid, sudo_gid)
 
+
+def _sysinfo(profile, args):
+    """SysInfo of the profile or None if it is not valid in strict mode"""
+    strict = getattr(args, 'strict', False)
+    try:
+        return SysInfo(profile, strict=strict)
+    except ProfileError as err:
+        for problem in err.problems:
+            error(problem)
+        return None
+
+
 def process(description, args):
     print(description + '\n' + '=' * 80)
-    if args.test == 1:
-        print("""# Test case from Notebooks of Energy Star 5.2 & 6.0
-# E_TEC: 33.03 kWh/year, E_TEC_MAX: 41.6 kWh/year, PASS for 5.2
-# E_TEC: 40.7 kWh/year, E_TEC_MAX: 39.0 kWh/year, FAIL for 6.0""")
-        sysinfo = SysInfo({
-            'Product Type': 1,
-            'Computer Type': 3,
-            'CPU Clock': 2.0,
-            'CPU Cores': 2,
-            'Discrete Audio': False,
-            'Discrete Graphics': False,
-            'Discrete Graphics Cards': 0,
-            'Switchable Graphics': False,
-            'Disk Number': 1,
-            "SSD": 1,
-            'Display Diagonal': 14,
-            'Display Height': 768,
-            'Display Width': 1366,
-            'Screen Area': 83.4,
-            'Enhanced Display': False,
-            'Gigabit Ethernet': 1,
-            '10 Gigabit Ethernet': 0,
-            'Memory Size': 8,
-            'TV Tuner': False,
-            'Off Mode': 1.0,
-            'Off Mode with WOL': 1.0,
-            'Sleep Mode': 1.7,
-            'Sleep Mode with WOL': 1.7,
-            'Long Idle Mode': 8.0,
-            'Short Idle Mode': 10.0})
-    elif args.test == 2:
-        print("""# Test case from Notebooks of Energy Star 7.0
-# E_TEC: 35.7 kWh/year, E_TEC_MAX: 19.7 kWh/year, FAIL for 7.0""")
-        sysinfo = SysInfo({
-            'Product Type': 1,
-            'Computer Type': 3,
-            'CPU Clock': 2.0,
-            'CPU Cores': 2,
-            'Discrete Audio': False,
-            'Discrete Graphics': False,
-            'Discrete Graphics Cards': 0,
-            'Switchable Graphics': True,
-            'Disk Number': 1,
-            "SSD": 1,
-            'Display Diagonal': 14,
-            'Display Height': 768,
-            'Display Width': 1366,
-            'Screen Area': 83.4,
-            'Enhanced Display': False,
-            'Gigabit Ethernet': 1,
-            '10 Gigabit Ethernet': 0,
-            'Memory Size': 8,
-            'TV Tuner': False,
-            'Off Mode': 0.5,
-            'Off Mode with WOL': 0.5,
-            'Sleep Mode': 1.0,
-            'Sleep Mode with WOL': 1.0,
-            'Long Idle Mode': 6.0,
-            'Short Idle Mode': 10.0})
-    elif args.test == 3:
-        print("""# Test case from Workstations of Energy Star 5.2
-# P_TEC: 45.1 W, P_MAX: 53.2 W, PASS for 5.2""")
-        sysinfo = SysInfo({
-            'Product Type': 2,
-            'Disk Number': 2,
-            "SSD": 2,
-            'Gigabit Ethernet': 0,
-            '10 Gigabit Ethernet': 0,
-            'Off Mode': 2.0,
-            'Sleep Mode': 4.0,
-            'Long Idle Mode': 50.0,
-            'Short Idle Mode': 80.0,
-            'Maximum Power': 180.0})
-    elif args.test == 4:
-        print("# Test case from Small-scale Servers of Energy Star 5.2")
-        sysinfo = SysInfo({
-            'Product Type': 3,
-            'Memory Size': 4,
-            'CPU Clock': 2.0, # TODO: remove this
-            'CPU Cores': 1,
-            'More Discrete Graphics': False,
-            'Gigabit Ethernet': 1,
-            '10 Gigabit Ethernet': 0,
-            'Disk Number': 1,
-            'Off Mode': 2.7,
-            'Short Idle Mode': 65.0})
-    elif args.test == 5:
-        print("# Test case from Thin Clients of Energy Star 5.2")
-        sysinfo = SysInfo({
-            'Product Type': 4,
-            'Integrated Display': True,
-            'Display Width': 1366,
-            'Display Height': 768,
-            'Display Diagonal': 14,
-            'Screen Area': 83.4,
-            'Enhanced Display': True,
-            'Discrete Graphics': False,
-            'Off Mode': 2.7,
-            'Sleep Mode': 2.7,
-            'Long Idle Mode': 15.0,
-            'Short Idle Mode': 15.0,
-            'Gigabit Ethernet': 1,
-            '10 Gigabit Ethernet': 0,
-            'Media Codec': True})
-    elif args.test == 6:
-        print("""# Test case for Notebooks with discrete graphics of Energy Star 7.0
-# E_TEC: 35.697, E_TEC_MAX: 36.2018334752, PASS for 7.0
-#   P.S. This is a random data for test, the result could be wrong.)""")
-        sysinfo = SysInfo({
-            'Product Type': 1,
-            'Computer Type': 3,
-            'CPU Clock': 2.0,
-            'CPU Cores': 2,
-            'Discrete Audio': False,
-            'Discrete Graphics': True,
-            'Discrete Graphics Cards': 1,
-            'Switchable Graphics': False,
-            'Disk Number': 1,
-            "SSD": 1,
-            'Display Diagonal': 14,
-            'Display Height': 768,
-            'Display Width': 1366,
-            'Screen Area': 83.4,
-            'Enhanced Display': False,
-            'Gigabit Ethernet': 1,
-            '10 Gigabit Ethernet': 0,
-            'Memory Size': 8,
-            'TV Tuner': False,
-            'Off Mode': 0.5,
-            'Off Mode with WOL': 0.5,
-            'Sleep Mode': 1.0,
-            'Sleep Mode with WOL': 1.0,
-            'Long Idle Mode': 6.0,
-            'Frame Buffer Bandwidth': 64.0,
-            'Short Idle Mode': 10.0})
+    if args.test in TEST_CASES:
+        (comment, profile) = TEST_CASES[args.test]
+        print(comment)
+        sysinfo = _sysinfo(copy.deepcopy(profile), args)
+        if sysinfo is None:
+            return
     elif args.profile:
         if args.profile == '-':
             tmp = ''
@@ -647,23 +438,19 @@ def process(description, args):
             error('Can not read %s.' % args.profile)
             return
         profile = json.loads(tmp)
-        sysinfo = SysInfo(profile)
+        sysinfo = _sysinfo(profile, args)
+        if sysinfo is None:
+            return
     else:
         sysinfo = SysInfo(manual=args.manual)
 
-    output = energystar_calculate(sysinfo)
+    snapshot = SystemSnapshot.from_sysinfo(sysinfo)
+    output = energystar_calculate(snapshot)
 
     if sysinfo.profile['Product Type'] == 1 and sysinfo.profile["Memory Size"] != 4 and hasattr(args, 'simulate') and args.simulate:
+        sysinfo.get_mem_slots()
         sysinfo_simulate_4G_ram = copy.deepcopy(sysinfo)
         sysinfo_simulate_4G_ram.profile["Memory Size"] = 4
-        sysinfo_simulate_4G_ram.mem_total_slots = sysinfo._int_cmd("sudo dmidecode -t 16 | grep 'Devices:' | awk -F': ' '{print $2}'")
-        sysinfo_simulate_4G_ram.mem_used_slots = 0
-        for size in subprocess.check_output("sudo dmidecode -t 17 | grep 'Size:.*MB' | awk '{print $2}'",
-                                            shell=True, encoding='utf8').split('\n'):
-            if size:
-                sysinfo_simulate_4G_ram.mem_used_slots = sysinfo_simulate_4G_ram.mem_used_slots + 1
-        sysinfo.profile["Memory Total Slots"] = sysinfo_simulate_4G_ram.mem_total_slots
-        sysinfo.profile["Memory Used Slots"] = sysinfo_simulate_4G_ram.mem_used_slots
         # I assum the power consumption depends on used slots.
         # refer to https://docs.google.com/spreadsheets/d/1vzzwbyoKw5PS0yjBMevNGUkaP_l4GaRaixpaW6GW_NY/edit#gid=246122990
         # simulate the power consomption based on the reduced slots, so far we only know the difference of 1 and 2 using slot.
@@ -680,10 +467,10 @@ def process(description, args):
         print("\n=======================================================")
         print("simulate 4G ram, total slots 2, used slot 1 for e-star 7:")
         print("=======================================================")
-        calculate_product_type1_estar7(sysinfo_simulate_4G_ram)
+        calculate_product_type1_estar7(SystemSnapshot.from_sysinfo(sysinfo_simulate_4G_ram))
 
-    erplot3_calculate(sysinfo)
-    erplot26_calculate(sysinfo)
+    erplot3_calculate(snapshot)
+    erplot26_calculate(snapshot)
 
     if not args.profile:
         profile = get_system_filename(sysinfo) + '.profile'
@@ -717,6 +504,7 @@ def process(description, args):
             excel = '.'.join(args.profile.split('.')[:-1]) + '.xlsx'
         else:
             excel = get_system_filename(sysinfo) + '.xlsx'
+        from .excel_output import generate_excel
         generate_excel(sysinfo, __version__, excel)
         print('\nThe excel is saved to "' + excel + '".')
         chown_for_user(excel)
@@ -726,22 +514,54 @@ def get_system_filename(sysinfo):
     return sysinfo.get_product_name() + '_' + sysinfo.get_bios_version()
 
 
-def erplot3_calculate(sysinfo):
+def erplot3_applicable(sysinfo):
     if sysinfo.product_type != 1:
-        return
+        return False
     if sysinfo.computer_type == 3:
         if sysinfo.diagonal < 9 or sysinfo.long_idle < 6:
-            return
-    erplot3 = ErPLot3(sysinfo)
-    erplot3.calculate()
+            return False
+    return True
 
 
-def erplot26_calculate(sysinfo):
+def erplot26_applicable(sysinfo):
     if sysinfo.product_type != 1:
-        return
+        return False
     if sysinfo.computer_type != 3:
-        return
+        return False
     if sysinfo.diagonal > 9 and sysinfo.long_idle > 6:
+        return False
+    return True
+
+
+@timed('calculator.erplot3')
+def erplot3_results(sysinfo):
+    if not erplot3_applicable(sysinfo):
+        return []
+    from .erplot3 import ErPLot3
+    return ErPLot3(sysinfo).results()
+
+
+@timed('calculator.erplot26')
+def erplot26_results(sysinfo):
+    if not erplot26_applicable(sysinfo):
+        return []
+    from .erplot26 import ErPLot26
+    return ErPLot26(sysinfo).results()
+
+
+@timed('calculator.erplot3')
+def erplot3_calculate(sysinfo):
+    if not erplot3_applicable(sysinfo):
+        return
+    from .erplot3 import ErPLot3
+    erplot3 = ErPLot3(sysinfo)
+    erplot3.calculate()
+
+
+@timed('calculator.erplot26')
+def erplot26_calculate(sysinfo):
+    if not erplot26_applicable(sysinfo):
         return
+    from .erplot26 import ErPLot26
     erplot26 = ErPLot26(sysinfo)
     erplot26.calculate()
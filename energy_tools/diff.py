@@ -0,0 +1,311 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Changes of the profiles of a product and of their margins across BIOS versions
+
+The profiles of all paths are indexed by product, the same key as the
+<product>_<bios> file names, and the versions of every product are compared
+in order: the paths in the given order, e.g. the old and the new release
+directories, then the BIOS versions in natural order.
+
+A profile identical to the previous version, except for its name and
+version, is not evaluated again, and a profile which only changes the mode
+powers, the usual effect of a new firmware, is re-evaluated incrementally.
+The products are compared in parallel worker processes."""
+
+import collections
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from logging import debug, info, warning, error
+from .batch import find_profiles, _identify
+from .cache import profile_key
+from .incremental import IncrementalEvaluator, MEASUREMENTS
+
+__all__ = [
+        "Version",
+        "Comparison",
+        "load",
+        "index",
+        "field_changes",
+        "result_changes",
+        "compare_versions",
+        "compare",
+        "format_comparison",
+        "process"]
+
+# The keys which name a profile rather than describe the unit
+IDENTITY = ('Product name', 'BIOS version')
+
+Version = collections.namedtuple('Version', ['filename', 'product', 'bios', 'profile'])
+
+
+class Comparison(collections.namedtuple('Comparison', ['product', 'old', 'new',
+                                                       'fields', 'results', 'error'])):
+    """Changes from the old to the new version of a product
+
+    fields are (key, old, new) and results (old, new) pairs of Results of
+    the same requirement, either of them None if it only applies to one
+    version.  error is the message if a version can't be evaluated."""
+    __slots__ = ()
+
+    @property
+    def regressions(self):
+        """Pairs which pass with the old version but fail with the new"""
+        return [(old, new) for (old, new) in self.results
+                if old is not None and new is not None and
+                old.verdict == 'PASS' and new.verdict == 'FAIL']
+
+    @property
+    def fixes(self):
+        return [(old, new) for (old, new) in self.results
+                if old is not None and new is not None and
+                old.verdict == 'FAIL' and new.verdict == 'PASS']
+
+
+def _natural(text):
+    """Key of 'v1.10' after 'v1.9'"""
+    return tuple((0, int(part)) if part.isdigit() else (1, part)
+                 for part in re.split(r'(\d+)', text) if part)
+
+
+def load(paths):
+    """Versions of the profiles of every path in order, skipping the unreadable ones"""
+    versions = []
+    for (order, path) in enumerate(paths):
+        for filename in find_profiles([path]):
+            try:
+                with open(filename, 'r') as data:
+                    profile = json.load(data)
+            except (OSError, ValueError) as err:
+                warning('%s: %s' % (filename, err))
+                continue
+            (product, bios) = _identify(filename, profile)
+            versions.append((order, Version(filename, product, bios, profile)))
+    return versions
+
+
+def index(versions):
+    """{product: [Version]} with the versions of every product in order"""
+    products = collections.defaultdict(list)
+    for (order, version) in versions:
+        products[version.product].append((order, _natural(version.bios), version))
+    return dict((product, [version for (order, bios, version) in sorted(entries,
+                                                                        key=lambda entry: entry[:2])])
+                for (product, entries) in products.items())
+
+
+def field_changes(old, new):
+    """(key, old, new) of the keys which differ, None if a key is missing"""
+    changes = []
+    for key in sorted(set(old) | set(new)):
+        if key in IDENTITY:
+            continue
+        (before, after) = (old.get(key), new.get(key))
+        if before != after:
+            changes.append((key, before, after))
+    return changes
+
+
+def _requirement(result):
+    return tuple(result)[:7]
+
+
+def result_changes(old, new):
+    """(old, new) pairs of the Results of the same requirement which differ"""
+    before = collections.OrderedDict((_requirement(result), result) for result in old)
+    after = collections.OrderedDict((_requirement(result), result) for result in new)
+    changes = []
+    for (key, result) in before.items():
+        if key not in after:
+            changes.append((result, None))
+        elif after[key] != result:
+            changes.append((result, after[key]))
+    changes.extend((None, result) for (key, result) in after.items() if key not in before)
+    return changes
+
+
+def _unit(profile):
+    return dict((key, value) for (key, value) in profile.items() if key not in IDENTITY)
+
+
+def compare_versions(product, versions):
+    """Comparisons of every version of one product with the previous one"""
+    comparisons = []
+    evaluator = None
+    previous = None
+    for version in versions:
+        unit = _unit(version.profile)
+        key = profile_key(unit)
+        try:
+            if previous is None or evaluator is None:
+                evaluator = IncrementalEvaluator.from_profile(dict(unit))
+            elif key != previous[1]:
+                changes = field_changes(previous[0].profile, version.profile)
+                if changes and all(change[0] in MEASUREMENTS and change[2] is not None
+                                   for change in changes):
+                    evaluator.update_profile(dict((change[0], change[2])
+                                                  for change in changes))
+                else:
+                    evaluator = IncrementalEvaluator.from_profile(dict(unit))
+            results = evaluator.results()
+            err = None
+        except Exception as exc:
+            (evaluator, results, err) = (None, None, '%s: %s' % (type(exc).__name__, exc))
+        if previous is not None:
+            (old, old_key, old_results, old_err) = previous
+            comparisons.append(Comparison(
+                product, old, version,
+                field_changes(old.profile, version.profile),
+                result_changes(old_results, results)
+                if old_results is not None and results is not None else [],
+                err or old_err))
+        previous = (version, key, results, err)
+    return comparisons
+
+
+def _compare_products(chains):
+    return [comparison for (product, versions) in chains
+            for comparison in compare_versions(product, versions)]
+
+
+def compare(paths, jobs=None):
+    """Comparisons of the consecutive versions of every product of the paths"""
+    products = index(load(paths))
+    chains = [(product, versions) for (product, versions) in sorted(products.items())
+              if len(versions) > 1]
+    debug('Diff: %d products, %d with more than one version'
+          % (len(products), len(chains)))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(chains) < 2 * jobs:
+        return _compare_products(chains)
+    size = -(-len(chains) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        parts = executor.map(_compare_products,
+                             [chains[start:start + size]
+                              for start in range(0, len(chains), size)])
+        return [comparison for part in parts for comparison in part]
+
+
+def _describe(result):
+    labels = [result.standard, result.quantity]
+    for label in (result.category and 'Category %s' % result.category, result.gpu,
+                  result.allowance_psu and 'PSU +%s' % result.allowance_psu,
+                  result.allowance_proxy and 'proxy +%s' % result.allowance_proxy,
+                  result.condition):
+        if label:
+            labels.append(label)
+    return ', '.join(labels)
+
+
+def _margin(result):
+    if result is None or result.margin is None:
+        return 'n/a'
+    return '%s %+.2f%%' % (result.verdict, result.margin)
+
+
+def format_comparison(comparison):
+    lines = ['%s: %s -> %s (%s -> %s)' % (comparison.product, comparison.old.bios,
+                                          comparison.new.bios, comparison.old.filename,
+                                          comparison.new.filename)]
+    if comparison.error:
+        lines.append('  %s' % comparison.error)
+    for (key, old, new) in comparison.fields:
+        lines.append('  %s: %s -> %s' % (key, old, new))
+    for (old, new) in comparison.results:
+        result = new or old
+        change = ''
+        if old is not None and new is not None and \
+           old.margin is not None and new.margin is not None:
+            change = ' (%+.2f)' % (new.margin - old.margin)
+        flag = ''
+        if old is not None and new is not None and old.verdict != new.verdict:
+            flag = ' REGRESSION' if new.verdict == 'FAIL' else ' FIXED'
+        lines.append('    %s: %s -> %s%s%s' % (_describe(result), _margin(old),
+                                               _margin(new), change, flag))
+    if not comparison.fields and not comparison.error:
+        lines.append('  unchanged')
+    return '\n'.join(lines)
+
+
+FIELDS = ('product', 'old_bios', 'new_bios', 'old_profile', 'new_profile', 'change',
+          'name', 'old', 'new', 'old_verdict', 'new_verdict', 'margin_change')
+
+
+def _rows(comparison):
+    head = (comparison.product, comparison.old.bios, comparison.new.bios,
+            comparison.old.filename, comparison.new.filename)
+    if comparison.error:
+        yield head + ('error', '', comparison.error, '', '', '', '')
+    for (key, old, new) in comparison.fields:
+        yield head + ('field', key, _cell(old), _cell(new), '', '', '')
+    for (old, new) in comparison.results:
+        result = new or old
+        change = ''
+        if old is not None and new is not None and \
+           old.margin is not None and new.margin is not None:
+            change = new.margin - old.margin
+        yield head + ('margin', _describe(result),
+                      '' if old is None or old.margin is None else old.margin,
+                      '' if new is None or new.margin is None else new.margin,
+                      '' if old is None else old.verdict or '',
+                      '' if new is None else new.verdict or '', change)
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list, bool)):
+        return json.dumps(value)
+    return value
+
+
+def process(args):
+    start = time.monotonic()
+    try:
+        comparisons = compare(args.paths, args.jobs)
+    except OSError as err:
+        error(str(err))
+        return 1
+    elapsed = time.monotonic() - start
+    if args.regressions:
+        comparisons = [comparison for comparison in comparisons
+                       if comparison.regressions or comparison.error]
+
+    if args.output and args.output != '-':
+        with open(args.output, 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(FIELDS)
+            for comparison in comparisons:
+                writer.writerows(_rows(comparison))
+        info('The changes are saved to "%s".' % args.output)
+    else:
+        for comparison in comparisons:
+            print(format_comparison(comparison))
+
+    regressions = sum(len(comparison.regressions) for comparison in comparisons)
+    info('Compared %d pairs of versions in %.2f seconds, %d changed, %d regressions.'
+         % (len(comparisons), elapsed,
+            sum(1 for comparison in comparisons if comparison.fields),
+            regressions))
+    if any(comparison.error for comparison in comparisons):
+        return 1
+    return 2 if regressions else 0
@@ -17,9 +17,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from logging import debug, warning
+from .rules import RULES
 
 class EnergyStar52:
     """Energy Star 5.2 calculator"""
+    rules = RULES['Energy Star 5.2']
+
     def __init__(self, sysinfo):
         self.sysinfo = sysinfo
         debug("=== Energy Star 5.2 ===")
@@ -65,10 +68,7 @@ class EnergyStar52:
         (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = self.sysinfo.get_power_consumptions()
         P_IDLE = P_SHORT_IDLE
 
-        if self.sysinfo.computer_type == 3:
-            (T_OFF, T_SLEEP, T_IDLE) = (0.6, 0.1, 0.3)
-        else:
-            (T_OFF, T_SLEEP, T_IDLE) = (0.55, 0.05, 0.4)
+        (T_OFF, T_SLEEP, T_IDLE) = self.get_T_values()
 
         E_TEC = ((P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_IDLE * T_IDLE)) * 8760 / 1000
 
@@ -77,6 +77,16 @@ class EnergyStar52:
 
         return E_TEC
 
+    def get_T_values(self):
+        """(T_OFF, T_SLEEP, T_IDLE) of Equation 1"""
+        if self.sysinfo.computer_type == 3:
+            return self.rules['T']['notebook']
+        return self.rules['T']['desktop']
+
+    def get_P_TEC_T_values(self):
+        """(T_OFF, T_SLEEP, T_IDLE) of Equation 3"""
+        return self.rules['P_TEC_T']['workstation']
+
     def equation_two(self, over_frame_buffer_width_128=False, over_frame_buffer_width_64=False):
         """Equation 2: E_TEC_MAX Calculation for Desktop, Integrated Desktop, and Notebook Computers"""
 
@@ -86,114 +96,32 @@ class EnergyStar52:
 
         ## Maximum TEC Allowances for Desktop and Integrated Desktop Computers
         if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
-            if disk > 1:
-                TEC_STORAGE = 25.0 * (disk - 1)
-            else:
-                TEC_STORAGE = 0.0
-
-            if self.qualify_desktop_category('A'):
-                TEC_BASE = 148.0
-
-                if memory > 2:
-                    TEC_MEMORY = 1.0 * (memory - 2)
-                else:
-                    TEC_MEMORY = 0.0
-
-                if over_frame_buffer_width_128:
-                    TEC_GRAPHICS = 50.0
-                else:
-                    TEC_GRAPHICS = 35.0
-
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('A', E_TEC_MAX))
-
-            if self.qualify_desktop_category('B'):
-                TEC_BASE = 175.0
-
-                if memory > 2:
-                    TEC_MEMORY = 1.0 * (memory - 2)
-                else:
-                    TEC_MEMORY = 0.0
-
-                if over_frame_buffer_width_128:
-                    TEC_GRAPHICS = 50.0
-                else:
-                    TEC_GRAPHICS = 35.0
-
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('B', E_TEC_MAX))
-
-            if self.qualify_desktop_category('C', self.sysinfo.discrete):
-                TEC_BASE = 209.0
-
-                if memory > 2:
-                    TEC_MEMORY = 1.0 * (memory - 2)
-                else:
-                    TEC_MEMORY = 0.0
-
-                if over_frame_buffer_width_128:
-                    TEC_GRAPHICS = 50.0
-                else:
-                    TEC_GRAPHICS = 0.0
-
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('C', E_TEC_MAX))
-
-            if self.qualify_desktop_category('D', self.sysinfo.discrete, over_frame_buffer_width_128):
-                TEC_BASE = 234.0
-
-                if memory > 4:
-                    TEC_MEMORY = 1.0 * (memory - 4)
-                else:
-                    TEC_MEMORY = 0.0
-
-                if over_frame_buffer_width_128:
-                    TEC_GRAPHICS = 50.0
-                else:
-                    TEC_GRAPHICS = 0.0
-
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('D', E_TEC_MAX))
-
+            form = 'desktop'
+            qualify = self.qualify_desktop_category
+            wide_frame_buffer = over_frame_buffer_width_128
         ## Maximum TEC Allowances for Notebook Computers
         else:
-            if memory > 4:
-                TEC_MEMORY = 0.4 * (memory - 4)
-            else:
-                TEC_MEMORY = 0.0
-
-            if disk > 1:
-                TEC_STORAGE = 3.0 * (disk - 1)
-            else:
-                TEC_STORAGE = 0.0
-
-            if self.qualify_netbook_category('A'):
-                TEC_BASE = 40.0
-                TEC_GRAPHICS = 0.0
-
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('A', E_TEC_MAX))
+            form = 'notebook'
+            qualify = self.qualify_netbook_category
+            wide_frame_buffer = over_frame_buffer_width_64
 
-            if self.qualify_netbook_category('B', self.sysinfo.discrete):
-                TEC_BASE = 53.0
+        TEC_STORAGE = self.rules['TEC_STORAGE'][form](disk)
 
-                if over_frame_buffer_width_64:
-                    TEC_GRAPHICS = 3.0
-                else:
-                    TEC_GRAPHICS = 0.0
+        for (category, TEC_BASE) in sorted(self.rules['TEC_BASE'][form].items()):
+            if not qualify(category, self.sysinfo.discrete, over_frame_buffer_width_128):
+                continue
 
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('B', E_TEC_MAX))
+            TEC_MEMORY = self.rules['TEC_MEMORY'][form][category](memory)
 
-            if self.qualify_netbook_category('C', self.sysinfo.discrete, over_frame_buffer_width_128):
-                TEC_BASE = 88.5
-                TEC_GRAPHICS = 0.0
+            (TEC_GRAPHICS, TEC_GRAPHICS_WIDE) = self.rules['TEC_GRAPHICS'][form][category]
+            if wide_frame_buffer:
+                TEC_GRAPHICS = TEC_GRAPHICS_WIDE
 
-                E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
-                result.append(('C', E_TEC_MAX))
+            E_TEC_MAX = TEC_BASE + TEC_MEMORY + TEC_GRAPHICS + TEC_STORAGE
+            result.append((category, E_TEC_MAX))
 
-        debug("TEC_BASE = %s, TEC_MEMORY = %s, TEC_STORAGE = %s, TEC_GRAPHICS = %s" % (TEC_BASE, TEC_MEMORY, TEC_STORAGE, TEC_GRAPHICS))
-        debug("E_TEC_MAX = %s" % (E_TEC_MAX))
+            debug("TEC_BASE = %s, TEC_MEMORY = %s, TEC_STORAGE = %s, TEC_GRAPHICS = %s" % (TEC_BASE, TEC_MEMORY, TEC_STORAGE, TEC_GRAPHICS))
+            debug("E_TEC_MAX = %s" % (E_TEC_MAX))
 
         return result
 
@@ -202,7 +130,7 @@ class EnergyStar52:
         (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = self.sysinfo.get_power_consumptions()
         P_IDLE = P_SHORT_IDLE
 
-        (T_OFF, T_SLEEP, T_IDLE) = (0.35, 0.10, 0.55)
+        (T_OFF, T_SLEEP, T_IDLE) = self.get_P_TEC_T_values()
         P_TEC = (P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_IDLE * T_IDLE) 
 
         return P_TEC
@@ -220,38 +148,31 @@ class EnergyStar52:
         """Equation 5: Calculation of P_OFF_MAX for Small-scale Servers"""
         (core, clock, memory, disk) = self.sysinfo.get_basic_info()
 
-        P_OFF_BASE = 2.0
-        if wol:
-            P_OFF_WOL = 0.7
-        else:
+        (P_OFF_BASE, P_OFF_WOL) = self.rules['P_OFF']['small-scale server']
+        if not wol:
             P_OFF_WOL = 0
         P_OFF_MAX = P_OFF_BASE + P_OFF_WOL
 
         if (core > 1 or self.sysinfo.more_discrete) and memory >= 1:
             category = 'B'
-            P_IDLE_MAX = 65.0
         else:
             category = 'A'
-            P_IDLE_MAX = 50.0
+        P_IDLE_MAX = self.rules['P_IDLE_MAX']['small-scale server'][category]
 
         return (category, P_OFF_MAX, P_IDLE_MAX)
 
     def equation_six(self, wol):
         """Equation 6: Calculation of P_OFF_MAX for Thin Clients"""
-        P_OFF_BASE = 2.0
-        if wol:
-            P_OFF_WOL = 0.7
-        else:
+        (P_OFF_BASE, P_OFF_WOL) = self.rules['P_OFF']['thin client']
+        if not wol:
             P_OFF_WOL = 0
         P_OFF_MAX = P_OFF_BASE + P_OFF_WOL
         return P_OFF_MAX
 
     def equation_seven(self, wol):
         """Equation 7: Calculation of P_SLEEP_MAX for Thin Clients"""
-        P_SLEEP_BASE = 2.0
-        if wol:
-            P_SLEEP_WOL = 0.7
-        else:
+        (P_SLEEP_BASE, P_SLEEP_WOL) = self.rules['P_SLEEP']['thin client']
+        if not wol:
             P_SLEEP_WOL = 0
         P_SLEEP_MAX = P_SLEEP_BASE + P_SLEEP_WOL
         return P_SLEEP_MAX
@@ -17,9 +17,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from logging import debug, warning
+from .rules import RULES
 
 class EnergyStar60:
     """Energy Star 6.0 calculator"""
+    rules = RULES['Energy Star 6.0']
+
     def __init__(self, sysinfo):
         self.sysinfo = sysinfo
         debug("=== Energy Star 6.0 ===")
@@ -28,10 +31,7 @@ class EnergyStar60:
     def equation_one(self):
         """Equation 1: TEC Calculation (E_TEC) for Desktop, Integrated Desktop, Thin Client and Notebook Computers"""
         (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = self.sysinfo.get_power_consumptions()
-        if self.sysinfo.product_type == 4 or self.sysinfo.computer_type == 3:
-            (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.25, 0.35, 0.1, 0.3)
-        else:
-            (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.45, 0.05, 0.15, 0.35)
+        (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = self.get_T_values()
 
         E_TEC = ((P_OFF * T_OFF) + (P_SLEEP * T_SLEEP) + (P_LONG_IDLE * T_LONG_IDLE) + (P_SHORT_IDLE * T_SHORT_IDLE)) * 8760 / 1000
 
@@ -40,6 +40,16 @@ class EnergyStar60:
 
         return E_TEC
 
+    def get_T_values(self):
+        """(T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) of Equation 1"""
+        if self.sysinfo.product_type == 4 or self.sysinfo.computer_type == 3:
+            return self.rules['T']['notebook']
+        return self.rules['T']['desktop']
+
+    def get_P_TEC_T_values(self):
+        """(T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) of Equation 4"""
+        return self.rules['P_TEC_T']['workstation']
+
     def equation_two(self, gpu_category):
         """Equation 2: E_TEC_MAX Calculation for Desktop, Integrated Desktop, and Notebook Computers"""
         (core, clock, memory, disk) = self.sysinfo.get_basic_info()
@@ -48,97 +58,41 @@ class EnergyStar60:
         debug("P = %s" % (P))
 
         if self.sysinfo.computer_type != 3:
-            if P <= 3:
-                TEC_BASE = 69.0
-            elif self.sysinfo.discrete:
-                if P <= 9:
-                    TEC_BASE = 115.0
-                else:
-                    TEC_BASE = 135.0
-            else:
-                if P <= 6:
-                    TEC_BASE = 112.0
-                elif P <= 7:
-                    TEC_BASE = 120.0
-                else:
-                    TEC_BASE = 135.0
+            form = 'desktop'
         else:
-            if P <= 2:
-                TEC_BASE = 14.0
-            elif self.sysinfo.discrete:
-                if P <= 9:
-                    TEC_BASE = 16.0
-                else:
-                    TEC_BASE = 18.0
-            else:
-                if P <= 5.2:
-                    TEC_BASE = 22.0
-                elif P <= 8:
-                    TEC_BASE = 24.0
-                else:
-                    TEC_BASE = 28.0
+            form = 'notebook'
+
+        if self.sysinfo.discrete:
+            TEC_BASE = self.rules['TEC_BASE'][form + ' discrete'](P)
+        else:
+            TEC_BASE = self.rules['TEC_BASE'][form](P)
 
-        TEC_MEMORY = 0.8 * memory
+        TEC_MEMORY = self.rules['TEC_MEMORY'][form](memory)
 
         if self.sysinfo.switchable:
-            if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
-                TEC_SWITCHABLE = 0.5 * 36
-            else:
-                TEC_SWITCHABLE = 0
+            TEC_SWITCHABLE = self.rules['TEC_SWITCHABLE'].get(form, 0)
             TEC_GRAPHICS = 0
         else:
             TEC_SWITCHABLE = 0
             if self.sysinfo.discrete:
-                if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
-                    if gpu_category == 'G1':
-                        TEC_GRAPHICS = 36
-                    elif gpu_category == 'G2':
-                        TEC_GRAPHICS = 51
-                    elif gpu_category == 'G3':
-                        TEC_GRAPHICS = 64
-                    elif gpu_category == 'G4':
-                        TEC_GRAPHICS = 83
-                    elif gpu_category == 'G5':
-                        TEC_GRAPHICS = 105 
-                    elif gpu_category == 'G6':
-                        TEC_GRAPHICS = 115 
-                    elif gpu_category == 'G7':
-                        TEC_GRAPHICS = 130 
-                else:
-                    if gpu_category == 'G1':
-                        TEC_GRAPHICS = 14
-                    elif gpu_category == 'G2':
-                        TEC_GRAPHICS = 20
-                    elif gpu_category == 'G3':
-                        TEC_GRAPHICS = 26
-                    elif gpu_category == 'G4':
-                        TEC_GRAPHICS = 32
-                    elif gpu_category == 'G5':
-                        TEC_GRAPHICS = 42
-                    elif gpu_category == 'G6':
-                        TEC_GRAPHICS = 48
-                    elif gpu_category == 'G7':
-                        TEC_GRAPHICS = 60
+                TEC_GRAPHICS = self.rules['TEC_GRAPHICS'][form][gpu_category]
             else:
                 TEC_GRAPHICS = 0
 
-        if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
-            TEC_EEE = 8.76 * 0.2 * (0.15 + 0.35) * self.sysinfo.get_1glan_num()
-        else:
-            TEC_EEE = 8.76 * 0.2 * (0.10 + 0.30) * self.sysinfo.get_1glan_num()
+        TEC_EEE = self.rules['TEC_EEE'][form] * self.sysinfo.get_1glan_num()
 
-        if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
-            TEC_STORAGE = 26 * (disk - 1)
+        TEC_STORAGE = self.rules['TEC_STORAGE'][form](disk)
+
+        if self.sysinfo.computer_type == 2 or self.sysinfo.product_type == 4:
+            display = self.rules['TEC_INT_DISPLAY']['integrated desktop']
         else:
-            TEC_STORAGE = 2.6 * (disk - 1)
+            display = self.rules['TEC_INT_DISPLAY'].get(form)
 
         if self.sysinfo.computer_type != 1:
             (EP, r, A) = self.equation_three()
 
-        if self.sysinfo.computer_type == 2 or self.sysinfo.product_type == 4:
-            TEC_INT_DISPLAY = 8.76 * 0.35 * (1 + EP) * (4 * r + 0.05 * A)
-        elif self.sysinfo.computer_type == 3:
-            TEC_INT_DISPLAY = 8.76 * 0.30 * (1 + EP) * (2 * r + 0.02 * A)
+        if display:
+            TEC_INT_DISPLAY = display(EP, r, A)
         else:
             TEC_INT_DISPLAY = 0
         debug("TEC_BASE = %s, TEC_MEMORY = %s, TEC_GRAPHICS = %s, TEC_SWITCHABLE = %s, TEC_EEE = %s, TEC_STORAGE = %s, TEC_INT_DISPLAY = %s" % (TEC_BASE, TEC_MEMORY, TEC_GRAPHICS, TEC_SWITCHABLE, TEC_EEE, TEC_STORAGE, TEC_INT_DISPLAY))
@@ -164,13 +118,13 @@ class EnergyStar60:
     def equation_four(self):
         """Equation 4: P_TEC Calculation for Workstations""" 
         (P_OFF, P_SLEEP, P_LONG_IDLE, P_SHORT_IDLE) = self.sysinfo.get_power_consumptions()
-        (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.35, 0.10, 0.15, 0.40)
+        (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = self.get_P_TEC_T_values()
         P_TEC = P_OFF * T_OFF + P_SLEEP * T_SLEEP + P_LONG_IDLE * T_LONG_IDLE + P_SHORT_IDLE * T_SHORT_IDLE
         return P_TEC
 
     def equation_five(self):
         """Equation 5: P_TEC_MAX Calculation for Workstations"""
-        (T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = (0.10, 0.15, 0.40)
+        (T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) = self.get_P_TEC_T_values()
         P_EEE = 0.2 * self.sysinfo.get_1glan_num()
         P_MAX = self.sysinfo.max_power
         N_HDD = self.sysinfo.disk_num
@@ -179,10 +133,8 @@ class EnergyStar60:
 
     def equation_six(self, wol):
         """Calculation of P_OFF_MAX for Small-scale Servers"""
-        P_OFF_BASE = 1.0
-        if wol:
-            P_OFF_WOL = 0.4
-        else:
+        (P_OFF_BASE, P_OFF_WOL) = self.rules['P_OFF']['small-scale server']
+        if not wol:
             P_OFF_WOL = 0
         P_OFF_MAX = P_OFF_BASE + P_OFF_WOL
         return P_OFF_MAX
@@ -190,34 +142,33 @@ class EnergyStar60:
     def equation_seven(self):
         """Equation 7: Calculation of P_IDLE_MAX for Small-scale Servers"""
         N = self.sysinfo.disk_num
-        P_IDLE_BASE = 24.0
-        P_IDLE_HDD = 8.0
-        P_EEE = 0.2 * self.sysinfo.get_1glan_num()
+        (P_IDLE_BASE, P_IDLE_HDD, P_EEE) = self.rules['P_IDLE']['small-scale server']
+        P_EEE = P_EEE * self.sysinfo.get_1glan_num()
         P_IDLE_MAX = P_IDLE_BASE + (N - 1) * P_IDLE_HDD + P_EEE
         return P_IDLE_MAX
 
     def equation_eight(self, discrete, wol):
         """Equation 8: Calculation of E_TEC_MAX for Thin Clients"""
-        TEC_BASE = 60
+        TEC_BASE = self.rules['TEC_BASE']['thin client']
 
         if discrete:
-            TEC_GRAPHICS = 36
+            TEC_GRAPHICS = self.rules['TEC_GRAPHICS']['thin client']
         else:
             TEC_GRAPHICS = 0
 
         if wol:
-            TEC_WOL = 2
+            TEC_WOL = self.rules['TEC_WOL']['thin client']
         else:
             TEC_WOL = 0
 
         if self.sysinfo.integrated_display:
             (EP, r, A) = self.equation_three()
-            TEC_INT_DISPLAY = 8.76 * 0.35 * (1 + EP) * (4 * r + 0.05 * A)
+            TEC_INT_DISPLAY = self.rules['TEC_INT_DISPLAY']['thin client'](EP, r, A)
         else:
             TEC_INT_DISPLAY = 0
         debug("TEC_INT_DISPLAY = %s" % (TEC_INT_DISPLAY))
 
-        TEC_EEE = 8.76 * 0.2 * (0.15 + 0.35) * self.sysinfo.get_1glan_num()
+        TEC_EEE = self.rules['TEC_EEE']['thin client'] * self.sysinfo.get_1glan_num()
 
         E_TEC_MAX = TEC_BASE + TEC_GRAPHICS + TEC_WOL + TEC_INT_DISPLAY + TEC_EEE
 
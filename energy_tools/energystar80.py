@@ -18,11 +18,13 @@
 
 
 from logging import debug, error
-from math import tanh
+from .rules import RULES
 
 
 class EnergyStar80(object):
     """Energy Star 8.0 calculator"""
+    rules = RULES['Energy Star 8.0']
+
     def __init__(self, sysinfo):
         self.sysinfo = sysinfo
         debug("=== Energy Star 8.0 ===")
@@ -33,15 +35,7 @@ class EnergyStar80(object):
                        Thin Client and Notebook Computers"""
         (p_off, p_sleep, p_long_idle, p_short_idle) = \
             self.sysinfo.get_power_consumptions()
-        if self.sysinfo.product_type == 4:
-            (t_off, t_sleep, t_long_idle, t_short_idle) = \
-                (0.45, 0.05, 0.15, 0.35)
-        elif self.sysinfo.computer_type == 3:
-            (t_off, t_sleep, t_long_idle, t_short_idle) = \
-                (0.25, 0.35, 0.1, 0.3)
-        else:
-            (t_off, t_sleep, t_long_idle, t_short_idle) = \
-                (0.15, 0.45, 0.1, 0.3)
+        (t_off, t_sleep, t_long_idle, t_short_idle) = self.get_t_values()
 
         e_tec = ((p_off * t_off) + (p_sleep * t_sleep) +
                  (p_long_idle * t_long_idle) +
@@ -54,69 +48,64 @@ class EnergyStar80(object):
 
         return e_tec
 
+    def get_t_values(self):
+        """(T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) of Equation 1"""
+        if self.sysinfo.product_type == 4:
+            return self.rules['T']['thin client']
+        if self.sysinfo.computer_type == 3:
+            return self.rules['T']['notebook']
+        return self.rules['T']['desktop']
+
+    def get_p_tec_t_values(self):
+        """(T_OFF, T_SLEEP, T_LONG_IDLE, T_SHORT_IDLE) of Equation 4"""
+        return self.rules['P_TEC_T']['workstation']
+
     def equation_two(self, fb_bw, mobile_workstation=False):
         """Equation 2: E_TEC_MAX Calculation for
                        Desktop, Integrated Desktop, and Notebook Computers"""
         (core, clock, memory, disk) = self.sysinfo.get_basic_info()
-        storage_info = self.sysinfo.profile
+        (hdd_35, hdd_25, hybrid, ssd) = self.sysinfo.get_storage_info()
 
         pscore = core * clock
         debug("P = %s" % (pscore))
 
         if self.sysinfo.computer_type == 1:
             if self.sysinfo.discrete:
-                if pscore <= 8:
-                    tec_base = 35.0
-                else:
-                    tec_base = 45.0
+                tec_base = self.rules['TEC_BASE']['desktop discrete'](pscore)
             else:
-                if pscore <= 8:
-                    tec_base = 26.0
-                else:
-                    tec_base = 46.0
+                tec_base = self.rules['TEC_BASE']['desktop'](pscore)
         elif self.sysinfo.computer_type == 2:
-            if pscore <= 8:
-                tec_base = 9.0
-            else:
-                tec_base = 27.0
+            tec_base = self.rules['TEC_BASE']['integrated desktop'](pscore)
         elif self.sysinfo.computer_type == 3:
-            if pscore <= 2:
-                tec_base = 6.5
-            elif pscore < 8:
-                tec_base = 8.0
-            else:
-                tec_base = 14.0
+            tec_base = self.rules['TEC_BASE']['notebook'](pscore)
         else:
             error("It should not reach here.")
 
         if self.sysinfo.computer_type != 3:
-            tec_memory = 1.7 + 0.24 * memory
+            form = 'desktop'
         else:
-            tec_memory = 2.4 + 0.294 * memory
+            form = 'notebook'
+
+        tec_memory = self.rules['TEC_MEMORY'][form](memory)
 
         if self.sysinfo.switchable:
-            if self.sysinfo.computer_type != 3:
-                tec_switchable = 14.4
-            else:
-                tec_switchable = 0
+            tec_switchable = self.rules['TEC_SWITCHABLE'].get(form, 0)
             tec_graphics = 0
         elif self.sysinfo.discrete:
             tec_switchable = 0
-            if self.sysinfo.computer_type != 3:
-                tec_graphics = 50.4 * tanh(0.0038 * fb_bw - 0.137) + 23
-            else:
-                tec_graphics = 29.3 * tanh(0.0038 * fb_bw - 0.137) + 13.4
+            tec_graphics = self.rules['TEC_GRAPHICS'][form](fb_bw)
         else:
             tec_switchable = 0
             tec_graphics = 0
 
         if self.sysinfo.computer_type == 1 or self.sysinfo.computer_type == 2:
+            (glan10, glan1to10) = self.rules['TEC_GLAN']['desktop']
             if self.sysinfo.get_10glan_num():
-                tec_glan10 = 18.0
+                tec_glan10 = glan10
             else:
                 tec_glan10 = 0
             if self.sysinfo.get_1to10glan_num():
-                tec_glan1to10 = 4.0
+                tec_glan1to10 = glan1to10
             else:
                 tec_glan1to10 = 0
         else:
@@ -124,16 +113,12 @@ class EnergyStar80(object):
             tec_glan10 = 0
 
         if disk > 1:
-            if self.sysinfo.computer_type == 3:
-                tec_storage = storage_info["3.5 inch HDD"] * 0.0 \
-                    + storage_info["2.5 inch HDD"] * 2.6 \
-                    + storage_info["Hybrid HDD/SSD"] * 2.6 \
-                    + storage_info["SSD"] * 2.6
-            else:
-                tec_storage = storage_info["3.5 inch HDD"] * 16.5 \
-                    + storage_info["2.5 inch HDD"] * 2.1 \
-                    + storage_info["Hybrid HDD/SSD"] * 0.8 \
-                    + storage_info["SSD"] * 0.4
+            (per_hdd_35, per_hdd_25, per_hybrid, per_ssd) = \
+                self.rules['TEC_STORAGE'][form]
+            tec_storage = hdd_35 * per_hdd_35 \
+                + hdd_25 * per_hdd_25 \
+                + hybrid * per_hybrid \
+                + ssd * per_ssd
         else:
             tec_storage = 0
 
@@ -141,21 +126,17 @@ class EnergyStar80(object):
             (e_p, resolution, area) = self.equation_three()
 
         if self.sysinfo.computer_type == 2:
-            if area < 190:
-                tec_int_display = (3.43*resolution + 0.148*area + 1.30)*(1+e_p)
-            elif area < 210:
-                tec_int_display = (3.43*resolution + 0.018*area + 26.1)*(1+e_p)
-            elif area < 315:
-                tec_int_display = (3.43*resolution + 0.078*area + 13.2)*(1+e_p)
-            else:  # area >= 315
-                tec_int_display = (3.43*resolution + 0.156*area - 11.3)*(1+e_p)
+            tec_int_display = self.rules['TEC_INT_DISPLAY'][
+                'integrated desktop'](e_p, resolution, area)
         elif self.sysinfo.computer_type == 3:
-            tec_int_display = 8.76*0.30*(1+e_p)*(0.43*resolution+0.0263*area)
+            tec_int_display = self.rules['TEC_INT_DISPLAY']['notebook'](
+                e_p, resolution, area)
         else:
             tec_int_display = 0
 
-        if self.sysinfo.computer_type == 3 and mobile_workstation:
-            tec_mobile_workstation = 4.0
+        if mobile_workstation:
+            tec_mobile_workstation = \
+                self.rules['TEC_MOBILE_WORKSTATION'].get(form, 0)
         else:
             tec_mobile_workstation = 0
 
@@ -192,7 +173,7 @@ class EnergyStar80(object):
         """Equation 4: P_TEC Calculation for Workstations"""
         (p_off, p_sleep, p_long_idle, p_short_idle) = \
             self.sysinfo.get_power_consumptions()
-        (t_off, t_sleep, t_long_idle, t_short_idle) = (0.10, 0.35, 0.20, 0.35)
+        (t_off, t_sleep, t_long_idle, t_short_idle) = self.get_p_tec_t_values()
         p_tec = p_off * t_off \
             + p_sleep * t_sleep \
             + p_long_idle * t_long_idle \
@@ -208,28 +189,22 @@ class EnergyStar80(object):
 
     def equation_six(self, discrete, wol):
         """Equation 6: Calculation of E_TEC_MAX for Thin Clients"""
-        tec_base = 31
+        tec_base = self.rules['TEC_BASE']['thin client']
 
         if discrete:
-            tec_graphics = 36
+            tec_graphics = self.rules['TEC_GRAPHICS']['thin client']
         else:
             tec_graphics = 0
 
         if wol:
-            tec_wol = 2
+            tec_wol = self.rules['TEC_WOL']['thin client']
         else:
             tec_wol = 0
 
         if self.sysinfo.integrated_display:
             (e_p, resolution, area) = self.equation_three()
-            if area < 190:
-                tec_int_display = (3.43*resolution + 0.148*area + 1.30)*(1+e_p)
-            elif area < 210:
-                tec_int_display = (3.43*resolution + 0.018*area + 26.1)*(1+e_p)
-            elif area < 315:
-                tec_int_display = (3.43*resolution + 0.078*area + 13.2)*(1+e_p)
-            else:  # area >= 315
-                tec_int_display = (3.43*resolution + 0.156*area - 11.3)*(1+e_p)
+            tec_int_display = self.rules['TEC_INT_DISPLAY']['thin client'](
+                e_p, resolution, area)
         else:
             tec_int_display = 0
         debug("TEC_INT_DISPLAY = %s" % (tec_int_display))
@@ -16,10 +16,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import unittest
-from .sysinfo import SysInfo
 from logging import debug, warning
-from .common import result_filter
+from .common import new_result
+from .formatter import format_erplot26
 
 __all__ = ["ErPLot26"]
 
@@ -30,21 +29,13 @@ class ErPLot26:
         self.sysinfo = sysinfo
 
     def calculate(self):
-        print("\nErP Lot 26 Tier 3 (1 Jan 2019):\n")
-        self._verify_s3_s5()
+        print(format_erplot26(self.results()))
 
-    def _verify_s3_s5(self):
-        passed = True
-
-        if self.sysinfo.sleep_wol > 2:
-            print("  Failed. P_SLEEP_WOL (%s) > 2.0"
-                  % self.sysinfo.sleep_wol)
-            passed = False
+    def results(self):
+        return self._verify_s3_s5()
 
-        if self.sysinfo.off_wol > 0.5:
-            print("  Failed. P_OFF_WOL (%s) > 0.5" % self.sysinfo.off_wol)
-            passed = False
-
-        if passed:
-            print("  Pass. P_SLEEP_WOL (%s) <= 2.0 and P_OFF_WOL (%s) <= 0.5"
-                  % (self.sysinfo.sleep_wol, self.sysinfo.off_wol))
+    def _verify_s3_s5(self):
+        return [new_result('ErP Lot 26', 'P_SLEEP_WOL',
+                           self.sysinfo.sleep_wol, 2.0),
+                new_result('ErP Lot 26', 'P_OFF_WOL',
+                           self.sysinfo.off_wol, 0.5)]
@@ -21,10 +21,17 @@ __all__ = [
         "generate_excel_for_computers",
         "generate_excel_for_workstations",
         "generate_excel_for_small_scale_servers",
-        "generate_excel_for_thin_clients"]
-
-from logging import debug, warning
+        "generate_excel_for_thin_clients",
+        "BatchWorkbook",
+        "STYLES",
+        "Formats",
+        "book_formats"]
+
+import os
+import weakref
+from logging import debug, warning, error
 from .erplot3 import *
+from .timing import timed
 
 G1 = 'G1 (FB_BW <= 16)'
 G2 = 'G2 (16 < FB_BW <= 32)'
@@ -35,6 +42,7 @@ G6 = 'G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)'
 G7 = 'G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)'
 GN_LIST = [G1, G2, G3, G4, G5, G6, G7]
 
+@timed('output.excel')
 def generate_excel(sysinfo, version, output):
     if not output:
         return
@@ -73,9 +81,171 @@ def generate_excel(sysinfo, version, output):
     else:
         book.close()
 
+# Cell styles shared by all generators
+STYLES = {
+        'header': {'bold': 1, 'border': 1, 'align': 'center', 'fg_color': '#CFE2F3'},
+        'left': {'align': 'left'},
+        'right': {'align': 'right'},
+        'center': {'align': 'center'},
+        'warning': {'color': '#FF0000'},
+        'error': {'border': 1, 'color': '#FF0000'},
+        'field': {'border': 1, 'fg_color': '#F3F3F3'},
+        'field1': {'left': 1, 'right': 1, 'fg_color': '#F3F3F3'},
+        'fieldC': {'border': 1, 'align': 'center', 'valign': 'vcenter', 'fg_color': '#F3F3F3'},
+        'field2': {'left': 1, 'right': 1, 'bottom': 1, 'fg_color': '#F3F3F3'},
+        'unsure': {'border': 1, 'fg_color': '#D9EAD3'},
+        'value': {'border': 1},
+        'value1': {'left': 1, 'right': 1, 'num_format': '0.00'},
+        'value2': {'left': 1, 'right': 1, 'bottom': 1, 'num_format': '0.00'},
+        'value3': {'left': 1, 'right': 1, 'num_format': '0%'},
+        'value4': {'left': 1, 'right': 1, 'bottom': 1, 'num_format': '0%'},
+        'float1': {'border': 1, 'num_format': '0.0'},
+        'float2': {'border': 1, 'num_format': '0.00'},
+        'float3': {'left': 1, 'right': 1, 'num_format': '0.000'},
+        'result': {'border': 1, 'fg_color': '#F4CCCC'},
+        'result_value': {'border': 1, 'fg_color': '#FFF2CC', 'num_format': '0.00'},
+        'pass': {'border': 1, 'align': 'center', 'fg_color': '#D9EAD3'},
+        'fail': {'border': 1, 'align': 'center', 'fg_color': '#F4CCCC'}}
+
+class Formats:
+    """Cell formats of one workbook keyed by their properties
+
+    Every distinct format is added to the workbook once and reused by all
+    the sheets and generators writing to it."""
+    def __init__(self, book):
+        self.book = book
+        self.cache = {}
+
+    def get(self, properties):
+        key = tuple(sorted(properties.items()))
+        style = self.cache.get(key)
+        if style is None:
+            style = self.book.add_format(dict(properties))
+            self.cache[key] = style
+        return style
+
+    def __getitem__(self, name):
+        return self.get(STYLES[name])
+
+    def __len__(self):
+        return len(self.cache)
+
+_FORMATS = weakref.WeakKeyDictionary()
+
+def book_formats(book):
+    """The Formats of the workbook, created on the first use"""
+    formats = _FORMATS.get(book)
+    if formats is None:
+        formats = Formats(book)
+        _FORMATS[book] = formats
+    return formats
+
+# Excel limit of rows in one worksheet
+MAX_ROWS = 1048576
+
+BATCH_STANDARDS = ('Energy Star 5.2', 'Energy Star 6.0', 'Energy Star 7.0',
+                   'Energy Star 8.0', 'ErP Lot 3', 'ErP Lot 26')
+
+class BatchWorkbook:
+    """One workbook for many profiles written in constant_memory mode
+
+    The Profiles sheet has one row per profile with the best margin of every
+    standard and the Results sheet has one row per checked requirement.  The
+    rows are flushed as they are written, so the memory doesn't grow with
+    the number of profiles.  Results continue on a new sheet at the row
+    limit of Excel."""
+    def __init__(self, version, output, fields):
+        from xlsxwriter import Workbook
+        self.book = Workbook(output, {'constant_memory': True})
+        self.book.set_properties({'comments':"Energy Tools %s" % (version)})
+        self.formats = book_formats(self.book)
+        self.fields = fields
+        self.profile_fields = ('profile', 'product', 'bios', 'results',
+                               'passed') + tuple('%s margin (%%)' % standard
+                                                 for standard in BATCH_STANDARDS) + ('error',)
+        self.profiles = self._sheet('Profiles', self.profile_fields)
+        self.profile_row = 1
+        self.result_sheets = 1
+        self.results = self._sheet('Results', self.fields)
+        self.result_row = 1
+
+    def _sheet(self, name, fields):
+        sheet = self.book.add_worksheet(name)
+        sheet.set_column(0, 0, 40)
+        sheet.set_column(1, len(fields) - 1, 16)
+        sheet.freeze_panes(1, 0)
+        for (column, field) in enumerate(fields):
+            sheet.write(0, column, field, self.formats['header'])
+        return sheet
+
+    def _write(self, sheet, row, values):
+        for (column, value) in enumerate(values):
+            if value is None or value == '':
+                continue
+            if value in ('PASS', 'FAIL'):
+                style = self.formats[value.lower()]
+            elif isinstance(value, float):
+                style = self.formats['float2']
+            else:
+                style = self.formats['value']
+            sheet.write(row, column, value, style)
+
+    @timed('output.excel_batch')
+    def add(self, filename, product, bios, results, err=None):
+        margins = []
+        for standard in BATCH_STANDARDS:
+            checked = [result.margin for result in results
+                       if result.standard == standard and result.margin is not None]
+            if checked:
+                margins.append(max(checked))
+            else:
+                margins.append(None)
+        passed = len([result for result in results if result.verdict == 'PASS'])
+        self._write(self.profiles, self.profile_row,
+                    (filename, product, bios, len(results), passed) + tuple(margins))
+        if err:
+            self.profiles.write(self.profile_row, len(self.profile_fields) - 1,
+                                err, self.formats['error'])
+        self.profile_row = self.profile_row + 1
+
+        for result in results:
+            if self.result_row == MAX_ROWS:
+                self.result_sheets = self.result_sheets + 1
+                self.results = self._sheet('Results %d' % self.result_sheets,
+                                           self.fields)
+                self.result_row = 1
+            self._write(self.results, self.result_row,
+                        (filename, product, bios) + tuple(result)
+                        + (result.verdict, result.margin))
+            self.result_row = self.result_row + 1
+
+    @timed('output.excel_batch')
+    def close(self):
+        self.book.close()
+
 def formula_strip(formula):
     return ' '.join(formula.split())
 
+def column_name(column):
+    """'A' for 0, 'Z' for 25, 'AA' for 26 and so on"""
+    name = ''
+    column = column + 1
+    while column:
+        (column, remainder) = divmod(column - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+def column_index(name):
+    """0 for 'A', 25 for 'Z', 26 for 'AA' and so on"""
+    column = 0
+    for letter in name:
+        column = column * 26 + ord(letter) - ord('A') + 1
+    return column - 1
+
+def cell_name(row, column):
+    """A1 notation of the zero-based (row, column)"""
+    return "%s%s" % (column_name(column), row + 1)
+
 class ExcelMaker:
     def __init__(self, version, output):
         try:
@@ -89,7 +259,8 @@ class ExcelMaker:
         self.adjust_column_width()
         self.setup_theme()
         self.row = 1
-        self.column = 'A'
+        self.column = 0
+        self.merged = set()
         self.pos = {
                 'g1': G1,
                 'g2': G2,
@@ -120,70 +291,7 @@ class ExcelMaker:
         sheet.set_column('N:N', 6)
 
     def setup_theme(self):
-        book = self.book
-        theme = {}
-        theme["header"] = book.add_format({
-            'bold': 1,
-            'border': 1,
-            'align': 'center',
-            'fg_color': '#CFE2F3'})
-        theme["left"] = book.add_format({'align': 'left'})
-        theme["right"] = book.add_format({'align': 'right'})
-        theme["center"] = book.add_format({'align': 'center'})
-        theme["warning"] = book.add_format({'color': '#FF0000'})
-        theme["field"] = book.add_format({
-            'border': 1,
-            'fg_color': '#F3F3F3'})
-        theme["field1"] = book.add_format({
-            'left': 1,
-            'right': 1,
-            'fg_color': '#F3F3F3'})
-        theme["fieldC"] = book.add_format({
-            'border': 1,
-            'align': 'center',
-            'valign': 'vcenter',
-            'fg_color': '#F3F3F3'})
-        theme["field2"] = book.add_format({
-            'left': 1,
-            'right': 1,
-            'bottom': 1,
-            'fg_color': '#F3F3F3'})
-        theme["unsure"] = book.add_format({'border': 1, 'fg_color': '#D9EAD3'})
-        theme["value"] = book.add_format({'border': 1})
-        theme["value1"] = book.add_format({
-            'left': 1,
-            'right': 1})
-        theme["value1"].set_num_format('0.00')
-        theme["value2"] = book.add_format({
-            'left': 1,
-            'right': 1,
-            'bottom': 1})
-        theme["value2"].set_num_format('0.00')
-        theme["value3"] = book.add_format({
-            'left': 1,
-            'right': 1})
-        theme["value3"].set_num_format('0%')
-        theme["value4"] = book.add_format({
-            'left': 1,
-            'right': 1,
-            'bottom': 1})
-        theme["value4"].set_num_format('0%')
-        theme["float1"] = book.add_format({'border': 1})
-        theme["float1"].set_num_format('0.0')
-        theme["float2"] = book.add_format({'border': 1})
-        theme["float2"].set_num_format('0.00')
-        theme["float3"] = book.add_format({
-            'left': 1,
-            'right': 1})
-        theme["float3"].set_num_format('0.000')
-        theme["result"] = book.add_format({
-            'border': 1,
-            'fg_color': '#F4CCCC'})
-        theme["result_value"] = book.add_format({
-            'border': 1,
-            'fg_color': '#FFF2CC'})
-        theme["result_value"].set_num_format('0.00')
-        self.theme = theme
+        self.theme = book_formats(self.book)
 
     def ncell(self, width, height, label, formula=None, value=None, validator=None, abbr=None, twin=False):
         if type(value) is list:
@@ -213,39 +321,45 @@ class ExcelMaker:
             theme2 = self.theme['value']
             debug("Theme: (%s, %s)" % ('field', 'value'))
 
-        end_column = chr(ord(self.column) + width - 1)
+        # Zero-based (row, column) of the first, the next and the last cell
+        row = self.row - 1
+        column = self.column
         if twin:
-            next_column = chr(ord(self.column) + width)
+            next_column = column + width
         else:
-            next_column = chr(ord(self.column) + 1)
-        end_row = self.row + height - 1
-        start_cell = "%s%s" % (self.column, self.row)
-        next_cell = "%s%s" % (next_column, self.row)
-        end_cell = "%s%s" % (end_column, end_row)
-        if start_cell != end_cell:
-            debug("Position: %s%s" % (start_cell, end_cell))
+            next_column = column + 1
+        end_row = row + height - 1
+        end_column = column + width - 1
+        start_cell = cell_name(row, column)
+        next_cell = cell_name(row, next_column)
+        if width > 1 or height > 1:
+            debug("Position: %s:%s" % (start_cell, cell_name(end_row, end_column)))
         else:
             debug("Position: %s" % start_cell)
 
         if width > 1 or height > 1:
-            self.sheet.merge_range("%s:%s" % (start_cell, end_cell), value, theme1)
+            merged = (row, column, end_row, end_column)
+            # Some placeholders are merged again with their formula later.
+            if merged not in self.merged:
+                self.merged.add(merged)
+                self.sheet.merge_range(row, column, end_row, end_column, value, theme1)
         if twin:
-            self.sheet.write("%s" % start_cell, label, theme1)
+            self.sheet.write(row, column, label, theme1)
             if formula:
                 formula = formula % self.pos
-                self.sheet.write("%s" % next_cell, formula, theme2, value)
+                self.sheet.write(row, next_column, formula, theme2, value)
             else:
-                self.sheet.write("%s" % next_cell, value, theme2)
+                self.sheet.write(row, next_column, value, theme2)
             if validator:
-                self.sheet.data_validation("%s" % next_cell, {
+                self.sheet.data_validation(row, next_column, row, next_column, {
                     'validate': 'list',
                     'source': validator})
         else:
             if formula:
                 formula = formula % self.pos
-                self.sheet.write("%s" % start_cell, formula, theme1, value)
+                self.sheet.write(row, column, formula, theme1, value)
             else:
-                self.sheet.write("%s" % start_cell, value, theme1)
+                self.sheet.write(row, column, value, theme1)
         if twin:
             if abbr:
                 self.pos[abbr] = next_cell
@@ -273,23 +387,27 @@ class ExcelMaker:
         return self
 
     def left(self, step=1):
-        self.column = chr(ord(self.column) - step)
+        self.column = self.column - step
         return self
 
     def right(self, step=1):
-        self.column = chr(ord(self.column) + step)
+        self.column = self.column + step
         return self
 
     def position(self):
         return (self.column, self.row)
 
     def jump(self, column, row):
+        """column is a letter like 'D' or a zero-based index"""
+        if isinstance(column, str):
+            column = column_index(column)
         self.column = column
         self.row = row
         return self
 
     def shift(self, column, row, x, y):
-        self.column = chr(ord(column) + x)
+        self.jump(column, row)
+        self.column = self.column + x
         self.row = row + y
         return self
 
@@ -1330,38 +1448,16 @@ def generate_excel_for_workstations(book, sysinfo, version):
     sheet.set_column('A:A', 38)
     sheet.set_column('B:B', 12)
 
-    center = book.add_format({'align': 'center'})
-
-    header = book.add_format({
-        'bold': 1,
-        'border': 1,
-        'align': 'center',
-        'fg_color': '#CFE2F3'})
-
-    field = book.add_format({
-        'border': 1,
-        'fg_color': '#F3F3F3'})
-    field1 = book.add_format({
-        'left': 1,
-        'right': 1,
-        'fg_color': '#F3F3F3'})
-
-    float2 = book.add_format({'border': 1})
-    float2.set_num_format('0.00')
-
-    result = book.add_format({
-        'border': 1,
-        'fg_color': '#F4CCCC'})
-    result_value = book.add_format({
-        'border': 1,
-        'fg_color': '#FFF2CC'})
-    result_value.set_num_format('0.00')
-
-    value = book.add_format({'border': 1})
-    value1 = book.add_format({
-        'left': 1,
-        'right': 1})
-    value1.set_num_format('0.00')
+    formats = book_formats(book)
+    center = formats['center']
+    header = formats['header']
+    field = formats['field']
+    field1 = formats['field1']
+    float2 = formats['float2']
+    result = formats['result']
+    result_value = formats['result_value']
+    value = formats['value']
+    value1 = formats['value1']
 
     sheet.merge_range("A1:B1", "General", header)
     sheet.write('A2', "Product Type", field)
@@ -1449,38 +1545,17 @@ def generate_excel_for_small_scale_servers(book, sysinfo, version):
     sheet.set_column('A:A', 45)
     sheet.set_column('B:B', 15)
 
-    header = book.add_format({
-        'bold': 1,
-        'border': 1,
-        'align': 'center',
-        'fg_color': '#CFE2F3'})
-
-    field = book.add_format({
-        'border': 1,
-        'fg_color': '#F3F3F3'})
-    field1 = book.add_format({
-        'left': 1,
-        'right': 1,
-        'fg_color': '#F3F3F3'})
-
-    value0 = book.add_format({'border': 1, 'fg_color': '#D9EAD3'})
-    value = book.add_format({'border': 1})
-    value1 = book.add_format({
-        'left': 1,
-        'right': 1})
-    value1.set_num_format('0.00')
-    center = book.add_format({'align': 'center'})
-
-    float2 = book.add_format({'border': 1})
-    float2.set_num_format('0.00')
-
-    result = book.add_format({
-        'border': 1,
-        'fg_color': '#F4CCCC'})
-    result_value = book.add_format({
-        'border': 1,
-        'fg_color': '#FFF2CC'})
-    result_value.set_num_format('0.00')
+    formats = book_formats(book)
+    header = formats['header']
+    field = formats['field']
+    field1 = formats['field1']
+    value0 = formats['unsure']
+    value = formats['value']
+    value1 = formats['value1']
+    center = formats['center']
+    float2 = formats['float2']
+    result = formats['result']
+    result_value = formats['result_value']
 
     sheet.merge_range("A1:B1", "General", header)
 
@@ -1622,40 +1697,19 @@ def generate_excel_for_thin_clients(book, sysinfo, version):
     sheet.set_column('E:E', 8)
     sheet.set_column('F:F', 5)
 
-    header = book.add_format({
-        'bold': 1,
-        'border': 1,
-        'align': 'center',
-        'fg_color': '#CFE2F3'})
-
-    field = book.add_format({
-        'border': 1,
-        'fg_color': '#F3F3F3'})
-    field1 = book.add_format({
-        'left': 1,
-        'right': 1,
-        'fg_color': '#F3F3F3'})
-
-    value0 = book.add_format({'border': 1, 'fg_color': '#D9EAD3'})
-    value = book.add_format({'border': 1})
-    value1 = book.add_format({
-        'left': 1,
-        'right': 1})
-    value1.set_num_format('0.00')
-    center = book.add_format({'align': 'center'})
-    left = book.add_format({'align': 'left'})
-    right = book.add_format({'align': 'right'})
-
-    float2 = book.add_format({'border': 1})
-    float2.set_num_format('0.00')
-
-    result = book.add_format({
-        'border': 1,
-        'fg_color': '#F4CCCC'})
-    result_value = book.add_format({
-        'border': 1,
-        'fg_color': '#FFF2CC'})
-    result_value.set_num_format('0.00')
+    formats = book_formats(book)
+    header = formats['header']
+    field = formats['field']
+    field1 = formats['field1']
+    value0 = formats['unsure']
+    value = formats['value']
+    value1 = formats['value1']
+    center = formats['center']
+    left = formats['left']
+    right = formats['right']
+    float2 = formats['float2']
+    result = formats['result']
+    result_value = formats['result_value']
 
     sheet.merge_range("A1:B1", "General", header)
 
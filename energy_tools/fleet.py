@@ -0,0 +1,434 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Columnar evaluation of Desktop, Integrated Desktop and Notebook profiles
+
+Every column holds one profile field of the whole fleet and every equation is
+evaluated for all profiles at once.  Every coefficient comes from the same
+RULES tables as the scalar calculators and the rule objects are evaluated
+with the same operations in the same order, so the results are bit-identical
+to them.
+
+Not applicable combinations are filled with NaN, e.g. the GPU categories of
+a computer without discrete graphics or the PSU allowances of a notebook.
+"""
+
+import math
+from logging import debug
+
+import numpy as np
+
+from .rules import GPU_CATEGORIES, RULES
+from .timing import timed
+
+__all__ = [
+        "Fleet",
+        "GPU_CATEGORIES",
+        "ERP_CATEGORIES"]
+
+ERP_CATEGORIES = ('A', 'B', 'C', 'D')
+
+_COLUMNS = ('computer_type', 'core', 'clock', 'memory', 'disk',
+            'hdd35', 'hdd25', 'hybrid', 'ssd',
+            'switchable', 'discrete', 'gpu_num', 'fb_bw',
+            'tvtuner', 'audio', 'one_glan', 'one_to_ten_glan', 'ten_glan',
+            'diagonal', 'width', 'height', 'area', 'ep',
+            'off', 'off_wol', 'sleep', 'sleep_wol', 'long_idle', 'short_idle',
+            'wol')
+
+_BOOLEANS = ('switchable', 'discrete', 'tvtuner', 'audio', 'ep', 'wol')
+
+
+def _load(profile):
+    """Derive the columns of one profile the same way as SysInfo does"""
+    computer_type = profile['Computer Type']
+
+    if profile['Switchable Graphics']:
+        (switchable, discrete, gpu_num, fb_bw) = (True, False, 0, 0)
+    else:
+        switchable = False
+        gpu_num = profile['Discrete Graphics Cards']
+        discrete = gpu_num > 0
+        if discrete:
+            fb_bw = profile['Frame Buffer Bandwidth']
+        else:
+            fb_bw = 0
+
+    if computer_type != 1:
+        diagonal = profile['Display Diagonal']
+        area = profile['Screen Area']
+        width = profile['Display Width']
+        height = profile['Display Height']
+        if width * height >= 2300000:
+            ep = profile['Enhanced Display']
+        else:
+            ep = False
+    else:
+        (diagonal, area, width, height, ep) = (0.0, 0, 0, 0, False)
+
+    if computer_type != 3:
+        audio = profile['Discrete Audio']
+    else:
+        audio = False
+
+    wol = profile['Wake-on-LAN']
+    off = profile['Off Mode']
+    sleep = profile['Sleep Mode']
+    if wol:
+        off_wol = profile['Off Mode with WOL']
+        sleep_wol = profile['Sleep Mode with WOL']
+    else:
+        (off_wol, sleep_wol) = (off, sleep)
+
+    return (computer_type, profile['CPU Cores'], profile['CPU Clock'],
+            profile['Memory Size'], profile['Disk Number'],
+            profile.get('3.5 inch HDD', 0), profile.get('2.5 inch HDD', 0),
+            profile.get('Hybrid HDD/SSD', 0), profile.get('SSD', 0),
+            switchable, discrete, gpu_num, fb_bw,
+            profile['TV Tuner'], audio, profile['Gigabit Ethernet'],
+            profile['1~10 Gigabit Ethernet'], profile['10 Gigabit Ethernet'],
+            diagonal, width, height, area, ep,
+            off, off_wol, sleep, sleep_wol,
+            profile['Long Idle Mode'], profile['Short Idle Mode'], wol)
+
+
+def _tanh(values, mask):
+    """math.tanh() on the masked elements, which keeps the bits of libm"""
+    result = np.zeros(values.shape)
+    for i in np.flatnonzero(mask):
+        result[i] = math.tanh(values[i])
+    return result
+
+
+def _band_index(bands, x):
+    """Bands.index() of rules for every element of x at once"""
+    bounds = np.array(bands.bounds + (np.inf,), dtype=np.float64)
+    index = np.searchsorted(bounds[:-1], x, side='left')
+    opened = np.array(bands.open + (False,))
+    while True:
+        shift = opened[index] & (x == bounds[index])
+        if not shift.any():
+            break
+        index = index + shift
+    return index
+
+
+def _bands(bands, x):
+    """Bands of rules looked up for every element of x at once"""
+    return np.array(bands.values, dtype=np.float64)[_band_index(bands, x)]
+
+
+def _linear(linear, x):
+    """Linear of rules for every element of x"""
+    value = linear.intercept + linear.slope * (x - linear.offset)
+    if linear.floor is None:
+        return value
+    return np.where(x <= linear.offset, linear.floor, value)
+
+
+def _tanh_rule(rule, fb_bw, mask):
+    """Tanh of rules for the masked elements of fb_bw"""
+    return rule.scale * _tanh(rule.slope * fb_bw - rule.shift, mask) + rule.base
+
+
+def _display_rule(display, e_p, r, area):
+    """Display of rules for every element of (EP, r, A)"""
+    coefficients = np.array(display.bands.values, dtype=np.float64)[
+        _band_index(display.bands, area)]
+    (factor, x_r, x_a, constant) = coefficients.T
+    return factor * (1 + e_p) * (x_r * r + x_a * area + constant)
+
+
+def _weights(rules, notebook):
+    """Columns of the T values of desktops and notebooks"""
+    return [np.where(notebook, t_notebook, t_desktop) for (t_desktop, t_notebook)
+            in zip(rules['T']['desktop'], rules['T']['notebook'])]
+
+
+class Fleet:
+    """Profiles of Desktop, Integrated Desktop and Notebook Computers"""
+    def __init__(self, profiles):
+        rows = [_load(profile) for profile in profiles]
+        self.size = len(rows)
+        if rows:
+            columns = list(zip(*rows))
+        else:
+            columns = [()] * len(_COLUMNS)
+        for name, column in zip(_COLUMNS, columns):
+            if name == 'computer_type':
+                setattr(self, name, np.array(column, dtype=np.int64))
+            elif name in _BOOLEANS:
+                setattr(self, name, np.array(column, dtype=bool))
+            else:
+                setattr(self, name, np.array(column, dtype=np.float64))
+        debug("Fleet: %s profiles" % self.size)
+
+    def _display(self):
+        """Equation 3 of Energy Star 7.0 and 8.0: (EP, r, A)"""
+        e_p = np.where(self.ep, np.where(self.diagonal >= 27.0, 0.75, 0.3), 0)
+        resolution = 1.0 * self.width * self.height / 1000000
+        area = 1.0 * self.area
+        return (e_p, resolution, area)
+
+    @timed('calculator.fleet_estar70')
+    def estar70(self):
+        """Energy Star 7.0
+
+        E_TEC has the shape (N,) and E_TEC_MAX has the shape (N, 3, 7) for
+        the PSU allowances (1, 1.015, 1.03 or 1.04) and G1~G7.  Computers
+        without discrete graphics only fill the G1 column and notebooks only
+        fill E_TEC_MAX[:, 0, 0]."""
+        rules = RULES['Energy Star 7.0']
+        ct = self.computer_type
+        desktop = (ct == 1) | (ct == 2)
+        notebook = ct == 3
+
+        (t_off, t_sleep, t_long_idle, t_short_idle) = _weights(rules, notebook)
+        e_tec = ((self.off * t_off) + (self.sleep * t_sleep) +
+                 (self.long_idle * t_long_idle) +
+                 (self.short_idle * t_short_idle)) * 8760 / 1000
+
+        pscore = self.core * self.clock
+        tec_base = np.where(
+            desktop,
+            np.where(self.discrete,
+                     _bands(rules['TEC_BASE']['desktop discrete'], pscore),
+                     _bands(rules['TEC_BASE']['desktop'], pscore)),
+            _bands(rules['TEC_BASE']['notebook'], pscore))
+
+        tec_memory = np.where(ct != 3,
+                              _linear(rules['TEC_MEMORY']['desktop'], self.memory),
+                              _linear(rules['TEC_MEMORY']['notebook'], self.memory))
+
+        tec_switchable = np.where(self.switchable & desktop,
+                                  rules['TEC_SWITCHABLE']['desktop'], 0)
+
+        graphics = ~self.switchable & self.discrete
+        tec_tanh = _tanh_rule(rules['TEC_GRAPHICS']['notebook'], self.fb_bw,
+                              graphics & ~desktop)
+
+        tec_eee = np.where(desktop,
+                           rules['TEC_EEE']['desktop'] * self.one_glan, 0)
+
+        tec_storage = np.where(desktop,
+                               _linear(rules['TEC_STORAGE']['desktop'], self.disk),
+                               _linear(rules['TEC_STORAGE']['notebook'], self.disk))
+
+        (e_p, resolution, area) = self._display()
+        displays = rules['TEC_INT_DISPLAY']
+        tec_int_display = np.where(
+            ct == 2,
+            _display_rule(displays['integrated desktop'], e_p, resolution, area),
+            np.where(notebook,
+                     _display_rule(displays['notebook'], e_p, resolution, area),
+                     0))
+
+        higher = np.where(ct == 2, 1.04, 1.03)
+        e_tec_max = np.full((self.size, 3, len(GPU_CATEGORIES)), np.nan)
+        adders = rules['TEC_GRAPHICS']['desktop']
+        for j, adder in enumerate(adders[gpu] for gpu in GPU_CATEGORIES):
+            tec_graphics = np.where(graphics,
+                                    np.where(desktop, adder, tec_tanh), 0)
+            value = tec_base + tec_memory + tec_graphics + tec_storage + \
+                tec_int_display + tec_switchable + tec_eee
+            for i, allowance_psu in enumerate((1, 1.015, higher)):
+                if j == 0:
+                    applicable = desktop | (i == 0)
+                else:
+                    applicable = desktop & self.discrete
+                e_tec_max[:, i, j] = np.where(applicable,
+                                              value * allowance_psu, np.nan)
+
+        return {'E_TEC': e_tec, 'E_TEC_MAX': e_tec_max}
+
+    @timed('calculator.fleet_estar80')
+    def estar80(self):
+        """Energy Star 8.0
+
+        E_TEC has the shape (N,) and E_TEC_MAX has the shape (N, 2, 3).  The
+        second axis is the full network proxy (0, 0.12) for desktops or the
+        mobile workstation (False, True) for notebooks and the third axis is
+        the PSU allowance (0, 0.015, 0.03 or 0.04).  Integrated desktops only
+        fill E_TEC_MAX[:, 0, :] and notebooks only fill E_TEC_MAX[:, :, 0]."""
+        rules = RULES['Energy Star 8.0']
+        ct = self.computer_type
+        notebook = ct == 3
+
+        (t_off, t_sleep, t_long_idle, t_short_idle) = _weights(rules, notebook)
+        e_tec = ((self.off * t_off) + (self.sleep * t_sleep) +
+                 (self.long_idle * t_long_idle) +
+                 (self.short_idle * t_short_idle)) * 8760 / 1000
+
+        pscore = self.core * self.clock
+        tec_base = np.select(
+            [(ct == 1) & self.discrete, ct == 1, ct == 2],
+            [_bands(rules['TEC_BASE'][form], pscore) for form in
+             ('desktop discrete', 'desktop', 'integrated desktop')],
+            _bands(rules['TEC_BASE']['notebook'], pscore))
+
+        tec_memory = np.where(ct != 3,
+                              _linear(rules['TEC_MEMORY']['desktop'], self.memory),
+                              _linear(rules['TEC_MEMORY']['notebook'], self.memory))
+
+        tec_switchable = np.where(self.switchable & ~notebook,
+                                  rules['TEC_SWITCHABLE']['desktop'], 0)
+
+        graphics = ~self.switchable & self.discrete
+        tec_graphics = np.where(
+            graphics,
+            np.where(notebook,
+                     _tanh_rule(rules['TEC_GRAPHICS']['notebook'], self.fb_bw,
+                                graphics & notebook),
+                     _tanh_rule(rules['TEC_GRAPHICS']['desktop'], self.fb_bw,
+                                graphics & ~notebook)),
+            0)
+
+        (glan10, glan1to10) = rules['TEC_GLAN']['desktop']
+        tec_glan10 = np.where(~notebook & (self.ten_glan != 0), glan10, 0)
+        tec_glan1to10 = np.where(~notebook & (self.one_to_ten_glan != 0),
+                                 glan1to10, 0)
+
+        storage = [self.hdd35 * per_hdd_35 + self.hdd25 * per_hdd_25 +
+                   self.hybrid * per_hybrid + self.ssd * per_ssd
+                   for (per_hdd_35, per_hdd_25, per_hybrid, per_ssd) in
+                   (rules['TEC_STORAGE']['notebook'], rules['TEC_STORAGE']['desktop'])]
+        tec_storage = np.where(self.disk > 1,
+                               np.where(notebook, storage[0], storage[1]), 0)
+
+        (e_p, resolution, area) = self._display()
+        displays = rules['TEC_INT_DISPLAY']
+        tec_int_display = np.where(
+            ct == 2,
+            _display_rule(displays['integrated desktop'], e_p, resolution, area),
+            np.where(notebook,
+                     _display_rule(displays['notebook'], e_p, resolution, area),
+                     0))
+
+        value = tec_base + tec_memory + tec_graphics + tec_storage + \
+            tec_int_display + tec_switchable + tec_glan10 + tec_glan1to10
+        mobile = value + np.where(notebook,
+                                  rules['TEC_MOBILE_WORKSTATION']['notebook'], 0)
+
+        e_tec_max = np.full((self.size, 2, 3), np.nan)
+        for j, allowance_proxy in enumerate((0, 0.12)):
+            for i in range(3):
+                allowance_psu = (0, 0.015, 0.03)[i]
+                desktop = value * (1 + allowance_psu + allowance_proxy)
+                if j == 0:
+                    integrated = value * (1 + (0, 0.015, 0.04)[i])
+                else:
+                    integrated = np.nan
+                if i == 0:
+                    if j == 0:
+                        laptop = value
+                    else:
+                        laptop = mobile
+                else:
+                    laptop = np.nan
+                e_tec_max[:, j, i] = np.select([ct == 1, ct == 2],
+                                               [desktop, integrated], laptop)
+
+        return {'E_TEC': e_tec, 'E_TEC_MAX': e_tec_max}
+
+    @timed('calculator.fleet_erplot3')
+    def erplot3_2016(self):
+        """ErP Lot 3 from 1 January 2016
+
+        E_TEC and E_TEC_WOL have the shape (N,), E_TEC_WOL is NaN without
+        Wake-on-LAN.  CATEGORY has the shape (N, 4) with the values of
+        ErPLot3_2014.category() for A~D (-1 if not applicable) and E_TEC_MAX
+        has the shape (N, 4, 7) for A~D and G1~G7.  Computers without discrete
+        graphics only fill the G1 column with the value without TEC_GRAPHICS.
+        APPLICABLE tells whether erplot3_calculate() checks the profile."""
+        rules = RULES['ErP Lot 3 2016']
+        ct = self.computer_type
+        notebook = ct == 3
+        cards = self.gpu_num
+        core = self.core
+        memory = self.memory
+
+        (t_off, t_sleep, t_idle) = _weights(rules, notebook)
+        e_tec = ((t_off * self.off) + (t_sleep * self.sleep) +
+                 (t_idle * self.short_idle)) * 8760 / 1000
+        e_tec_wol = ((t_off * self.off_wol) + (t_sleep * self.sleep_wol) +
+                     (t_idle * self.short_idle)) * 8760 / 1000
+        e_tec_wol = np.where(self.wol, e_tec_wol, np.nan)
+
+        category = np.empty((self.size, len(ERP_CATEGORIES)), dtype=np.int64)
+        category[:, 0] = 1
+        category[:, 1] = np.where(
+            notebook,
+            np.where(cards >= 1, 1, -1),
+            np.where((core >= 2) & (memory >= 2), 1, -1))
+        category[:, 2] = np.where(
+            notebook,
+            np.where((core >= 2) & (memory >= 2) & (cards >= 1), 0, -1),
+            np.where((core >= 3) & ((memory >= 2) | (cards >= 1)), 1, -1))
+        category[:, 3] = np.where(
+            notebook, -1,
+            np.where(core >= 4,
+                     np.select([memory >= 4, cards >= 1], [1, 0], -1),
+                     -1))
+
+        tec_storage = np.where(
+            self.disk == 0, 0,
+            np.where(notebook,
+                     _linear(rules['TEC_STORAGE']['notebook'], self.disk),
+                     _linear(rules['TEC_STORAGE']['desktop'], self.disk)))
+        tec_tv_tuner = np.where(self.tvtuner,
+                                np.where(notebook, rules['TEC_TV_TUNER']['notebook'],
+                                         rules['TEC_TV_TUNER']['desktop']), 0)
+        tec_audio = np.where(self.audio,
+                             np.where(notebook, rules['TEC_AUDIO'].get('notebook', 0),
+                                      rules['TEC_AUDIO'].get('desktop', 0)), 0)
+
+        e_tec_max = np.full((self.size, len(ERP_CATEGORIES),
+                             len(GPU_CATEGORIES)), np.nan)
+        bases = [(rules['TEC_BASE']['notebook'].get(category, np.nan),
+                  rules['TEC_BASE']['desktop'][category])
+                 for category in ERP_CATEGORIES]
+        graphics = [(rules['TEC_GRAPHICS']['notebook'][gpu],
+                     rules['TEC_GRAPHICS']['desktop'][gpu])
+                    for gpu in GPU_CATEGORIES]
+        for k, (base_notebook, base_desktop) in enumerate(bases):
+            tec_base = np.where(notebook, base_notebook, base_desktop)
+            tec_memory = np.where(
+                notebook,
+                _linear(rules['TEC_MEMORY']['notebook'][ERP_CATEGORIES[k]], memory),
+                _linear(rules['TEC_MEMORY']['desktop'][ERP_CATEGORIES[k]], memory))
+            value = tec_base + tec_memory + tec_storage + tec_tv_tuner + \
+                tec_audio
+            listed = category[:, k] >= 0
+            for j, (adder_notebook, adder_desktop) in enumerate(graphics):
+                tec_graphics = np.where(notebook, adder_notebook,
+                                        adder_desktop)
+                if j == 0:
+                    e_tec_max[:, k, j] = np.select(
+                        [listed & (cards == 0), listed & (cards == 1)],
+                        [value + 0, value + tec_graphics], np.nan)
+                else:
+                    e_tec_max[:, k, j] = np.where(listed & (cards == 1),
+                                                  value + tec_graphics,
+                                                  np.nan)
+
+        applicable = ~notebook | ((self.diagonal >= 9) &
+                                  (self.long_idle >= 6))
+
+        return {'E_TEC': e_tec, 'E_TEC_WOL': e_tec_wol,
+                'CATEGORY': category, 'E_TEC_MAX': e_tec_max,
+                'APPLICABLE': applicable}
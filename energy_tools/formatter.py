@@ -0,0 +1,269 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Text rendering of the results returned by the calculators"""
+
+from .common import result_filter
+
+__all__ = [
+        "format_estar5",
+        "format_estar6",
+        "format_estar7",
+        "format_estar8",
+        "format_workstation",
+        "format_small_scale_server",
+        "format_thin_client",
+        "format_erplot3",
+        "format_erplot26"]
+
+GPU_LABELS = {
+        'G1': "G1 (FB_BW <= 16)",
+        'G2': "G2 (16 < FB_BW <= 32)",
+        'G3': "G3 (32 < FB_BW <= 64)",
+        'G4': "G4 (64 < FB_BW <= 96)",
+        'G5': "G5 (96 < FB_BW <= 128)",
+        'G6': "G6 (FB_BW > 128; Frame Buffer Data Width < 192 bits)",
+        'G7': "G7 (FB_BW > 128; Frame Buffer Data Width >= 192 bits)"}
+
+FB_WIDTH_HEADERS = {
+        'FB width <= 64-bit': "If GPU Frame Buffer Width <= 64 bits,",
+        '64-bit < FB width <= 128-bit':
+            "If 64 bits < GPU Frame Buffer Width <= 128 bits,",
+        'FB width <= 128-bit': "If GPU Frame Buffer Width <= 128 bits,",
+        'FB width > 128-bit': "If GPU Frame Buffer Width > 128 bits,"}
+
+
+def _maximum_name(quantity):
+    if quantity.startswith('E_TEC'):
+        return 'E_TEC_MAX'
+    return quantity + '_MAX'
+
+
+def _check(result):
+    """'value (quantity) operator maximum (quantity_MAX)'"""
+    return "%s (%s) %s %s (%s)" % (result.value, result.quantity,
+                                   result.operator, result.maximum,
+                                   _maximum_name(result.quantity))
+
+
+def _verdict(result):
+    return result_filter(result.verdict, result.value, result.maximum)
+
+
+def _psu_header(allowance_psu):
+    if not allowance_psu:
+        return "If power supplies do not meet the requirements of Power Supply Efficiency Allowance,"
+    elif allowance_psu == 0.015:
+        return "If power supplies meet lower efficiency requirements,"
+    return "If power supplies meet higher efficiency requirements,"
+
+
+def _wol_header(condition):
+    if condition == 'WOL enabled':
+        return "  If Wake-On-LAN (WOL) is enabled by default upon shipment."
+    return "  If Wake-On-LAN (WOL) is disabled by default upon shipment."
+
+
+def _group(results, key):
+    groups = []
+    for result in results:
+        if not groups or key(groups[-1][0]) != key(result):
+            groups.append([])
+        groups[-1].append(result)
+    return groups
+
+
+def format_estar5(results):
+    lines = ["Energy Star 5:"]
+    groups = {}
+    for result in results:
+        groups.setdefault(result.condition, []).append(result)
+
+    def line(result, indent):
+        return "%sCategory %s: %s, %s" % (indent, result.category,
+                                          _check(result), _verdict(result))
+
+    over_128 = groups['FB width > 128-bit']
+    if 'FB width <= 64-bit' in groups:
+        under_64 = groups['FB width <= 64-bit']
+        between_64_and_128 = groups['64-bit < FB width <= 128-bit']
+    else:
+        under_64 = between_64_and_128 = groups['FB width <= 128-bit']
+
+    different = False
+    for i, j, k in zip(over_128, between_64_and_128, under_64):
+        if i.category != j.category or i.maximum != j.maximum or \
+                j.category != k.category or j.maximum != k.maximum:
+            different = True
+
+    if different:
+        for condition in ('FB width <= 64-bit',
+                          '64-bit < FB width <= 128-bit',
+                          'FB width <= 128-bit',
+                          'FB width > 128-bit'):
+            if condition in groups:
+                lines.append("\n  " + FB_WIDTH_HEADERS[condition])
+                lines.extend(line(result, "    ")
+                             for result in groups[condition])
+    else:
+        lines.extend(line(result, "\n  ") for result in under_64)
+    return "\n".join(lines)
+
+
+def _format_estar_psu(title, results):
+    lines = [title]
+    for group in _group(results, lambda result: result.allowance_psu):
+        if group[0].allowance_psu is not None:
+            lines.append("  " + _psu_header(group[0].allowance_psu))
+        for result in group:
+            if result.gpu:
+                lines.append("    %s for %s, %s" % (_check(result),
+                                                   GPU_LABELS[result.gpu],
+                                                   _verdict(result)))
+            else:
+                lines.append("    %s, %s" % (_check(result),
+                                             _verdict(result)))
+    return "\n".join(lines)
+
+
+def format_estar6(results):
+    return _format_estar_psu("\nEnergy Star 6:\n", results)
+
+
+def format_estar7(results):
+    return _format_estar_psu("\nEnergy Star 7:\n", results)
+
+
+def format_estar8(results):
+    lines = ["\nEnergy Star 8:\n"]
+    for result in results:
+        if result.allowance_proxy is not None:
+            if result.allowance_psu == 0:
+                if result.allowance_proxy:
+                    lines.append("  If the desktop computer implements a full capability - full network proxy solution,")
+                else:
+                    lines.append("  If the desktop computer doesn't implement a full capability - full network proxy solution,")
+            lines.append("   " + _psu_header(result.allowance_psu))
+            indent = "     "
+        elif result.allowance_psu is not None:
+            lines.append("  " + _psu_header(result.allowance_psu))
+            indent = "    "
+        else:
+            if result.condition == 'mobile workstation':
+                lines.append("  If the system meets the full Mobile Workstation definition,")
+            else:
+                lines.append("  If the system doesn't meet the full Mobile Workstation definition,")
+            indent = "    "
+        lines.append("%s%s, %s" % (indent, _check(result), _verdict(result)))
+    return "\n".join(lines)
+
+
+def format_workstation(results):
+    lines = []
+    for result in results:
+        lines.append("%s:" % result.standard)
+        lines.append("  %s, %s" % (_check(result), _verdict(result)))
+    return "\n".join(lines)
+
+
+def format_small_scale_server(results):
+    lines = []
+    for standard in _group(results, lambda result: result.standard):
+        lines.append("%s:" % standard[0].standard)
+        for (p_off, p_idle) in zip(standard[0::2], standard[1::2]):
+            lines.append(_wol_header(p_off.condition))
+            if p_off.verdict == 'PASS' and p_idle.verdict == 'PASS':
+                result = 'PASS'
+            else:
+                result = 'FAIL'
+            if p_off.category:
+                category = "Category %s: " % p_off.category
+            else:
+                category = ""
+            lines.append("    %s%s, %s, %s" % (category, _check(p_off),
+                                                _check(p_idle), result))
+    return "\n".join(lines)
+
+
+def format_thin_client(results):
+    lines = []
+    for standard in _group(results, lambda result: result.standard):
+        lines.append("%s:" % standard[0].standard)
+        for group in _group(standard, lambda result: result.condition):
+            if group[0].quantity == 'E_TEC':
+                for result in group:
+                    if 'dGfx' in result.condition:
+                        msg1 = "it has Discrete Graphics enabled"
+                    else:
+                        msg1 = "it doesn't have Discrete Graphics enabled"
+                    if 'WOL enabled' in result.condition:
+                        msg2 = "Wake-On-LAN (WOL) is enabled"
+                    else:
+                        msg2 = "Wake-On-LAN (WOL) is disabled"
+                    lines.append("  If %s and %s by default upon shipment,"
+                                 % (msg1, msg2))
+                    lines.append("    %s, %s" % (_check(result),
+                                                 _verdict(result)))
+                continue
+            lines.append(_wol_header(group[0].condition))
+            lines.append("    Category %s:" % group[0].category)
+            for result in group:
+                lines.append("      %s" % _check(result))
+            if all(result.verdict == 'PASS' for result in group):
+                lines.append("        PASS")
+            else:
+                lines.append("        FAIL")
+    return "\n".join(lines)
+
+
+def format_erplot3(results):
+    lines = ["\nErP Lot 3 from 1 January 2016:\n"]
+    for result in results:
+        if not result.category and result.verdict == 'FAIL':
+            lines.append("  Fail because %s (%s) > %s" %
+                         (result.quantity, result.value, result.maximum))
+    for group in _group([result for result in results if result.category],
+                        lambda result: result.category):
+        if group[0].condition:
+            lines.append("  Category %s if a discrete graphics card (dGfx) meeting the G3 (with FB Data Width > 128-bit), G4, G5, G6 or G7 classification:" % group[0].category)
+        else:
+            lines.append("  Category %s:" % group[0].category)
+        for result in group:
+            if result.maximum is None:
+                lines.append("    No console output because of more than one discrete graphics card.")
+            elif result.gpu:
+                lines.append("      For %s, %s, %s" % (result.gpu,
+                                                       _check(result),
+                                                       _verdict(result)))
+            else:
+                lines.append("      %s, %s" % (_check(result),
+                                               _verdict(result)))
+    return "\n".join(lines)
+
+
+def format_erplot26(results):
+    lines = ["\nErP Lot 26 Tier 3 (1 Jan 2019):\n"]
+    for result in results:
+        if result.verdict == 'FAIL':
+            lines.append("  Failed. %s (%s) > %s" %
+                         (result.quantity, result.value, result.maximum))
+    if all(result.verdict == 'PASS' for result in results):
+        lines.append("  Pass. " + " and ".join(
+            "%s (%s) <= %s" % (result.quantity, result.value, result.maximum)
+            for result in results))
+    return "\n".join(lines)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Re-evaluation of one configuration as its power measurements change
+
+The maximums of the standards, e.g. E_TEC_MAX of every GPU category, PSU
+tier and proxy option, only depend on the configuration.  They are
+evaluated once, and every update only recomputes the measured values with
+the equations of the standards."""
+
+from logging import debug
+from .common import Result
+from .core import evaluate, erplot3_applicable, erplot26_applicable
+from .energystar52 import EnergyStar52
+from .energystar60 import EnergyStar60
+from .energystar70 import EnergyStar70
+from .energystar80 import EnergyStar80
+from .erplot3 import ErPLot3_2016
+from .snapshot import SystemSnapshot
+from .solver import DIRECT, MODES
+
+__all__ = [
+        "MEASUREMENTS",
+        "IncrementalEvaluator"]
+
+# The profile keys of the measurements and the fields of SystemSnapshot
+MEASUREMENTS = {
+        'Off Mode': 'off',
+        'Off Mode with WOL': 'off_wol',
+        'Sleep Mode': 'sleep',
+        'Sleep Mode with WOL': 'sleep_wol',
+        'Long Idle Mode': 'long_idle',
+        'Short Idle Mode': 'short_idle'}
+
+# (standard, quantity) to the value of the quantity, the direct ones are
+# the mode powers
+_VALUES = {
+        ('Energy Star 5.2', 'E_TEC'): lambda snapshot: EnergyStar52(snapshot).equation_one(),
+        ('Energy Star 5.2', 'P_TEC'): lambda snapshot: EnergyStar52(snapshot).equation_three(),
+        ('Energy Star 6.0', 'E_TEC'): lambda snapshot: EnergyStar60(snapshot).equation_one(),
+        ('Energy Star 6.0', 'P_TEC'): lambda snapshot: EnergyStar60(snapshot).equation_four(),
+        ('Energy Star 7.0', 'E_TEC'): lambda snapshot: EnergyStar70(snapshot).equation_one(),
+        ('Energy Star 8.0', 'E_TEC'): lambda snapshot: EnergyStar80(snapshot).equation_one(),
+        ('ErP Lot 3', 'E_TEC'): lambda snapshot: ErPLot3_2016(snapshot).get_E_TEC(),
+        ('ErP Lot 3', 'E_TEC_WOL'): lambda snapshot: ErPLot3_2016(snapshot).get_E_TEC_WOL()}
+
+
+def _value(standard, quantity):
+    if (standard, quantity) in _VALUES:
+        return _VALUES[(standard, quantity)]
+    name = MODES[DIRECT[quantity]]
+    return lambda snapshot: getattr(snapshot, name)
+
+
+class IncrementalEvaluator:
+    """Results of one configuration for any measured mode powers
+
+    The set of results of notebooks depends on the long idle power, as ErP
+    Lot 3 and Lot 26 only apply on either side of 6 W, so the maximums are
+    kept for each side once it is seen.  Only the results of standards are
+    kept if it is given."""
+    def __init__(self, snapshot, standards=None):
+        self.snapshot = snapshot
+        self.standards = standards
+        self.fields = dict((name, getattr(snapshot, name))
+                           for name in SystemSnapshot.__slots__)
+        self.stages = {}
+        self.evaluations = 0
+        self._results = self._evaluate(snapshot)
+
+    @classmethod
+    def from_profile(cls, profile, standards=None):
+        return cls(SystemSnapshot.from_profile(profile), standards)
+
+    def _stage(self, snapshot):
+        """(value functions, [(value index, other fields, maximum)])"""
+        key = (erplot3_applicable(snapshot), erplot26_applicable(snapshot))
+        if key not in self.stages:
+            results = evaluate(snapshot)
+            self.evaluations = self.evaluations + 1
+            debug("Incremental: allowances of %s evaluated" % (key,))
+            names = []
+            entries = []
+            for result in results:
+                if self.standards is not None and result.standard not in self.standards:
+                    continue
+                name = (result.standard, result.quantity)
+                if name not in names:
+                    names.append(name)
+                entries.append((names.index(name), tuple(result)[:7],
+                                result.maximum))
+            self.stages[key] = ([_value(*name) for name in names], entries)
+        return self.stages[key]
+
+    def _evaluate(self, snapshot):
+        (functions, entries) = self._stage(snapshot)
+        values = [function(snapshot) for function in functions]
+        return [Result._make(fields + (values[index], maximum))
+                for (index, fields, maximum) in entries]
+
+    def results(self):
+        return self._results
+
+    def update(self, **powers):
+        """Results with the fields of SystemSnapshot in MEASUREMENTS changed
+
+        Without Wake-on-LAN the WOL powers of computers follow the others
+        the same way as in SysInfo."""
+        for name in powers:
+            if name not in MEASUREMENTS.values():
+                raise KeyError("'%s' is not a power measurement." % name)
+        fields = self.fields
+        fields.update(powers)
+        if fields['product_type'] == 1 and not fields['wol']:
+            fields['off_wol'] = fields['off']
+            fields['sleep_wol'] = fields['sleep']
+        self.snapshot = SystemSnapshot(**fields)
+        self._results = self._evaluate(self.snapshot)
+        return self._results
+
+    def update_profile(self, measurements):
+        """update() with the profile keys, e.g. {'Short Idle Mode': 8.5}"""
+        unknown = [key for key in measurements if key not in MEASUREMENTS]
+        if unknown:
+            raise KeyError("'%s' is not a power measurement." % unknown[0])
+        return self.update(**dict((MEASUREMENTS[key], value)
+                                  for (key, value) in measurements.items()))
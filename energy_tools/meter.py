@@ -0,0 +1,311 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Average mode powers from the sample logs of a power meter
+
+A log is either a CSV file with a timestamp, a power and an optional state
+column, or a binary file of fixed size records.  It is read CHUNK_SIZE
+samples at a time, a binary log through a memory map, and the sums of every
+mode window are accumulated with NumPy, so the memory doesn't grow with the
+size of the log.
+
+A window is either a [start, stop) range of timestamps or the samples whose
+state marker matches.  The average of the window is the mean of its
+samples, so the meter is expected to sample at a fixed rate."""
+
+import csv
+import itertools
+import json
+import os
+import sys
+from logging import debug, info, error
+
+import numpy as np
+
+__all__ = [
+        "MODES",
+        "CHUNK_SIZE",
+        "parse_window",
+        "parse_marker",
+        "record_dtype",
+        "read_csv",
+        "read_binary",
+        "Windows",
+        "ingest",
+        "process"]
+
+# The profile keys of the mode powers and their default state markers
+MODES = {
+        'Off Mode': 'off',
+        'Off Mode with WOL': 'off_wol',
+        'Sleep Mode': 'sleep',
+        'Sleep Mode with WOL': 'sleep_wol',
+        'Long Idle Mode': 'long_idle',
+        'Short Idle Mode': 'short_idle'}
+
+CHUNK_SIZE = 65536
+
+RECORD = '<f8,<f4'
+
+BINARY_EXTENSIONS = ('.bin', '.dat', '.raw')
+
+
+def _mode(key):
+    key = key.strip()
+    if key not in MODES:
+        raise ValueError("'%s' is not one of %s." % (key, ', '.join(MODES)))
+    return key
+
+
+def _seconds(values):
+    """Timestamps in seconds, either numbers or ISO 8601 date and time"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        pass
+    try:
+        stamps = np.asarray(values, dtype='datetime64[us]')
+    except ValueError:
+        raise ValueError("%s is not a timestamp." % values[0])
+    return stamps.astype(np.int64) / 1e6
+
+
+def parse_window(spec):
+    """'Off Mode=start:stop' or 'Off Mode=start/stop' to (key, start, stop)
+
+    start and stop are seconds, or ISO 8601 date and time separated by '/',
+    and stop is excluded."""
+    (key, sep, window) = spec.partition('=')
+    (start, slash, stop) = window.partition('/' if '/' in window else ':')
+    if not sep or not slash or not start or not stop:
+        raise ValueError("'%s' is not 'Mode=start:stop' or 'Mode=start/stop'." % spec)
+    (start, stop) = _seconds([start.strip(), stop.strip()])
+    if stop <= start:
+        raise ValueError("'%s' is an empty window." % spec)
+    return (_mode(key), float(start), float(stop))
+
+
+def parse_marker(spec):
+    """'Off Mode=value' to (key, value) of the state column"""
+    (key, sep, marker) = spec.partition('=')
+    if not sep or not marker.strip():
+        raise ValueError("'%s' is not 'Mode=marker'." % spec)
+    return (_mode(key), marker.strip())
+
+
+def record_dtype(spec=RECORD):
+    """NumPy dtype of 'time,power[,state]' records, e.g. '<f8,<f4,<u1'"""
+    types = [field.strip() for field in spec.split(',')]
+    if len(types) not in (2, 3):
+        raise ValueError("'%s' is not 'time,power' or 'time,power,state'." % spec)
+    try:
+        return np.dtype(list(zip(('time', 'power', 'state'), types)))
+    except TypeError as err:
+        raise ValueError("'%s' is not a record: %s" % (spec, err))
+
+
+def _number(field):
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+
+def _column(header, name, default):
+    if name is None:
+        return default if default < len(header) else None
+    if name.isdigit():
+        return int(name)
+    lowered = [field.strip().lower() for field in header]
+    if name.lower() not in lowered:
+        raise ValueError("There is no '%s' column." % name)
+    return lowered.index(name.lower())
+
+
+def read_csv(filename, chunk_size=CHUNK_SIZE, time_column=None,
+             power_column=None, state_column=None):
+    """Yield (times, powers, states) of every chunk of a CSV log
+
+    The columns are looked up by name or index and default to the first
+    three columns.  A first row with any number is data, not a header.
+    states is None without a state column."""
+    with open(filename, 'r', newline='') as data:
+        reader = csv.reader(data)
+        header = next(reader, None)
+        if header is None:
+            return
+        rows = reader
+        if any(_number(field) for field in header):
+            rows = itertools.chain([header], reader)
+            header = [str(i) for i in range(len(header))]
+        columns = (_column(header, time_column, 0),
+                   _column(header, power_column, 1),
+                   _column(header, state_column, 2))
+        debug("%s: columns %s" % (filename, columns))
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            try:
+                times = _seconds([row[columns[0]] for row in chunk])
+                powers = np.asarray([row[columns[1]] for row in chunk],
+                                    dtype=np.float64)
+                states = None
+                if columns[2] is not None:
+                    states = np.asarray([row[columns[2]].strip()
+                                         for row in chunk])
+            except IndexError:
+                raise ValueError("%s: a row misses some columns." % filename)
+            yield (times, powers, states)
+
+
+def read_binary(filename, dtype=None, chunk_size=CHUNK_SIZE):
+    """Yield (times, powers, states) of every chunk of a binary log
+
+    The log is memory-mapped and holds records of dtype with 'time' in
+    seconds, 'power' in Watts and an optional integer 'state'."""
+    if dtype is None:
+        dtype = record_dtype()
+    size = os.path.getsize(filename)
+    if size % dtype.itemsize:
+        raise ValueError("%s is not made of %d bytes records." % (filename, dtype.itemsize))
+    if not size:
+        return
+    records = np.memmap(filename, dtype=dtype, mode='r')
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        states = None
+        if 'state' in dtype.names:
+            states = chunk['state'].astype(str)
+        yield (chunk['time'].astype(np.float64),
+               chunk['power'].astype(np.float64), states)
+
+
+class Windows:
+    """Sums and counts of the samples of every mode window"""
+    def __init__(self, windows=(), markers=()):
+        self.keys = [key for (key, start, stop) in windows]
+        self.starts = np.array([start for (key, start, stop) in windows],
+                               dtype=np.float64)
+        self.stops = np.array([stop for (key, start, stop) in windows],
+                              dtype=np.float64)
+        self.markers = dict((marker, key) for (key, marker) in markers)
+        self.keys.extend(key for (key, marker) in markers
+                         if key not in self.keys)
+        if len(set(key for (key, start, stop) in windows)) != len(windows):
+            raise ValueError("A mode has more than one window.")
+        for (key, marker) in markers:
+            if key in self.keys[:len(windows)]:
+                # A sample in the window with the marker would be counted twice.
+                raise ValueError("%s has both a window and a marker." % key)
+        self.sums = np.zeros(len(self.keys))
+        self.counts = np.zeros(len(self.keys), dtype=np.int64)
+
+    def add(self, times, powers, states=None):
+        """Accumulate one chunk of samples"""
+        if len(self.starts):
+            (ordered, weights) = (times, powers)
+            if np.any(times[1:] < times[:-1]):
+                order = np.argsort(times, kind='stable')
+                (ordered, weights) = (times[order], powers[order])
+            sums = np.concatenate(([0.0], np.cumsum(weights)))
+            low = np.searchsorted(ordered, self.starts, 'left')
+            high = np.searchsorted(ordered, self.stops, 'left')
+            self.sums[:len(low)] += sums[high] - sums[low]
+            self.counts[:len(low)] += high - low
+        if self.markers and states is not None:
+            (values, inverse) = np.unique(states, return_inverse=True)
+            index = np.array([self.keys.index(self.markers[value])
+                              if value in self.markers else len(self.keys)
+                              for value in values.tolist()], dtype=np.int64)
+            slots = index[inverse]
+            self.sums += np.bincount(slots, weights=powers,
+                                     minlength=len(self.keys) + 1)[:-1]
+            self.counts += np.bincount(slots,
+                                       minlength=len(self.keys) + 1)[:-1]
+
+    def averages(self):
+        """{profile key: average power} of the windows with samples"""
+        return dict((key, float(total / count)) for (key, total, count)
+                    in zip(self.keys, self.sums, self.counts) if count)
+
+
+def ingest(filename, windows=(), markers=None, binary=None, dtype=None,
+           chunk_size=CHUNK_SIZE, **columns):
+    """{profile key: average power} of a power meter log
+
+    The windows are (key, start, stop) and the markers (key, state) which
+    default to MODES if no window is given."""
+    if markers is None:
+        markers = () if windows else [(key, marker) for (key, marker)
+                                      in MODES.items()]
+    accumulator = Windows(windows, markers)
+    if binary is None:
+        binary = os.path.splitext(filename)[1].lower() in BINARY_EXTENSIONS
+    if binary:
+        chunks = read_binary(filename, dtype, chunk_size)
+    else:
+        chunks = read_csv(filename, chunk_size, **columns)
+    samples = 0
+    for (times, powers, states) in chunks:
+        accumulator.add(times, powers, states)
+        samples = samples + len(powers)
+    debug("%s: %d samples" % (filename, samples))
+    averages = accumulator.averages()
+    for (key, start, stop) in windows:
+        if key not in averages:
+            raise ValueError("%s has no sample in [%s, %s)." % (key, start, stop))
+    if not averages:
+        raise ValueError("%s has no sample of any mode." % filename)
+    return averages
+
+
+def process(args):
+    try:
+        windows = [parse_window(spec) for spec in args.window or ()]
+        markers = None
+        if args.marker:
+            markers = [parse_marker(spec) for spec in args.marker]
+        dtype = record_dtype(args.record) if args.record else None
+        profile = {}
+        if args.profile:
+            with open(args.profile, 'r') as data:
+                profile = json.load(data)
+        averages = ingest(args.log, windows, markers,
+                          binary=True if args.record else None, dtype=dtype,
+                          chunk_size=args.chunk or CHUNK_SIZE,
+                          time_column=args.time_column,
+                          power_column=args.power_column,
+                          state_column=args.state_column)
+    except (OSError, ValueError) as err:
+        error(str(err))
+        return 1
+
+    for (key, value) in averages.items():
+        info("%s: %.3f W" % (key, value))
+    profile.update(averages)
+    text = json.dumps(profile, sort_keys=True, indent=4,
+                      separators=(',', ': ')) + '\n'
+    if args.output and args.output != '-':
+        with open(args.output, 'w') as data:
+            data.write(text)
+        info('The profile is saved to "%s".' % args.output)
+    else:
+        sys.stdout.write(text)
+    return 0
@@ -0,0 +1,512 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Hardware probe reading /proc and /sys directly"""
+
+import os
+import re
+import struct
+import threading
+import time
+from collections import namedtuple
+from logging import debug, warning
+from .timing import section, timed
+
+__all__ = ["Probe", "EEEInfo", "decode_dtd", "parse_show_eee"]
+
+DISK_PATTERNS = ('sd', 'nvme', 'emmc')
+
+# Connector types of the built-in panel in /sys/class/drm/card*-<type>-*
+INTERNAL_CONNECTORS = ('eDP', 'LVDS', 'DSI')
+
+EDID_HEADER = b'\x00\xff\xff\xff\xff\xff\xff\x00'
+
+SIOCETHTOOL = 0x8946
+ETHTOOL_GEEE = 0x44
+ETHTOOL_GLINKSETTINGS = 0x4c
+
+# Bits of the legacy link mode masks of struct ethtool_eee
+EEE_LINK_MODES = {
+        3: 100,     # 100baseT/Full
+        5: 1000,    # 1000baseT/Full
+        12: 10000}  # 10000baseT/Full
+
+# Bits of the link mode bitmap which struct ethtool_eee can't hold
+LINK_MODE_2500BASET_FULL = 47
+LINK_MODE_5000BASET_FULL = 48
+
+# struct ethtool_link_settings without the link mode masks
+LINK_SETTINGS = struct.Struct('=2I12B7I')
+
+# Seconds to wait for each probe in Probe.prefetch()
+PROBE_TIMEOUT = 5.0
+
+# The value used in place of a probe which timed out
+PROBE_FALLBACKS = {
+        'cpuinfo': [],
+        'mounts': [],
+        'disks': [],
+        'memory': 0.0,
+        'edid': (None, []),
+        'ethernet': {},
+        'wol': False}
+
+
+def decode_dtd(block):
+    """(width, height, width_mm, height_mm) of a Detailed Timing Descriptor"""
+    width = ((block[4] >> 4) << 8) | block[2]
+    height = ((block[7] >> 4) << 8) | block[5]
+    width_mm = ((block[14] >> 4) << 8) | block[12]
+    height_mm = ((block[14] & 0x0f) << 8) | block[13]
+    return (width, height, width_mm, height_mm)
+
+
+class EEEInfo(namedtuple('EEEInfo', ['device', 'enabled', 'active',
+                                     'speeds', 'source'])):
+    """Energy-Efficient Ethernet state of one interface
+
+    speeds are the supported EEE link modes in Mb/s in the order they are
+    listed and source is 'ioctl' or 'ethtool'."""
+    __slots__ = ()
+
+    @property
+    def speed_class(self):
+        """'10G', '1~10G', '1G' or None if EEE is disabled
+
+        The first listed link mode of 1G or above decides, as the
+        `ethtool --show-eee` parsing always did."""
+        if not self.enabled:
+            return None
+        for speed in self.speeds:
+            if speed >= 10000:
+                return '10G'
+            elif speed > 1000:
+                return '1~10G'
+            elif speed == 1000:
+                return '1G'
+        return None
+
+
+def _ethtool_ioctl(dev, data):
+    """Issue SIOCETHTOOL on the interface and return the updated data"""
+    import array
+    import fcntl
+    import socket
+    buf = array.array('B', data)
+    (address, length) = buf.buffer_info()
+    ifreq = struct.pack('16sP', dev.encode(), address).ljust(40, b'\0')
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        fcntl.ioctl(sock.fileno(), SIOCETHTOOL, ifreq)
+    return buf.tobytes()
+
+
+def _link_modes(dev):
+    """Supported link modes of ETHTOOL_GLINKSETTINGS as one integer"""
+    request = [ETHTOOL_GLINKSETTINGS] + [0] * 20
+    data = _ethtool_ioctl(dev, LINK_SETTINGS.pack(*request))
+    # The kernel answers the handshake with -nwords.
+    nwords = -struct.unpack_from('b', data, 15)[0]
+    if nwords <= 0:
+        return 0
+    request[9] = nwords
+    data = _ethtool_ioctl(dev, LINK_SETTINGS.pack(*request) + bytes(12 * nwords))
+    words = struct.unpack_from('%dI' % nwords, data, LINK_SETTINGS.size)
+    return sum(word << (32 * i) for (i, word) in enumerate(words))
+
+
+def parse_show_eee(dev, output):
+    """EEEInfo from the text of `ethtool --show-eee`"""
+    enabled = False
+    active = False
+    speeds = []
+    section = None
+    for line in output.splitlines():
+        (key, sep, value) = line.partition(':')
+        if sep:
+            section = key.strip()
+            if section == 'EEE status':
+                enabled = value.strip().startswith('enabled')
+                active = value.strip().endswith(' active')
+        if section == 'Supported EEE link modes':
+            speeds.extend(int(speed)
+                          for speed in re.findall(r'\b(\d+)baseT/Full', line)
+                          if int(speed) not in speeds)
+    return EEEInfo(dev, enabled, active, tuple(speeds), 'ethtool')
+
+
+def _dtd_blocks(content):
+    """Yield all 18-byte Detailed Timing Descriptors of an EDID
+
+    Display descriptors (pixel clock 0) in the base block are skipped and
+    the DTDs of CTA-861 extension blocks are included."""
+    for offset in (0x36, 0x48, 0x5a, 0x6c):
+        block = content[offset:offset + 18]
+        if len(block) == 18 and (block[0] or block[1]):
+            yield block
+    for base in range(128, len(content) - 127, 128):
+        if content[base] != 0x02:
+            continue
+        start = content[base + 2]
+        if start < 4:
+            continue
+        for offset in range(base + start, base + 127 - 17, 18):
+            block = content[offset:offset + 18]
+            if not (block[0] or block[1]):
+                break
+            yield block
+
+
+def _concurrently(function, items):
+    """[function(item) for item in items] in one daemon thread per item
+
+    A daemon thread stuck in a hung read doesn't block the exit of the
+    interpreter like the threads of a ThreadPoolExecutor."""
+    results = [None] * len(items)
+    errors = []
+
+    def run(index, item):
+        try:
+            results[index] = function(item)
+        except Exception as err:
+            errors.append(err)
+    threads = [threading.Thread(target=run, args=(index, item), daemon=True)
+               for (index, item) in enumerate(items)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+class Probe:
+    """Parse /proc/cpuinfo, /proc/mounts and /sys/block once each"""
+    def __init__(self, root='/'):
+        self.root = root
+        self._cpuinfo = None
+        self._mounts = None
+        self._disks = None
+        self._memory = None
+        self._edid = None
+        self._ethernet = None
+        self._wol = None
+        self._memory_layout = None
+
+    def _path(self, *names):
+        return os.path.join(self.root, *names)
+
+    # The _load_* methods return what they read without storing it, so a
+    # probe is only cached by the thread which decides to use it.
+
+    def _load_cpuinfo(self):
+        with section('probe.cpuinfo'):
+            cpuinfo = []
+            with open(self._path('proc', 'cpuinfo'), 'r') as data:
+                for line in data:
+                    (key, sep, value) = line.partition(':')
+                    if sep:
+                        cpuinfo.append((key.strip(), value.strip()))
+            debug("Parsed %d lines of /proc/cpuinfo" % len(cpuinfo))
+        return cpuinfo
+
+    @property
+    def cpuinfo(self):
+        """List of (key, value) pairs of /proc/cpuinfo"""
+        if self._cpuinfo is None:
+            self._cpuinfo = self._load_cpuinfo()
+        return self._cpuinfo
+
+    def _load_mounts(self):
+        with section('probe.mounts'):
+            with open(self._path('proc', 'mounts'), 'r') as data:
+                return data.read().splitlines()
+
+    @property
+    def mounts(self):
+        """List of lines of /proc/mounts
+
+        PermissionError is raised if /proc/mounts can not be read, e.g. in
+        a snap without the mount-observe interface."""
+        if self._mounts is None:
+            self._mounts = self._load_mounts()
+        return self._mounts
+
+    def _load_disks(self):
+        with section('probe.disks'):
+            return sorted(disk for disk in os.listdir(self._path('sys', 'block'))
+                          if any(pattern in disk for pattern in DISK_PATTERNS))
+
+    @property
+    def disks(self):
+        """Sorted block devices which look like SATA, NVMe or eMMC disks"""
+        if self._disks is None:
+            self._disks = self._load_disks()
+        return self._disks
+
+    def _values(self, key):
+        return [value for (name, value) in self.cpuinfo if name == key]
+
+    def cpu_vendor(self):
+        """'intel', 'amd' or 'unknown'"""
+        for value in self._values('vendor_id'):
+            found = re.search('(intel|amd)', value, re.IGNORECASE)
+            if found:
+                return found.group(1).lower()
+        return 'unknown'
+
+    def cpu_cores(self):
+        """Cores per package, or None if /proc/cpuinfo doesn't tell"""
+        cores = set(int(value) for value in self._values('cpu cores'))
+        if not cores:
+            return None
+        return max(cores)
+
+    def cpu_clock(self):
+        """Nominal clock in GHz from the model name, or None if unknown"""
+        for (name, value) in self.cpuinfo:
+            found = re.search('([0-9.]+)GHz', value)
+            if found:
+                return float(found.group(1))
+        return None
+
+    def is_system_disk(self, disk):
+        """True if the disk hosts a boot mount point"""
+        return any(disk in line and 'boot' in line for line in self.mounts)
+
+    def _load_memory(self):
+        with section('probe.memory'):
+            from pathlib import Path
+            memory = self._path('sys', 'devices', 'system', 'memory')
+            total_online = 0
+            for online in Path(memory).glob('*/online'):
+                with open(online, 'r') as data:
+                    if data.read().strip() == '1':
+                        total_online = total_online + 1
+            with open(os.path.join(memory, 'block_size_bytes')) as data:
+                block_size = int(data.read().strip(), 16)
+            return block_size * total_online / 1024 / 1024 / 1024
+
+    def mem_size(self):
+        """Online memory in GB from /sys/devices/system/memory"""
+        if self._memory is None:
+            self._memory = self._load_memory()
+        return self._memory
+
+    def memory_layout(self):
+        """smbios.MemoryLayout of /sys/firmware/dmi/tables
+
+        The tables are readable by root only, so PermissionError is raised
+        for other users."""
+        if self._memory_layout is None:
+            with section('probe.smbios'):
+                from . import smbios
+                tables = self._path('sys', 'firmware', 'dmi', 'tables')
+                length = None
+                try:
+                    with open(os.path.join(tables, 'smbios_entry_point'), 'rb') as data:
+                        length = smbios.entry_point_length(data.read())
+                except FileNotFoundError:
+                    pass
+                with open(os.path.join(tables, 'DMI'), 'rb') as data:
+                    structures = smbios.parse(data.read(), length)
+                self._memory_layout = smbios.memory_layout(structures)
+                debug(self._memory_layout)
+        return self._memory_layout
+
+    def ethernet_devices(self):
+        return sorted(dev for dev in os.listdir(self._path('sys', 'class', 'net'))
+                      if dev.startswith('eth') or dev.startswith('en'))
+
+    def _load_wol(self):
+        with section('probe.wol'):
+            for dev in self.ethernet_devices():
+                wakeup = self._path('sys', 'class', 'net', dev,
+                                    'device', 'power', 'wakeup')
+                debug("Checking " + wakeup)
+                if os.path.exists(wakeup):
+                    with open(wakeup, 'r') as data:
+                        if 'enabled' in data.read():
+                            return True
+        return False
+
+    def wake_on_lan(self):
+        """True if any Ethernet device has wakeup enabled"""
+        if self._wol is None:
+            self._wol = self._load_wol()
+        return self._wol
+
+    def _eee_ioctl(self, dev):
+        data = _ethtool_ioctl(dev, struct.pack('10I', ETHTOOL_GEEE, *[0] * 9))
+        (supported, advertised, lp_advertised, active, enabled) = \
+            struct.unpack_from('5I', data, 4)
+        speeds = tuple(speed for (bit, speed) in sorted(EEE_LINK_MODES.items())
+                       if supported & (1 << bit))
+        return EEEInfo(dev, bool(enabled), bool(active), speeds, 'ioctl')
+
+    @timed('probe.ethtool')
+    def _eee_ethtool(self, dev):
+        import subprocess
+        try:
+            output = subprocess.check_output(
+                ['ethtool', '--show-eee', dev], encoding='utf8',
+                stderr=subprocess.STDOUT, timeout=PROBE_TIMEOUT)
+        except (OSError, subprocess.SubprocessError) as err:
+            debug(err)
+            warning("`ethtool --show-eee " + dev
+                    + "` failed. Please check it.")
+            return None
+        return parse_show_eee(dev, output)
+
+    @timed('probe.eee')
+    def eee(self, dev):
+        """EEEInfo of the interface, or None if it can not be detected
+
+        ETHTOOL_GEEE is used first.  `ethtool --show-eee` is the fallback
+        if the ioctl fails, or if the device has 2.5G/5G link modes which
+        the legacy EEE masks can't report."""
+        try:
+            eee = self._eee_ioctl(dev)
+        except OSError as err:
+            debug("ETHTOOL_GEEE on %s failed: %s" % (dev, err))
+            return self._eee_ethtool(dev)
+        if eee.enabled and eee.speed_class != '10G':
+            try:
+                modes = _link_modes(dev)
+            except OSError as err:
+                debug("ETHTOOL_GLINKSETTINGS on %s failed: %s" % (dev, err))
+                modes = 0
+            if modes & (1 << LINK_MODE_2500BASET_FULL
+                        | 1 << LINK_MODE_5000BASET_FULL):
+                return self._eee_ethtool(dev) or eee
+        debug(eee)
+        return eee
+
+    def _load_ethernet(self):
+        with section('probe.ethernet'):
+            devices = self.ethernet_devices()
+            return dict(zip(devices, _concurrently(self.eee, devices)))
+
+    def ethernet(self):
+        """Dictionary of Ethernet devices to their EEEInfo
+
+        The devices are queried concurrently."""
+        if self._ethernet is None:
+            self._ethernet = self._load_ethernet()
+        return self._ethernet
+
+    @timed('probe.prefetch')
+    def prefetch(self, probes, timeout=PROBE_TIMEOUT):
+        """Run the named probes concurrently before they are asked for
+
+        A probe which doesn't finish within the timeout is replaced by its
+        fallback in PROBE_FALLBACKS and its late result is dropped, so a
+        value never changes once it is read.  The probes run in daemon
+        threads, so a hung read doesn't block the exit either.  A probe
+        which fails is left alone, so the error is raised again when the
+        value is used."""
+        if not probes:
+            return
+        start = time.monotonic()
+        lock = threading.Lock()
+        finished = {}
+        expired = []
+
+        def run(probe):
+            try:
+                outcome = (getattr(self, '_load_' + probe)(), None)
+            except Exception as err:
+                outcome = (None, err)
+            with lock:
+                if not expired:
+                    finished[probe] = outcome
+
+        threads = [threading.Thread(target=run, args=(probe,), daemon=True,
+                                    name='probe-' + probe)
+                   for probe in probes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(max(0.0, start + timeout - time.monotonic()))
+        with lock:
+            expired.append(True)
+        for probe in probes:
+            if probe not in finished:
+                warning("Probing %s timed out after %s seconds." % (probe, timeout))
+                setattr(self, '_' + probe, PROBE_FALLBACKS[probe])
+                continue
+            (value, err) = finished[probe]
+            if err is not None:
+                debug("%s probe failed: %s" % (probe, err))
+            else:
+                setattr(self, '_' + probe, value)
+        debug("Probed %s in %.3f seconds" % (', '.join(probes),
+                                             time.monotonic() - start))
+
+    def _drm_connectors(self):
+        """EDID files of the DRM connectors, the connected internal panel first"""
+        candidates = []
+        drm = self._path('sys', 'class', 'drm')
+        if not os.path.isdir(drm):
+            return candidates
+        for connector in sorted(os.listdir(drm)):
+            edid = os.path.join(drm, connector, 'edid')
+            if not os.path.exists(edid):
+                continue
+            try:
+                with open(os.path.join(drm, connector, 'status'), 'r') as data:
+                    connected = data.read().strip() == 'connected'
+            except OSError:
+                connected = False
+            internal = connector.partition('-')[2].startswith(INTERNAL_CONNECTORS)
+            candidates.append((not connected, not internal, edid))
+        return [edid for (_, _, edid) in sorted(candidates)]
+
+    def _read_edid(self, edids):
+        for edid in edids:
+            with open(edid, 'rb') as data:
+                content = data.read()
+            if content.startswith(EDID_HEADER):
+                return (edid, content)
+        return None
+
+    def _load_edid(self):
+        with section('probe.edid'):
+            found = self._read_edid(self._drm_connectors())
+            if found is None:
+                from pathlib import Path
+                debug("No EDID in /sys/class/drm, looking into /sys/devices")
+                found = self._read_edid(
+                    Path(self._path('sys', 'devices')).glob('**/edid'))
+            if found is None:
+                return (None, [])
+            (edid, content) = found
+            return (edid, [decode_dtd(block) for block in _dtd_blocks(content)])
+
+    def edid(self):
+        """(path, timings) of the first valid EDID, or None if not found
+
+        timings are the decoded Detailed Timing Descriptors in EDID order, so
+        the first one is the preferred timing.  /sys/class/drm is checked
+        first and the whole /sys/devices tree is only walked as a fallback.
+        The result is cached."""
+        if self._edid is None:
+            self._edid = self._load_edid()
+        if self._edid[0] is None:
+            return None
+        return self._edid
@@ -0,0 +1,333 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Coefficient tables of the standards
+
+RULES maps every standard to its tables and every table maps a product form
+('desktop', 'integrated desktop', 'notebook', 'workstation', 'small-scale
+server' or 'thin client', with ' discrete' for discrete graphics) to its
+coefficients.  A form missing from a table has no such allowance.
+
+The tables are compiled when the module is loaded: the bands become sorted
+bounds for bisect and the graphics adders become dicts of G1~G7, so the
+calculators only look them up.  The calculators keep the shape of the
+equations, so the results are the same as the written-out branches."""
+
+from bisect import bisect_left
+from math import tanh
+
+__all__ = [
+        "GPU_CATEGORIES",
+        "Bands",
+        "Linear",
+        "Tanh",
+        "Display",
+        "adders",
+        "RULES"]
+
+GPU_CATEGORIES = ('G1', 'G2', 'G3', 'G4', 'G5', 'G6', 'G7')
+
+
+class Bands:
+    """Value of the first band whose bound holds for x
+
+    Every band is (operator, bound, value) with '<=' or '<' as the operator
+    and the last band is (None, None, value) for everything above."""
+    __slots__ = ('bounds', 'open', 'values')
+
+    def __init__(self, *bands):
+        (bounds, opened, values) = ([], [], [])
+        for (operator, bound, value) in bands[:-1]:
+            if operator not in ('<=', '<'):
+                raise ValueError("Unknown operator %s" % operator)
+            if bounds and bound < bounds[-1]:
+                raise ValueError("The bounds %s are not sorted." % (bounds + [bound]))
+            bounds.append(bound)
+            opened.append(operator == '<')
+            values.append(value)
+        if bands[-1][0] is not None:
+            raise ValueError("The last band %s is not open-ended." % (bands[-1],))
+        values.append(bands[-1][2])
+        self.bounds = tuple(bounds)
+        self.open = tuple(opened)
+        self.values = tuple(values)
+
+    def index(self, x):
+        i = bisect_left(self.bounds, x)
+        while i < len(self.bounds) and self.open[i] and x == self.bounds[i]:
+            i = i + 1
+        return i
+
+    def __call__(self, x):
+        return self.values[self.index(x)]
+
+    def __repr__(self):
+        return 'Bands(bounds=%s, open=%s, values=%s)' % (self.bounds, self.open, self.values)
+
+
+class Linear:
+    """intercept + slope * (x - offset), or floor when x <= offset"""
+    __slots__ = ('intercept', 'slope', 'offset', 'floor')
+
+    def __init__(self, intercept, slope, offset=0, floor=None):
+        self.intercept = intercept
+        self.slope = slope
+        self.offset = offset
+        self.floor = floor
+
+    def __call__(self, x):
+        if self.floor is not None and x <= self.offset:
+            return self.floor
+        return self.intercept + self.slope * (x - self.offset)
+
+
+class Tanh:
+    """scale * tanh(slope * FB_BW - shift) + base of the frame buffer bandwidth"""
+    __slots__ = ('scale', 'slope', 'shift', 'base')
+
+    def __init__(self, scale, slope, shift, base):
+        self.scale = scale
+        self.slope = slope
+        self.shift = shift
+        self.base = base
+
+    def __call__(self, fb_bw):
+        return self.scale * tanh(self.slope * fb_bw - self.shift) + self.base
+
+
+class Display:
+    """factor * (1 + EP) * (x_r * r + x_A * A + constant) by the screen area A
+
+    Every band is (operator, bound, (factor, x_r, x_A, constant)) as Bands."""
+    __slots__ = ('bands',)
+
+    def __init__(self, *bands):
+        self.bands = Bands(*bands)
+
+    def __call__(self, EP, r, A):
+        (factor, x_r, x_A, constant) = self.bands(A)
+        return factor * (1 + EP) * (x_r * r + x_A * A + constant)
+
+
+def adders(*values):
+    """{'G1': value, ..., 'G7': value}"""
+    if len(values) != len(GPU_CATEGORIES):
+        raise ValueError("%s are not the adders of G1~G7." % (values,))
+    return dict(zip(GPU_CATEGORIES, values))
+
+
+def _above(value):
+    return (None, None, value)
+
+
+# TEC_EEE of Energy Star 6.0 and 7.0, 8.76 * P_EEE * (T_LONG_IDLE + T_SHORT_IDLE)
+_EEE_DESKTOP = 8.76 * 0.2 * (0.15 + 0.35)
+_EEE_NOTEBOOK = 8.76 * 0.2 * (0.10 + 0.30)
+
+_DISPLAY_ESTAR6 = Display(_above((8.76 * 0.35, 4, 0.05, 0)))
+
+_DISPLAY_ESTAR8 = Display(('<', 190, (1, 3.43, 0.148, 1.30)),
+                          ('<', 210, (1, 3.43, 0.018, 26.1)),
+                          ('<', 315, (1, 3.43, 0.078, 13.2)),
+                          _above((1, 3.43, 0.156, -11.3)))
+
+RULES = {
+        'Energy Star 5.2': {
+            'T': {
+                'desktop': (0.55, 0.05, 0.4),
+                'notebook': (0.6, 0.1, 0.3)},
+            'P_TEC_T': {
+                'workstation': (0.35, 0.10, 0.55)},
+            # Categories A~D
+            'TEC_BASE': {
+                'desktop': {'A': 148.0, 'B': 175.0, 'C': 209.0, 'D': 234.0},
+                'notebook': {'A': 40.0, 'B': 53.0, 'C': 88.5}},
+            'TEC_MEMORY': {
+                'desktop': {'A': Linear(0, 1.0, 2, 0.0), 'B': Linear(0, 1.0, 2, 0.0),
+                            'C': Linear(0, 1.0, 2, 0.0), 'D': Linear(0, 1.0, 4, 0.0)},
+                'notebook': dict.fromkeys('ABC', Linear(0, 0.4, 4, 0.0))},
+            # (TEC_GRAPHICS, TEC_GRAPHICS of frame buffer width > 128 bits
+            # for desktops or > 64 bits for notebooks)
+            'TEC_GRAPHICS': {
+                'desktop': {'A': (35.0, 50.0), 'B': (35.0, 50.0),
+                            'C': (0.0, 50.0), 'D': (0.0, 50.0)},
+                'notebook': {'A': (0.0, 0.0), 'B': (0.0, 3.0), 'C': (0.0, 0.0)}},
+            'TEC_STORAGE': {
+                'desktop': Linear(0, 25.0, 1, 0.0),
+                'notebook': Linear(0, 3.0, 1, 0.0)},
+            # (P_OFF_BASE, P_OFF_WOL)
+            'P_OFF': {
+                'small-scale server': (2.0, 0.7),
+                'thin client': (2.0, 0.7)},
+            # (P_SLEEP_BASE, P_SLEEP_WOL)
+            'P_SLEEP': {
+                'thin client': (2.0, 0.7)},
+            'P_IDLE_MAX': {
+                'small-scale server': {'A': 50.0, 'B': 65.0}}},
+        'Energy Star 6.0': {
+            'T': {
+                'desktop': (0.45, 0.05, 0.15, 0.35),
+                'notebook': (0.25, 0.35, 0.1, 0.3)},
+            'P_TEC_T': {
+                'workstation': (0.35, 0.10, 0.15, 0.40)},
+            'TEC_BASE': {
+                'desktop': Bands(('<=', 3, 69.0), ('<=', 6, 112.0), ('<=', 7, 120.0), _above(135.0)),
+                'desktop discrete': Bands(('<=', 3, 69.0), ('<=', 9, 115.0), _above(135.0)),
+                'notebook': Bands(('<=', 2, 14.0), ('<=', 5.2, 22.0), ('<=', 8, 24.0), _above(28.0)),
+                'notebook discrete': Bands(('<=', 2, 14.0), ('<=', 9, 16.0), _above(18.0)),
+                'thin client': 60},
+            'TEC_MEMORY': {
+                'desktop': Linear(0, 0.8),
+                'notebook': Linear(0, 0.8)},
+            'TEC_SWITCHABLE': {
+                'desktop': 0.5 * 36},
+            'TEC_GRAPHICS': {
+                'desktop': adders(36, 51, 64, 83, 105, 115, 130),
+                'notebook': adders(14, 20, 26, 32, 42, 48, 60),
+                'thin client': 36},
+            'TEC_WOL': {
+                'thin client': 2},
+            'TEC_EEE': {
+                'desktop': _EEE_DESKTOP,
+                'notebook': _EEE_NOTEBOOK,
+                'thin client': _EEE_DESKTOP},
+            'TEC_STORAGE': {
+                'desktop': Linear(0, 26, 1),
+                'notebook': Linear(0, 2.6, 1)},
+            'TEC_INT_DISPLAY': {
+                'integrated desktop': _DISPLAY_ESTAR6,
+                'notebook': Display(_above((8.76 * 0.30, 2, 0.02, 0))),
+                'thin client': _DISPLAY_ESTAR6},
+            # (P_OFF_BASE, P_OFF_WOL)
+            'P_OFF': {
+                'small-scale server': (1.0, 0.4)},
+            # (P_IDLE_BASE, P_IDLE_HDD, P_EEE)
+            'P_IDLE': {
+                'small-scale server': (24.0, 8.0, 0.2)}},
+        'Energy Star 7.0': {
+            'T': {
+                'desktop': (0.45, 0.05, 0.15, 0.35),
+                'notebook': (0.25, 0.35, 0.1, 0.3)},
+            'P_TEC_T': {
+                'workstation': (0.35, 0.10, 0.15, 0.40)},
+            'TEC_BASE': {
+                'desktop': Bands(('<=', 3, 69.0), ('<=', 6, 112.0), ('<=', 7, 120.0), _above(135.0)),
+                'desktop discrete': Bands(('<=', 3, 69.0), ('<=', 9, 115.0), _above(135.0)),
+                'notebook': Bands(('<=', 2, 6.5), ('<=', 8, 8.0), _above(14.0)),
+                'thin client': 31},
+            'TEC_MEMORY': {
+                'desktop': Linear(0, 0.8),
+                'notebook': Linear(2.4, 0.294)},
+            'TEC_SWITCHABLE': {
+                'desktop': 0.5 * 36},
+            'TEC_GRAPHICS': {
+                'desktop': adders(36, 51, 64, 83, 105, 115, 130),
+                'notebook': Tanh(29.3, 0.0038, 0.137, 13.4),
+                'thin client': 36},
+            'TEC_WOL': {
+                'thin client': 2},
+            'TEC_EEE': {
+                'desktop': _EEE_DESKTOP,
+                'thin client': _EEE_DESKTOP},
+            'TEC_STORAGE': {
+                'desktop': Linear(0, 26, 1),
+                'notebook': Linear(0, 2.6, 1)},
+            'TEC_INT_DISPLAY': {
+                'integrated desktop': _DISPLAY_ESTAR6,
+                'notebook': Display(_above((8.76 * 0.30, 0.43, 0.0263, 0))),
+                'thin client': _DISPLAY_ESTAR6}},
+        'Energy Star 8.0': {
+            'T': {
+                'desktop': (0.15, 0.45, 0.1, 0.3),
+                'notebook': (0.25, 0.35, 0.1, 0.3),
+                'thin client': (0.45, 0.05, 0.15, 0.35)},
+            'P_TEC_T': {
+                'workstation': (0.10, 0.35, 0.20, 0.35)},
+            'TEC_BASE': {
+                'desktop': Bands(('<=', 8, 26.0), _above(46.0)),
+                'desktop discrete': Bands(('<=', 8, 35.0), _above(45.0)),
+                'integrated desktop': Bands(('<=', 8, 9.0), _above(27.0)),
+                'notebook': Bands(('<=', 2, 6.5), ('<', 8, 8.0), _above(14.0)),
+                'thin client': 31},
+            'TEC_MEMORY': {
+                'desktop': Linear(1.7, 0.24),
+                'notebook': Linear(2.4, 0.294)},
+            'TEC_SWITCHABLE': {
+                'desktop': 14.4},
+            'TEC_GRAPHICS': {
+                'desktop': Tanh(50.4, 0.0038, 0.137, 23),
+                'notebook': Tanh(29.3, 0.0038, 0.137, 13.4),
+                'thin client': 36},
+            'TEC_WOL': {
+                'thin client': 2},
+            # (TEC_10GLAN, TEC_1TO10GLAN)
+            'TEC_GLAN': {
+                'desktop': (18.0, 4.0)},
+            # Per 3.5" HDD, 2.5" HDD, hybrid HDD/SSD and SSD
+            'TEC_STORAGE': {
+                'desktop': (16.5, 2.1, 0.8, 0.4),
+                'notebook': (0.0, 2.6, 2.6, 2.6)},
+            'TEC_INT_DISPLAY': {
+                'integrated desktop': _DISPLAY_ESTAR8,
+                'notebook': Display(_above((8.76 * 0.30, 0.43, 0.0263, 0))),
+                'thin client': _DISPLAY_ESTAR8},
+            'TEC_MOBILE_WORKSTATION': {
+                'notebook': 4.0}},
+        'ErP Lot 3 2014': {
+            'T': {
+                'desktop': (0.55, 0.05, 0.4),
+                'notebook': (0.6, 0.1, 0.3)},
+            # (P_SLEEP_MAX, P_SLEEP_WOL_MAX, P_OFF_MAX)
+            'P_MAX': {
+                'desktop': (5.0, 5.7, 0.5),
+                'notebook': (3.0, 3.7, 0.5)},
+            # Categories A~D
+            'TEC_BASE': {
+                'desktop': {'A': 133, 'B': 158, 'C': 188, 'D': 211},
+                'notebook': {'A': 36, 'B': 48, 'C': 80.5}},
+            'TEC_MEMORY': {
+                'desktop': {'A': Linear(0, 1.0, 2, 0), 'B': Linear(0, 1.0, 2, 0),
+                            'C': Linear(0, 1.0, 2, 0), 'D': Linear(0, 1.0, 4)},
+                'notebook': dict.fromkeys('ABCD', Linear(0, 0.4, 4, 0))},
+            'TEC_GRAPHICS': {
+                'desktop': adders(34, 54, 69, 100, 133, 166, 225),
+                'notebook': adders(12, 20, 26, 37, 49, 61, 113)},
+            # For each additional discrete graphics card
+            'TEC_GRAPHICS_ADDITIONAL': {
+                'desktop': adders(20, 32, 41, 59, 78, 98, 133),
+                'notebook': adders(7, 12, 15, 22, 29, 36, 66)},
+            'TEC_TV_TUNER': {
+                'desktop': 15,
+                'notebook': 2.1},
+            'TEC_AUDIO': {
+                'desktop': 15},
+            'TEC_STORAGE': {
+                'desktop': Linear(0, 25, 1),
+                'notebook': Linear(0, 3, 1)}}}
+
+RULES['ErP Lot 3 2016'] = dict(
+        RULES['ErP Lot 3 2014'],
+        TEC_BASE={
+            'desktop': {'A': 94, 'B': 112, 'C': 134, 'D': 150},
+            'notebook': {'A': 27, 'B': 36, 'C': 60.5}},
+        TEC_GRAPHICS={
+            'desktop': adders(18, 30, 38, 54, 72, 90, 122),
+            'notebook': adders(7, 11, 13, 20, 27, 33, 61)},
+        TEC_GRAPHICS_ADDITIONAL={
+            'desktop': adders(11, 17, 22, 32, 42, 53, 72),
+            'notebook': adders(4, 6, 8, 12, 16, 20, 36)})
@@ -0,0 +1,247 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Schema of the profiles and its compiled validator
+
+SCHEMA lists every key SysInfo and SystemSnapshot read from a profile with its type, its range
+and the conditions on the other keys under which it is read.  The keys which
+SysInfo probes from the hardware when they are missing are only required in
+strict mode.
+
+compile_schema() turns the schema into one closure per key once, so a
+profile is checked with a few lookups and comparisons per key and every
+missing or invalid key is reported at once instead of at the first
+question."""
+
+import operator
+
+__all__ = [
+        "ProfileError",
+        "SCHEMA",
+        "STORAGE_KEYS",
+        "compile_schema",
+        "problems",
+        "value_problem",
+        "validate"]
+
+STORAGE_KEYS = ("Unknown / System Disk", "3.5 inch HDD", "2.5 inch HDD",
+                "Hybrid HDD/SSD", "SSD")
+
+_OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt,
+              '>=': operator.ge, 'in': lambda value, values: value in values}
+
+
+class ProfileError(ValueError):
+    """Every problem of a profile, e.g. missing or invalid keys"""
+    def __init__(self, problems):
+        ValueError.__init__(self, ' '.join(problems))
+        self.problems = problems
+
+
+def _high_resolution(profile, valid):
+    if 'Display Width' not in valid or 'Display Height' not in valid:
+        return None
+    return profile['Display Width'] * profile['Display Height'] >= 2300000
+
+
+_COMPUTER = (('Product Type', '==', 1),)
+_SCREEN = (('Product Type', 'in', (1, 4)), ('Computer Type', '!=', 1),
+           ('Integrated Display', '!=', False))
+_MODES = (('Product Type', 'in', (1, 2, 4)),)
+_THIN_CLIENT = (('Product Type', '==', 4),)
+
+# (key, type, minimum, maximum, conditions, source)
+# The source is 'question' if SysInfo asks for the key, 'probe' if it is
+# read from the hardware or 'default' if it is 0 when missing.  A condition
+# on a key which is missing or invalid is unknown, so the key is checked if
+# it is there but not required.
+SCHEMA = (
+        ('Product Type', 'int', 1, 4, (), 'question'),
+        ('Computer Type', 'int', 1, 3, _COMPUTER, 'question'),
+        ('TV Tuner', 'bool', None, None, _COMPUTER, 'question'),
+        ('Discrete Audio', 'bool', None, None, _COMPUTER + (('Computer Type', '!=', 3),), 'question'),
+        ('Switchable Graphics', 'bool', None, None, _COMPUTER, 'question'),
+        ('Discrete Graphics Cards', 'int', 0, None,
+         _COMPUTER + (('Switchable Graphics', '==', False),), 'question'),
+        ('Frame Buffer Bandwidth', 'number', 0, None,
+         _COMPUTER + (('Switchable Graphics', '==', False),
+                      ('Discrete Graphics Cards', '>=', 1)), 'question'),
+        ('Media Codec', 'bool', None, None, _THIN_CLIENT, 'question'),
+        ('Discrete Graphics', 'bool', None, None, _THIN_CLIENT, 'question'),
+        ('Integrated Display', 'bool', None, None, _THIN_CLIENT, 'question'),
+        ('Display Diagonal', 'number', 0, None, _SCREEN, 'probe'),
+        ('Screen Area', 'number', 0, None, _SCREEN, 'probe'),
+        ('Display Width', 'int', 1, None, _SCREEN, 'probe'),
+        ('Display Height', 'int', 1, None, _SCREEN, 'probe'),
+        ('Enhanced Display', 'bool', None, None, _SCREEN + (_high_resolution,), 'question'),
+        ('CPU Cores', 'int', 1, None, (('Product Type', 'in', (1, 3)),), 'probe'),
+        ('CPU Clock', 'number', 0, None, (('Product Type', 'in', (1, 3)),), 'probe'),
+        ('Memory Size', 'number', 0, None, (('Product Type', 'in', (1, 3)),), 'probe'),
+        ('More Discrete Graphics', 'bool', None, None,
+         (('Product Type', '==', 3), ('CPU Cores', '<', 2)), 'question'),
+        ('Disk Number', 'int', 0, None, (('Product Type', 'in', (1, 2, 3)),), 'probe'),
+        ('Unknown / System Disk', 'int', 0, None, _COMPUTER, 'default'),
+        ('3.5 inch HDD', 'int', 0, None, _COMPUTER, 'default'),
+        ('2.5 inch HDD', 'int', 0, None, _COMPUTER, 'default'),
+        ('Hybrid HDD/SSD', 'int', 0, None, _COMPUTER, 'default'),
+        ('SSD', 'int', 0, None, _COMPUTER, 'default'),
+        ('Wake-on-LAN', 'bool', None, None, _COMPUTER, 'probe'),
+        ('Off Mode', 'number', 0, None, (), 'question'),
+        ('Off Mode with WOL', 'number', 0, None,
+         _COMPUTER + (('Wake-on-LAN', '==', True),), 'question'),
+        ('Sleep Mode', 'number', 0, None, _MODES, 'question'),
+        ('Sleep Mode with WOL', 'number', 0, None,
+         _COMPUTER + (('Wake-on-LAN', '==', True),), 'question'),
+        ('Long Idle Mode', 'number', 0, None, _MODES, 'question'),
+        ('Short Idle Mode', 'number', 0, None, (), 'question'),
+        ('Maximum Power', 'number', 0, None, (('Product Type', '==', 2),), 'question'),
+        ('Gigabit Ethernet', 'int', 0, None, (), 'probe'),
+        ('1~10 Gigabit Ethernet', 'int', 0, None,
+         _COMPUTER + (('Computer Type', '!=', 3),), 'probe'),
+        ('10 Gigabit Ethernet', 'int', 0, None,
+         _COMPUTER + (('Computer Type', '!=', 3),), 'probe'))
+
+_TYPES = {
+        'int': (lambda value: type(value) is int or
+                (type(value) is float and value.is_integer()), 'an integer'),
+        'number': (lambda value: type(value) in (int, float) and value == value,
+                   'a number'),
+        'bool': (lambda value: value is True or value is False or
+                 (type(value) is int and value in (0, 1)), 'true or false')}
+
+
+def _condition(condition):
+    """(profile, valid keys) -> True, False or None if unknown"""
+    if callable(condition):
+        return condition
+    (key, name, expected) = condition
+    compare = _OPERATORS[name]
+
+    def holds(profile, valid):
+        if key not in valid:
+            return None
+        return bool(compare(profile[key], expected))
+    return holds
+
+
+def _conditions(conditions):
+    compiled = [_condition(condition) for condition in conditions]
+
+    def needed(profile, valid):
+        unknown = False
+        for holds in compiled:
+            result = holds(profile, valid)
+            if result is False:
+                return False
+            if result is None:
+                unknown = True
+        return None if unknown else True
+    return needed
+
+
+def _check(key, kind, minimum, maximum):
+    (accept, noun) = _TYPES[kind]
+    if minimum is not None and maximum is not None:
+        expected = '%s between %s and %s' % (noun, minimum, maximum)
+    elif minimum is not None:
+        expected = '%s >= %s' % (noun, minimum)
+    else:
+        expected = noun
+
+    def check(value):
+        if not accept(value) or (minimum is not None and value < minimum) or \
+           (maximum is not None and value > maximum):
+            return "'%s' is %s but it should be %s." % (key, _show(value), expected)
+        return None
+    return check
+
+
+def _show(value):
+    if isinstance(value, str):
+        return "'%s'" % value
+    return str(value)
+
+
+def _storage(profile, valid):
+    """The storage types of all but one disk must be given"""
+    if profile.get('Product Type') != 1 or 'Disk Number' not in valid:
+        return None
+    typed = sum(profile[key] for key in STORAGE_KEYS if key in valid)
+    if profile['Disk Number'] - typed > 1:
+        return ("'Disk Number' is %s but the storage types of %s disks are given."
+                % (profile['Disk Number'], typed))
+    return None
+
+
+def compile_schema(schema=SCHEMA, strict=False):
+    """The validator of the schema, a function from a profile to its problems
+
+    The probed keys are only required if strict."""
+    fields = tuple((key, _check(key, kind, minimum, maximum),
+                    _conditions(conditions),
+                    source == 'default' or (source == 'probe' and not strict))
+                   for (key, kind, minimum, maximum, conditions, source) in schema)
+
+    def validator(profile):
+        found = []
+        valid = set()
+        for (key, check, needed, optional) in fields:
+            required = needed(profile, valid)
+            if required is False:
+                continue
+            if key not in profile:
+                if required and not optional:
+                    found.append("'%s' is not in the profile." % key)
+                continue
+            problem = check(profile[key])
+            if problem is None:
+                valid.add(key)
+            else:
+                found.append(problem)
+        problem = _storage(profile, valid)
+        if problem is not None:
+            found.append(problem)
+        return found
+    return validator
+
+_VALIDATORS = {False: compile_schema(strict=False),
+               True: compile_schema(strict=True)}
+
+_CHECKS = dict((key, _check(key, kind, minimum, maximum))
+               for (key, kind, minimum, maximum, conditions, source) in SCHEMA)
+
+
+def problems(profile, strict=False):
+    """List of the problems of the profile, empty if it is valid"""
+    if not isinstance(profile, dict):
+        return ['The profile is not a JSON object.']
+    return _VALIDATORS[strict](profile)
+
+
+def value_problem(key, value):
+    """The problem of one value of the key, None if it is valid or unknown"""
+    if key not in _CHECKS:
+        return None
+    return _CHECKS[key](value)
+
+
+def validate(profile, strict=False):
+    """Raise ProfileError with every problem of the profile"""
+    found = problems(profile, strict)
+    if found:
+        raise ProfileError(found)
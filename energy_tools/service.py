@@ -0,0 +1,309 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Long-running local evaluation service
+
+The service speaks a minimal HTTP/1.1 with asyncio over a Unix socket or a
+local TCP port, so a test station pays the Python startup and the imports
+only once:
+
+    POST /evaluate    one profile, or a list of profiles, as JSON
+    GET  /stats       request, profile and latency counters
+
+The calculators are imported and warmed up when the service starts.  The
+profiles come from other machines, so nothing is probed and an incomplete
+profile is rejected with its problems.  A request with fewer than
+POOL_THRESHOLD profiles is evaluated in the event loop, which takes 20 to
+200 microseconds per profile, and larger lists are split over a process
+pool."""
+
+import asyncio
+import collections
+import copy
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from logging import debug, info, error
+from .core import TEST_CASES, evaluate
+from .schema import ProfileError
+from .snapshot import SystemSnapshot
+from .version import __version__
+
+__all__ = [
+        "POOL_THRESHOLD",
+        "default_socket",
+        "result_json",
+        "evaluate_json",
+        "Stats",
+        "Service",
+        "process"]
+
+POOL_THRESHOLD = 64
+
+MAX_BODY = 64 * 1024 * 1024
+
+LATENCIES = 4096
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large',
+           422: 'Unprocessable Entity'}
+
+
+def default_socket():
+    """$XDG_RUNTIME_DIR/energy-tools.sock"""
+    runtime = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime, 'energy-tools.sock')
+
+
+def result_json(result):
+    """The fields of a Result with its verdict and margin"""
+    fields = result._asdict()
+    fields['verdict'] = result.verdict
+    fields['margin'] = result.margin
+    return fields
+
+
+def evaluate_json(profile):
+    """{'results': [...]} of one profile or {'error': message}
+
+    Nothing is probed, so the error of an incomplete or invalid profile
+    lists all its 'problems'."""
+    try:
+        results = evaluate(SystemSnapshot.from_profile(profile))
+    except ProfileError as err:
+        return {'error': '%s: %s' % (type(err).__name__, err),
+                'problems': err.problems}
+    except Exception as err:
+        return {'error': '%s: %s' % (type(err).__name__, err)}
+    return {'results': [result_json(result) for result in results]}
+
+
+def _evaluate_many(profiles):
+    return [evaluate_json(profile) for profile in profiles]
+
+
+def _warm_up():
+    """Load every calculator before the first request"""
+    for (comment, profile) in TEST_CASES.values():
+        evaluate_json(copy.deepcopy(profile))
+
+
+class Stats:
+    """Throughput and latency counters of the service"""
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.profiles = 0
+        self.failed = 0
+        self.errors = 0
+        self.pooled = 0
+        self.latencies = collections.deque(maxlen=LATENCIES)
+
+    def record(self, elapsed, profiles=0, failed=0, pooled=False):
+        self.requests = self.requests + 1
+        self.profiles = self.profiles + profiles
+        self.failed = self.failed + failed
+        if pooled:
+            self.pooled = self.pooled + 1
+        self.latencies.append(elapsed)
+
+    def as_dict(self):
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        stats = {'version': __version__,
+                 'uptime': uptime,
+                 'requests': self.requests,
+                 'profiles': self.profiles,
+                 'failed': self.failed,
+                 'errors': self.errors,
+                 'pooled': self.pooled,
+                 'profiles_per_second': self.profiles / max(uptime, 1e-9)}
+        if latencies:
+            for (name, fraction) in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+                index = min(len(latencies) - 1, int(fraction * len(latencies)))
+                stats['latency_%s_ms' % name] = latencies[index] * 1000
+            stats['latency_mean_ms'] = sum(latencies) * 1000 / len(latencies)
+            stats['latency_max_ms'] = latencies[-1] * 1000
+        return stats
+
+
+class Service:
+    """Evaluate the profiles posted by the clients"""
+    def __init__(self, jobs=None, pool_threshold=POOL_THRESHOLD):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.pool_threshold = pool_threshold
+        self.stats = Stats()
+        self.executor = None
+        self.server = None
+        self.path = None
+        _warm_up()
+
+    async def start(self, path=None, host=None, port=None):
+        """Listen on the Unix socket path or on host:port"""
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            self.server = await asyncio.start_unix_server(self.handle, path)
+            self.path = path
+        else:
+            self.server = await asyncio.start_server(self.handle, host or '127.0.0.1', port or 0)
+        return self.server
+
+    def address(self):
+        return self.server.sockets[0].getsockname()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+            self.path = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def evaluate(self, payload):
+        """(status, body, profiles, failed, pooled) of the posted profiles"""
+        if isinstance(payload, dict):
+            outcome = evaluate_json(payload)
+            return (200 if 'results' in outcome else 422, outcome, 1,
+                    0 if 'results' in outcome else 1, False)
+        if not isinstance(payload, list) or \
+           not all(isinstance(profile, dict) for profile in payload):
+            return (400, {'error': 'A profile or a list of profiles is expected.'}, 0, 0, False)
+        pooled = len(payload) >= self.pool_threshold and self.jobs > 1
+        if pooled:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+            size = -(-len(payload) // self.jobs)
+            loop = asyncio.get_running_loop()
+            chunks = await asyncio.gather(*[
+                loop.run_in_executor(self.executor, _evaluate_many,
+                                     payload[start:start + size])
+                for start in range(0, len(payload), size)])
+            outcomes = [outcome for chunk in chunks for outcome in chunk]
+        else:
+            outcomes = _evaluate_many(payload)
+        failed = sum(1 for outcome in outcomes if 'error' in outcome)
+        return (200, {'profiles': outcomes}, len(payload), failed, pooled)
+
+    async def respond(self, method, target, body):
+        if target == '/stats':
+            if method != 'GET':
+                return (405, {'error': 'Use GET for %s.' % target})
+            return (200, self.stats.as_dict())
+        if target != '/evaluate':
+            return (404, {'error': '%s is not found.' % target})
+        if method != 'POST':
+            return (405, {'error': 'Use POST for %s.' % target})
+        start = time.monotonic()
+        try:
+            payload = json.loads(body.decode('utf-8'))
+        except ValueError as err:
+            return (400, {'error': 'The body is not JSON: %s' % err})
+        (status, outcome, profiles, failed, pooled) = await self.evaluate(payload)
+        self.stats.record(time.monotonic() - start, profiles, failed, pooled)
+        return (status, outcome)
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one connection until it is closed"""
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                (method, target, headers, body, status) = request
+                if status is None:
+                    (status, outcome) = await self.respond(method, target, body)
+                else:
+                    outcome = {'error': REASONS[status]}
+                if status >= 400:
+                    self.stats.errors = self.stats.errors + 1
+                keep = headers.get('connection', '').lower() != 'close' and status != 413
+                data = json.dumps(outcome).encode('utf-8')
+                writer.write(('HTTP/1.1 %d %s\r\n'
+                              'Content-Type: application/json\r\n'
+                              'Content-Length: %d\r\n'
+                              'Connection: %s\r\n\r\n'
+                              % (status, REASONS[status], len(data),
+                                 'keep-alive' if keep else 'close')).encode('ascii') + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError) as err:
+            debug('Connection closed: %s' % err)
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """(method, target, headers, body, error status) or None at the end"""
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        parts = line.decode('latin-1').split()
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if not header.strip():
+                break
+            (name, sep, value) = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            return ('', '', {'connection': 'close'}, b'', 400)
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            return ('', '', {'connection': 'close'}, b'', 400)
+        if length < 0:
+            return ('', '', {'connection': 'close'}, b'', 400)
+        if length > MAX_BODY:
+            return (parts[0], parts[1], headers, b'', 413)
+        body = await reader.readexactly(length)
+        return (parts[0], parts[1].split('?')[0], headers, body, None)
+
+
+async def _serve(service, args):
+    if args.port is not None:
+        await service.start(host=args.host, port=args.port)
+    else:
+        await service.start(path=args.socket or default_socket())
+    info('Listening on %s.' % (service.address(),))
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        service.close()
+        await service.server.wait_closed()
+
+
+def process(args):
+    service = Service(args.jobs)
+    try:
+        asyncio.run(_serve(service, args))
+    except OSError as err:
+        error(str(err))
+        return 1
+    stats = service.stats
+    info('Served %d requests and %d profiles, %d failed.'
+         % (stats.requests, stats.profiles, stats.failed))
+    return 0
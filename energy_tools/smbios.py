@@ -0,0 +1,137 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""SMBIOS/DMI table parser for the memory layout"""
+
+import struct
+from collections import namedtuple
+from logging import debug
+
+__all__ = [
+        "Structure",
+        "MemoryDevice",
+        "MemoryLayout",
+        "parse",
+        "entry_point_length",
+        "memory_layout"]
+
+PHYSICAL_MEMORY_ARRAY = 16
+MEMORY_DEVICE = 17
+END_OF_TABLE = 127
+
+# Physical Memory Array Use of system memory
+SYSTEM_MEMORY = 0x03
+
+Structure = namedtuple('Structure', ['type', 'handle', 'data', 'strings'])
+
+MemoryDevice = namedtuple('MemoryDevice', ['locator', 'size'])
+
+
+class MemoryLayout(namedtuple('MemoryLayout', ['total_slots', 'devices'])):
+    """Memory slots of the system memory arrays and their DIMM sizes in MB"""
+    __slots__ = ()
+
+    @property
+    def used_slots(self):
+        return len([device for device in self.devices if device.size])
+
+    @property
+    def sizes(self):
+        return [device.size for device in self.devices if device.size]
+
+
+def entry_point_length(entry_point):
+    """Length of the structure table from smbios_entry_point, or None"""
+    if entry_point.startswith(b'_SM3_') and len(entry_point) >= 0x10:
+        return struct.unpack_from('<I', entry_point, 0x0c)[0]
+    if entry_point.startswith(b'_SM_') and len(entry_point) >= 0x18:
+        return struct.unpack_from('<H', entry_point, 0x16)[0]
+    return None
+
+
+def parse(table, length=None):
+    """Split the DMI table into Structures until the end-of-table"""
+    if length is not None:
+        table = table[:length]
+    structures = []
+    offset = 0
+    while offset + 4 <= len(table):
+        (kind, size, handle) = struct.unpack_from('<BBH', table, offset)
+        if size < 4 or offset + size > len(table):
+            debug("Broken DMI structure at offset %d" % offset)
+            break
+        data = table[offset:offset + size]
+        end = table.find(b'\0\0', offset + size)
+        if end < 0:
+            break
+        strings = [string.decode('ascii', 'replace')
+                   for string in table[offset + size:end].split(b'\0')
+                   if string]
+        structures.append(Structure(kind, handle, data, strings))
+        offset = end + 2
+        if kind == END_OF_TABLE:
+            break
+    return structures
+
+
+def _string(structure, offset):
+    if offset >= len(structure.data):
+        return ''
+    index = structure.data[offset]
+    if 0 < index <= len(structure.strings):
+        return structure.strings[index - 1].strip()
+    return ''
+
+
+def _device_size(structure):
+    """Size of a Memory Device in MB, 0 if not installed, None if unknown"""
+    data = structure.data
+    if len(data) < 0x0e:
+        return None
+    size = struct.unpack_from('<H', data, 0x0c)[0]
+    if size == 0:
+        return 0
+    if size == 0xffff:
+        return None
+    if size == 0x7fff and len(data) >= 0x20:
+        return struct.unpack_from('<I', data, 0x1c)[0] & 0x7fffffff
+    if size & 0x8000:
+        return (size & 0x7fff) / 1024
+    return size
+
+
+def memory_layout(structures):
+    """MemoryLayout of the type 16 and type 17 structures"""
+    arrays = {}
+    for structure in structures:
+        if structure.type == PHYSICAL_MEMORY_ARRAY and len(structure.data) >= 0x0f:
+            use = structure.data[0x05]
+            slots = struct.unpack_from('<H', structure.data, 0x0d)[0]
+            arrays[structure.handle] = (use, slots)
+    total_slots = sum(slots for (use, slots) in arrays.values()
+                      if use == SYSTEM_MEMORY)
+    devices = []
+    for structure in structures:
+        if structure.type != MEMORY_DEVICE or len(structure.data) < 0x0e:
+            continue
+        array = struct.unpack_from('<H', structure.data, 0x04)[0]
+        if array in arrays and arrays[array][0] != SYSTEM_MEMORY:
+            continue
+        devices.append(MemoryDevice(_string(structure, 0x10),
+                                    _device_size(structure)))
+    return MemoryLayout(total_slots, devices)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Immutable system information consumed by the calculators"""
+
+from .sysinfo import SysInfo
+
+__all__ = ["SystemSnapshot"]
+
+STORAGE_TYPES = ("3.5 inch HDD", "2.5 inch HDD", "Hybrid HDD/SSD", "SSD")
+
+
+def _restore(values):
+    return SystemSnapshot(**dict(zip(SystemSnapshot.__slots__, values)))
+
+
+class SystemSnapshot:
+    """All fields the equations need, resolved once from a SysInfo
+
+    It provides the same attributes and get_* methods as SysInfo for the
+    calculators, but it never probes the hardware or asks a question."""
+    __slots__ = ('product_type', 'computer_type',
+                 'cpu_core', 'cpu_clock', 'mem_size', 'disk_num', 'storage',
+                 'discrete', 'discrete_gpu_num', 'switchable', 'fb_bw',
+                 'more_discrete', 'audio', 'tvtuner', 'media_codec',
+                 'integrated_display', 'diagonal', 'ep', 'screen_area',
+                 'width', 'height',
+                 'one_glan', 'one_to_ten_glan', 'ten_glan', 'wol',
+                 'off', 'off_wol', 'sleep', 'sleep_wol',
+                 'long_idle', 'short_idle', 'max_power')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError("Unknown fields: %s" % ', '.join(sorted(fields)))
+
+    @classmethod
+    def from_sysinfo(cls, sysinfo):
+        """Resolve the fields which SysInfo may still probe or ask for"""
+        if sysinfo.product_type in (1, 3):
+            sysinfo.get_basic_info()
+        fields = dict((name, getattr(sysinfo, name, None))
+                      for name in cls.__slots__)
+        fields['storage'] = tuple(sysinfo.profile.get(name, 0)
+                                  for name in STORAGE_TYPES)
+        # The counters of SysInfo are only final through the getters.
+        fields['one_glan'] = sysinfo.get_1glan_num()
+        if sysinfo.product_type == 1 and sysinfo.computer_type != 3:
+            fields['one_to_ten_glan'] = sysinfo.get_1to10glan_num()
+            fields['ten_glan'] = sysinfo.get_10glan_num()
+        return cls(**fields)
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Build it from a saved profile without any question
+
+        The profile may come from another machine, so nothing is probed and
+        it must give every value, see schema.problems(profile, strict=True).
+        ProfileError lists the missing and invalid keys."""
+        return cls.from_sysinfo(SysInfo(profile, interactive=False, strict=True))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SystemSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("SystemSnapshot is immutable")
+
+    def __reduce__(self):
+        return (_restore, (tuple(getattr(self, name) for name in self.__slots__),))
+
+    def __eq__(self, other):
+        if not isinstance(other, SystemSnapshot):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return 'SystemSnapshot(%s)' % ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self.__slots__
+            if getattr(self, name) is not None)
+
+    def get_basic_info(self):
+        return (self.cpu_core, self.cpu_clock, self.mem_size, self.disk_num)
+
+    def get_power_consumptions(self):
+        return (self.off, self.sleep, self.long_idle, self.short_idle)
+
+    def get_display(self):
+        return (self.diagonal, self.ep)
+
+    def get_resolution(self):
+        return (self.width, self.height)
+
+    def get_screen_area(self):
+        return self.screen_area
+
+    def get_storage_info(self):
+        """Numbers of 3.5" HDD, 2.5" HDD, hybrid HDD/SSD and SSD"""
+        return self.storage
+
+    def get_1glan_num(self):
+        return self.one_glan
+
+    def get_1to10glan_num(self):
+        return self.one_to_ten_glan
+
+    def get_10glan_num(self):
+        return self.ten_glan
@@ -0,0 +1,189 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Maximum power of each mode which still passes a requirement
+
+E_TEC and P_TEC are weighted sums of the mode powers and their maximums
+don't depend on the mode powers, so the budget of one mode is solved
+directly from the weight of the mode in the checked quantity."""
+
+from collections import namedtuple
+from .common import Result
+from .core import evaluate
+from .energystar52 import EnergyStar52
+from .energystar60 import EnergyStar60
+from .energystar70 import EnergyStar70
+from .energystar80 import EnergyStar80
+from .erplot3 import ErPLot3_2016
+
+__all__ = [
+        "MODES",
+        "Budget",
+        "weights",
+        "solve",
+        "format_budgets"]
+
+# The mode powers and the attributes of SysInfo holding them
+MODES = {
+        'P_OFF': 'off',
+        'P_SLEEP': 'sleep',
+        'P_LONG_IDLE': 'long_idle',
+        'P_SHORT_IDLE': 'short_idle',
+        'P_OFF_WOL': 'off_wol',
+        'P_SLEEP_WOL': 'sleep_wol'}
+
+# The requirements checking one mode power directly
+DIRECT = {
+        'P_OFF': 'P_OFF',
+        'P_SLEEP': 'P_SLEEP',
+        'P_IDLE': 'P_SHORT_IDLE',
+        'P_OFF_WOL': 'P_OFF_WOL',
+        'P_SLEEP_WOL': 'P_SLEEP_WOL'}
+
+# The modes which the WOL modes follow on computers without Wake-on-LAN
+WOL_MODES = {
+        'P_OFF_WOL': 'P_OFF',
+        'P_SLEEP_WOL': 'P_SLEEP'}
+
+HOURS = 8760 / 1000
+
+
+class Budget(namedtuple('Budget', Result._fields[:7] + ('mode', 'current',
+                                                         'budget'))):
+    """Highest power of one mode which still meets one requirement
+
+    The other modes keep their current powers.  budget is negative if the
+    requirement can't be met by lowering this mode alone."""
+    __slots__ = ()
+
+    @property
+    def headroom(self):
+        return self.budget - self.current
+
+
+def weights(sysinfo, result):
+    """{mode: weight} of the modes in the quantity checked by the result
+
+    Without Wake-on-LAN the WOL powers of computers are the off and sleep
+    powers, so their weights are added to those of P_OFF and P_SLEEP."""
+    found = _weights(sysinfo, result)
+    if sysinfo.product_type == 1 and not sysinfo.wol:
+        for (mode, follows) in WOL_MODES.items():
+            if mode in found:
+                found[follows] = found.get(follows, 0) + found.pop(mode)
+    return found
+
+
+def _weights(sysinfo, result):
+    if result.quantity in DIRECT:
+        return {DIRECT[result.quantity]: 1.0}
+    if result.standard == 'Energy Star 5.2':
+        estar = EnergyStar52(sysinfo)
+        if result.quantity == 'P_TEC':
+            (off, sleep, idle) = estar.get_P_TEC_T_values()
+            return {'P_OFF': off, 'P_SLEEP': sleep, 'P_SHORT_IDLE': idle}
+        (off, sleep, idle) = estar.get_T_values()
+        return {'P_OFF': off * HOURS, 'P_SLEEP': sleep * HOURS,
+                'P_SHORT_IDLE': idle * HOURS}
+    if result.standard == 'ErP Lot 3':
+        (off, sleep, idle) = ErPLot3_2016(sysinfo).get_T_values()
+        if result.quantity == 'E_TEC_WOL':
+            return {'P_OFF_WOL': off * HOURS, 'P_SLEEP_WOL': sleep * HOURS,
+                    'P_SHORT_IDLE': idle * HOURS}
+        return {'P_OFF': off * HOURS, 'P_SLEEP': sleep * HOURS,
+                'P_SHORT_IDLE': idle * HOURS}
+    if result.standard in ('Energy Star 6.0', 'Energy Star 7.0'):
+        if result.standard == 'Energy Star 6.0':
+            estar = EnergyStar60(sysinfo)
+        else:
+            estar = EnergyStar70(sysinfo)
+        if result.quantity == 'P_TEC':
+            (values, scale) = (estar.get_P_TEC_T_values(), 1)
+        else:
+            (values, scale) = (estar.get_T_values(), HOURS)
+    elif result.standard == 'Energy Star 8.0':
+        estar = EnergyStar80(sysinfo)
+        if result.quantity == 'P_TEC':
+            (values, scale) = (estar.get_p_tec_t_values(), 1)
+        else:
+            (values, scale) = (estar.get_t_values(), HOURS)
+    else:
+        raise KeyError('%s is not supported.' % result.standard)
+    return dict((mode, value * scale) for (mode, value) in
+                zip(('P_OFF', 'P_SLEEP', 'P_LONG_IDLE', 'P_SHORT_IDLE'),
+                    values))
+
+
+def solve(sysinfo, results=None):
+    """Budgets of every mode for every result which can be checked
+
+    The requirements which only apply within some range of a mode power,
+    e.g. ErP Lot 3 of notebooks for the long idle power, are not
+    re-evaluated at the budget."""
+    if results is None:
+        results = evaluate(sysinfo)
+    budgets = []
+    for result in results:
+        if result.maximum is None:
+            continue
+        for (mode, weight) in sorted(weights(sysinfo, result).items(),
+                                     key=lambda item: list(MODES).index(item[0])):
+            if not weight:
+                continue
+            current = getattr(sysinfo, MODES[mode])
+            budget = current + (result.maximum - result.value) / weight
+            budgets.append(Budget(*(tuple(result)[:7] + (mode, current,
+                                                         budget))))
+    return budgets
+
+
+def _label(budget):
+    labels = [budget.quantity]
+    if budget.category:
+        labels.append("Category %s" % budget.category)
+    if budget.gpu:
+        labels.append(budget.gpu)
+    if budget.allowance_psu:
+        labels.append("PSU +%s" % budget.allowance_psu)
+    if budget.allowance_proxy:
+        labels.append("proxy +%s" % budget.allowance_proxy)
+    if budget.condition:
+        labels.append(budget.condition)
+    return ", ".join(labels)
+
+
+def format_budgets(budgets):
+    lines = []
+    standard = None
+    label = None
+    for budget in budgets:
+        if budget.standard != standard:
+            standard = budget.standard
+            label = None
+            lines.append("%s:" % standard)
+        if _label(budget) != label:
+            label = _label(budget)
+            lines.append("  %s" % label)
+        if budget.budget < 0:
+            lines.append("    %s can't meet it alone (%s)" %
+                         (budget.mode, budget.current))
+        else:
+            lines.append("    %s <= %s (%s, %+.2f)" %
+                         (budget.mode, round(budget.budget, 2),
+                          budget.current, budget.headroom))
+    return "\n".join(lines)
@@ -0,0 +1,351 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Append-only columnar store of the results of many units
+
+Every result is one row holding the profile values of SCHEMA, the result
+and its verdict and margin.  The rows are partitioned by product and BIOS
+in Hive style directories, product=<name>/bios=<version>/, and every
+write adds new part files, Parquet if pyarrow is installed or CSV
+otherwise.  A part is written under a hidden name first and renamed, so a
+query never reads half of one.
+
+A query is a list of (column, operator, value) predicates which must all
+hold.  The predicates on product and bios skip the other partitions, and
+with pyarrow the others are pushed down to the row groups of Parquet."""
+
+import csv
+import operator
+import os
+import re
+import sys
+import time
+from logging import debug, info, error
+from urllib.parse import quote, unquote
+from .schema import SCHEMA
+from .version import __version__
+
+__all__ = [
+        "COLUMNS",
+        "parse_predicate",
+        "ResultStore",
+        "query",
+        "process"]
+
+PARTITIONS = ('product', 'bios')
+
+# Rows kept in memory before they are written as new parts
+PART_ROWS = 65536
+
+# The columns of the parts and their types, the partitions are only in
+# the directory names
+PROFILE_COLUMNS = tuple((key, {'int': 'int', 'number': 'float', 'bool': 'bool'}[kind])
+                        for (key, kind, minimum, maximum, conditions, source) in SCHEMA)
+
+COLUMNS = (('profile', 'string'), ('version', 'string'), ('stored', 'float')) + \
+    PROFILE_COLUMNS + \
+    (('standard', 'string'), ('category', 'string'), ('gpu', 'string'),
+     ('allowance_psu', 'float'), ('allowance_proxy', 'float'),
+     ('condition', 'string'), ('quantity', 'string'), ('value', 'float'),
+     ('maximum', 'float'), ('verdict', 'string'), ('margin', 'float'))
+
+TYPES = dict(COLUMNS + tuple((name, 'string') for name in PARTITIONS))
+
+_OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt,
+              '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+_PREDICATE = re.compile(r'^\s*(.+?)\s*(==|!=|<=|>=|<|>)\s*(.*?)\s*$')
+
+
+def _convert(name, value):
+    """Value of a column from its text, None if it is empty"""
+    kind = TYPES[name]
+    if value is None or value == '':
+        return None
+    if kind == 'string':
+        return value
+    if kind == 'bool':
+        if isinstance(value, str):
+            if value.lower() in ('true', '1'):
+                return True
+            if value.lower() in ('false', '0'):
+                return False
+            raise ValueError("'%s' is not true or false for '%s'." % (value, name))
+        return bool(value)
+    try:
+        if kind == 'int':
+            return int(float(value))
+        return float(value)
+    except ValueError:
+        raise ValueError("'%s' is not a number for '%s'." % (value, name))
+
+
+def parse_predicate(spec):
+    """'Computer Type == 3' to ('Computer Type', '==', 3)"""
+    match = _PREDICATE.match(spec)
+    if match is None:
+        raise ValueError("'%s' is not 'column op value' with op one of %s."
+                         % (spec, ' '.join(_OPERATORS)))
+    (name, op, value) = match.groups()
+    if name not in TYPES:
+        raise ValueError("'%s' is not a column." % name)
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '\'"':
+        value = value[1:-1]
+    return (name, op, _convert(name, value))
+
+
+def _holds(row, predicates):
+    for (name, op, value) in predicates:
+        current = row.get(name)
+        if current is None or value is None or not _OPERATORS[op](current, value):
+            return False
+    return True
+
+
+def _row(filename, profile, result, stored):
+    row = {'profile': filename, 'version': __version__, 'stored': stored}
+    for (name, kind) in PROFILE_COLUMNS:
+        row[name] = _convert(name, profile.get(name))
+    row.update(result._asdict())
+    row['verdict'] = result.verdict
+    row['margin'] = result.margin
+    return row
+
+
+def _parquet():
+    import pyarrow
+    return pyarrow
+
+
+class ResultStore:
+    """Writer of the results of many units into one store
+
+    The rows are kept per partition until part_rows of them are pending or
+    close(), so a run adds one part to each partition it writes per
+    part_rows rows."""
+    def __init__(self, root, format=None, part_rows=PART_ROWS):
+        if format is None:
+            try:
+                _parquet()
+                format = 'parquet'
+            except ImportError:
+                format = 'csv'
+        if format not in ('parquet', 'csv'):
+            raise ValueError("'%s' is not parquet or csv." % format)
+        if format == 'parquet':
+            try:
+                _parquet()
+            except ImportError:
+                raise ValueError("You need to install Python pyarrow module or you can not output Parquet format file.")
+        self.root = root
+        self.format = format
+        self.part_rows = part_rows
+        self.partitions = {}
+        self.pending = 0
+        self.rows = 0
+        self.parts = 0
+        os.makedirs(root, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, filename, product, bios, profile, results):
+        stored = time.time()
+        rows = self.partitions.setdefault((product or '', bios or ''), [])
+        rows.extend(_row(filename, profile, result, stored) for result in results)
+        self.pending = self.pending + len(results)
+        if self.pending >= self.part_rows:
+            self.flush()
+
+    def _directory(self, product, bios):
+        return os.path.join(self.root, 'product=%s' % quote(product, safe=''),
+                            'bios=%s' % quote(bios, safe=''))
+
+    def _write_parquet(self, path, rows):
+        pyarrow = _parquet()
+        import pyarrow.parquet
+        types = {'string': pyarrow.string(), 'int': pyarrow.int64(),
+                 'float': pyarrow.float64(), 'bool': pyarrow.bool_()}
+        schema = pyarrow.schema([(name, types[kind]) for (name, kind) in COLUMNS])
+        table = pyarrow.Table.from_pydict(
+            dict((name, [row[name] for row in rows]) for (name, kind) in COLUMNS),
+            schema=schema)
+        pyarrow.parquet.write_table(table, path)
+
+    def _write_csv(self, path, rows):
+        with open(path, 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow([name for (name, kind) in COLUMNS])
+            for row in rows:
+                writer.writerow(['' if row[name] is None else row[name]
+                                 for (name, kind) in COLUMNS])
+
+    def flush(self):
+        """Write one new part of every partition with rows"""
+        for ((product, bios), rows) in self.partitions.items():
+            if not rows:
+                continue
+            directory = self._directory(product, bios)
+            os.makedirs(directory, exist_ok=True)
+            name = 'part-%d-%d-%d.%s' % (time.time_ns(), os.getpid(), self.parts,
+                                         self.format)
+            self.parts = self.parts + 1
+            hidden = os.path.join(directory, '.' + name)
+            if self.format == 'parquet':
+                self._write_parquet(hidden, rows)
+            else:
+                self._write_csv(hidden, rows)
+            os.replace(hidden, os.path.join(directory, name))
+            debug("Store: %d rows to %s" % (len(rows), os.path.join(directory, name)))
+            self.rows = self.rows + len(rows)
+        self.partitions = {}
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+
+
+def _partitions(root, predicates):
+    """(product, bios, directory) of the partitions which may match"""
+    pruning = [predicate for predicate in predicates if predicate[0] in PARTITIONS]
+    if not os.path.isdir(root):
+        return
+    for product_dir in sorted(os.listdir(root)):
+        if not product_dir.startswith('product='):
+            continue
+        product = unquote(product_dir[len('product='):])
+        path = os.path.join(root, product_dir)
+        for bios_dir in sorted(os.listdir(path)):
+            if not bios_dir.startswith('bios='):
+                continue
+            bios = unquote(bios_dir[len('bios='):])
+            if _holds({'product': product, 'bios': bios}, pruning):
+                yield (product, bios, os.path.join(path, bios_dir))
+
+
+def _scan_csv(filename, partition, predicates, columns):
+    with open(filename, 'r', newline='') as data:
+        reader = csv.reader(data)
+        header = next(reader, None)
+        if header is None:
+            return
+        index = dict((name, i) for (i, name) in enumerate(header))
+        # The predicates are checked on their own columns before the whole
+        # row is converted.
+        checks = [(index.get(name), name, op, value) for (name, op, value) in predicates
+                  if name not in PARTITIONS]
+        if any(i is None for (i, name, op, value) in checks):
+            return
+        for fields in reader:
+            matched = True
+            for (i, name, op, value) in checks:
+                current = _convert(name, fields[i])
+                if current is None or value is None or not _OPERATORS[op](current, value):
+                    matched = False
+                    break
+            if not matched:
+                continue
+            row = dict(partition)
+            row.update((name, _convert(name, fields[index[name]])) for name in columns
+                       if name in index)
+            yield row
+
+
+def _scan_parquet(root, files, predicates, columns):
+    pyarrow = _parquet()
+    import pyarrow.dataset
+    partitioning = pyarrow.dataset.partitioning(
+        pyarrow.schema([(name, pyarrow.string()) for name in PARTITIONS]),
+        flavor='hive')
+    dataset = pyarrow.dataset.dataset(files, format='parquet',
+                                      partitioning=partitioning,
+                                      partition_base_dir=root)
+    expression = None
+    for (name, op, value) in predicates:
+        condition = _OPERATORS[op](pyarrow.dataset.field(name), value)
+        expression = condition if expression is None else expression & condition
+    table = dataset.to_table(columns=list(columns), filter=expression)
+    return table.to_pylist()
+
+
+def query(root, predicates=(), columns=None):
+    """List of the rows of the store matching all the predicates
+
+    A row is a dict of columns, all of them by default."""
+    if columns is None:
+        columns = list(PARTITIONS) + [name for (name, kind) in COLUMNS]
+    for (name, op, value) in predicates:
+        if name not in TYPES:
+            raise ValueError("'%s' is not a column." % name)
+    rows = []
+    parquet = []
+    for (product, bios, directory) in _partitions(root, predicates):
+        partition = dict((name, value) for (name, value)
+                         in zip(PARTITIONS, (product, bios)) if name in columns)
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if name.startswith('.'):
+                continue
+            if name.endswith('.parquet'):
+                parquet.append(path)
+            elif name.endswith('.csv'):
+                rows.extend(_scan_csv(path, partition, predicates, columns))
+    if parquet:
+        try:
+            rows.extend(_scan_parquet(root, parquet, predicates, columns))
+        except ImportError:
+            raise ValueError("You need to install Python pyarrow module or you can not read Parquet format file.")
+    return rows
+
+
+def process(args):
+    try:
+        predicates = [parse_predicate(spec) for spec in args.where or ()]
+        columns = None
+        if args.columns:
+            columns = [name.strip() for name in args.columns.split(',')]
+            for name in columns:
+                if name not in TYPES:
+                    raise ValueError("'%s' is not a column." % name)
+        start = time.monotonic()
+        rows = query(args.store, predicates, columns)
+    except (OSError, ValueError) as err:
+        error(str(err))
+        return 1
+    info('Found %d rows in %.3f seconds.' % (len(rows), time.monotonic() - start))
+    if columns is None:
+        columns = list(PARTITIONS) + [name for (name, kind) in COLUMNS]
+    if args.output and args.output != '-':
+        output = open(args.output, 'w', newline='')
+    else:
+        output = sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(['' if row.get(name) is None else row[name]
+                             for name in columns])
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if args.output and args.output != '-':
+        info('The rows are saved to "%s".' % args.output)
+    return 0
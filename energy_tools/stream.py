@@ -0,0 +1,307 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Live verdicts of the unit under test from a power meter feed
+
+The samples are 'time,power[,state]' lines like the CSV logs of meter.py,
+read from a file, a FIFO, a Unix socket or stdin as the logger writes
+them.  Every sample updates the rolling average of its mode in O(1) and
+the values of Energy Star 7.0 and 8.0 and ErP Lot 3 and Lot 26 are
+re-evaluated incrementally, so the measurement can be stopped as soon as
+the verdicts don't change any more."""
+
+import collections
+import csv
+import itertools
+import json
+import math
+import os
+import socket
+import stat
+import sys
+import time
+from logging import debug, info, warning, error
+from .incremental import IncrementalEvaluator, MEASUREMENTS
+from .meter import MODES, parse_marker, _column, _number
+from .schema import problems
+
+__all__ = [
+        "STANDARDS",
+        "Rolling",
+        "Stream",
+        "summarize",
+        "format_summary",
+        "open_source",
+        "read_samples",
+        "process"]
+
+STANDARDS = ('Energy Star 7.0', 'Energy Star 8.0', 'ErP Lot 3', 'ErP Lot 26')
+
+Summary = collections.namedtuple('Summary', ['standard', 'passed', 'checked',
+                                             'failing', 'worst', 'best'])
+
+
+class Rolling:
+    """Average of the last size samples, or of all of them if size is 0
+
+    The sum is updated in O(1) per sample and recomputed once every size
+    samples, so the rounding errors don't pile up."""
+    def __init__(self, size=0):
+        self.size = size
+        self.samples = collections.deque()
+        self.total = 0.0
+        self.count = 0
+        self.evicted = 0
+
+    def add(self, value):
+        self.count = self.count + 1
+        if not self.size:
+            self.total = self.total + value
+            return
+        self.samples.append(value)
+        self.total = self.total + value
+        if len(self.samples) > self.size:
+            self.total = self.total - self.samples.popleft()
+            self.evicted = self.evicted + 1
+            if self.evicted == self.size:
+                self.evicted = 0
+                self.total = math.fsum(self.samples)
+
+    @property
+    def average(self):
+        if not self.count:
+            return None
+        return self.total / (len(self.samples) if self.size else self.count)
+
+
+def summarize(results, standards=STANDARDS):
+    """Summary of every standard with results which can be checked
+
+    The results of one quantity are alternatives, e.g. the GPU categories
+    and PSU allowances, but every quantity must be met, so failing lists
+    the quantities which no alternative meets.  worst and best are the
+    lowest and highest margins in percent."""
+    groups = dict((standard, []) for standard in standards)
+    for result in results:
+        if result.maximum and result.standard in groups:
+            groups[result.standard].append(result)
+    summaries = []
+    for standard in standards:
+        checked = groups[standard]
+        if not checked:
+            continue
+        quantities = collections.OrderedDict()
+        passed = 0
+        margins = []
+        for result in checked:
+            margin = result.margin
+            margins.append(margin)
+            quantities.setdefault(result.quantity, False)
+            if margin >= 0:
+                passed = passed + 1
+                quantities[result.quantity] = True
+        summaries.append(Summary(standard, passed, len(checked),
+                                 tuple(quantity for (quantity, met) in quantities.items()
+                                       if not met),
+                                 min(margins), max(margins)))
+    return summaries
+
+
+def _verdict(summary):
+    if summary.failing:
+        return 'FAIL %s' % ', '.join(summary.failing)
+    if summary.passed == summary.checked:
+        return 'PASS'
+    return 'PASS %d/%d' % (summary.passed, summary.checked)
+
+
+def format_summary(summaries):
+    return ' | '.join('%s %s (%+.2f%% .. %+.2f%%)'
+                      % (summary.standard, _verdict(summary), summary.worst,
+                         summary.best) for summary in summaries)
+
+
+class Stream:
+    """Rolling mode averages and the verdicts of one configuration
+
+    The mode powers missing from the profile must be measured before the
+    first verdict, the others are replaced by their averages as soon as
+    they are measured.  Nothing is probed, so the profile must give every
+    other value."""
+    def __init__(self, profile, window=0, standards=STANDARDS):
+        measured = dict(profile, **dict((key, 0.0) for key in MEASUREMENTS))
+        found = problems(measured, strict=True)
+        if found:
+            raise ValueError(' '.join(found))
+        self.profile = dict(profile)
+        self.window = window
+        self.standards = standards
+        self.rolling = dict((key, Rolling(window)) for key in MEASUREMENTS)
+        self.evaluator = None
+        self.summaries = None
+        self.samples = 0
+        self.stable = 0
+
+    def averages(self):
+        return dict((key, rolling.average) for (key, rolling) in self.rolling.items()
+                    if rolling.count)
+
+    def add(self, key, power):
+        """Add one sample of the mode, the summaries are None until a verdict"""
+        rolling = self.rolling[key]
+        rolling.add(power)
+        self.samples = self.samples + 1
+        if self.evaluator is None:
+            profile = dict(self.profile, **self.averages())
+            if problems(profile, strict=True):
+                return None
+            debug("Stream: every mode power is known after %d samples" % self.samples)
+            self.evaluator = IncrementalEvaluator.from_profile(profile, self.standards)
+            results = self.evaluator.results()
+        else:
+            results = self.evaluator.update_profile({key: rolling.average})
+        summaries = summarize(results, self.standards)
+        if self.summaries is not None and \
+           [summary[:4] for summary in summaries] == \
+           [summary[:4] for summary in self.summaries]:
+            self.stable = self.stable + 1
+        else:
+            self.stable = 0
+        self.summaries = summaries
+        return summaries
+
+
+def open_source(path, follow=False):
+    """Iterator of the lines of a file, a FIFO, a Unix socket or stdin ('-')
+
+    A regular file is followed like `tail -f` if follow."""
+    if path == '-':
+        return iter(sys.stdin.readline, '')
+    if stat.S_ISSOCK(os.stat(path).st_mode):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        return client.makefile('r', encoding='utf-8', newline='')
+    data = open(path, 'r', newline='')
+    if follow and stat.S_ISREG(os.fstat(data.fileno()).st_mode):
+        return _follow(data)
+    return data
+
+
+def _follow(data, interval=0.2):
+    pending = ''
+    while True:
+        line = data.readline()
+        if not line:
+            time.sleep(interval)
+            continue
+        pending = pending + line
+        if pending.endswith('\n'):
+            yield pending
+            pending = ''
+
+
+def read_samples(lines, markers=None, mode=None, time_column=None,
+                 power_column=None, state_column=None):
+    """Yield (time, profile key, power) of every sample of the lines
+
+    The mode of a sample is given by its state marker, or by mode for the
+    samples without a known state.  The other samples are skipped."""
+    if markers is None:
+        markers = list(MODES.items())
+    keys = dict((marker, key) for (key, marker) in markers)
+    rows = csv.reader(lines)
+    header = next(rows, None)
+    if header is None:
+        return
+    first = None
+    if any(_number(field) for field in header):
+        first = header
+        header = [str(i) for i in range(len(header))]
+    columns = (_column(header, time_column, 0), _column(header, power_column, 1),
+               _column(header, state_column, 2))
+    debug("Stream: columns %s" % (columns,))
+    if first is not None:
+        rows = itertools.chain([first], rows)
+    for row in rows:
+        if not row:
+            continue
+        try:
+            power = float(row[columns[1]])
+            key = None
+            if columns[2] is not None and columns[2] < len(row):
+                key = keys.get(row[columns[2]].strip())
+        except (IndexError, ValueError):
+            warning("Skip the sample '%s'." % ','.join(row))
+            continue
+        if key is None:
+            key = mode
+        if key is not None:
+            yield (row[columns[0]].strip(), key, power)
+
+
+def process(args):
+    try:
+        with open(args.profile, 'r') as data:
+            profile = json.load(data)
+        markers = None
+        if args.marker:
+            markers = [parse_marker(spec) for spec in args.marker]
+        if args.mode and args.mode not in MEASUREMENTS:
+            raise ValueError("'%s' is not one of %s." % (args.mode, ', '.join(MEASUREMENTS)))
+        stream = Stream(profile, args.window or 0)
+        lines = open_source(args.source, args.follow)
+    except (OSError, ValueError) as err:
+        error(str(err))
+        return 1
+
+    every = args.every or 100
+    stable = args.stable or 0
+    try:
+        for (stamp, key, power) in read_samples(lines, markers, args.mode,
+                                                args.time_column,
+                                                args.power_column,
+                                                args.state_column):
+            summaries = stream.add(key, power)
+            if summaries is None:
+                continue
+            if stream.stable == 0 or stream.samples % every == 0:
+                print('[%s] %d samples, %s %.3f W: %s'
+                      % (stamp, stream.samples, key, stream.rolling[key].average,
+                         format_summary(summaries)))
+                sys.stdout.flush()
+            if stable and stream.stable >= stable:
+                info('The verdicts are stable for %d samples.' % stable)
+                break
+    except KeyboardInterrupt:
+        pass
+    except ValueError as err:
+        error(str(err))
+        return 1
+    finally:
+        if hasattr(lines, 'close'):
+            lines.close()
+
+    for (key, average) in sorted(stream.averages().items()):
+        info("%s: %.3f W (%d samples)" % (key, average, stream.rolling[key].count))
+    if stream.summaries is None:
+        for problem in problems(dict(profile, **stream.averages()), strict=True):
+            error(problem)
+        error('There is no verdict before every mode power is measured.')
+        return 1
+    print(format_summary(stream.summaries))
+    return 0
@@ -0,0 +1,238 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parameter sweep of a base profile over a grid of profile values
+
+The grid is generated lazily and evaluated in batches by Fleet, so only one
+batch of profiles and results is kept in memory at a time."""
+
+import copy
+import csv
+import itertools
+import json
+import math
+import sys
+import time
+from logging import debug, info, error
+from .fleet import Fleet, GPU_CATEGORIES, ERP_CATEGORIES
+from .schema import value_problem
+from .snapshot import SystemSnapshot
+from .sysinfo import SysInfo
+
+__all__ = [
+        "HEADERS",
+        "parse_axis",
+        "resolve",
+        "grid",
+        "sweep",
+        "process"]
+
+BATCH_SIZE = 65536
+
+PSU_TIERS = ('none', 'lower', 'higher')
+
+HEADERS = (('estar70_e_tec',) +
+           tuple('estar70_e_tec_max_%s_%s' % (psu, gpu.lower())
+                 for psu in PSU_TIERS for gpu in GPU_CATEGORIES) +
+           ('estar80_e_tec',) +
+           tuple('estar80_e_tec_max_%s%s' % (psu, extra)
+                 for extra in ('', '_proxy') for psu in PSU_TIERS) +
+           ('erplot3_applicable', 'erplot3_e_tec', 'erplot3_e_tec_wol') +
+           tuple('erplot3_category_%s' % category.lower()
+                 for category in ERP_CATEGORIES) +
+           tuple('erplot3_e_tec_max_%s_%s' % (category.lower(), gpu.lower())
+                 for category in ERP_CATEGORIES for gpu in GPU_CATEGORIES))
+
+
+def _value(token):
+    try:
+        return json.loads(token)
+    except ValueError:
+        return token
+
+
+def parse_axis(spec):
+    """'Key=1,2,4' or 'Key=start:stop:step' (stop included) to (key, values)
+
+    Every value is checked against the type and the range of the key."""
+    (key, sep, values) = spec.partition('=')
+    key = key.strip()
+    if not sep or not key or not values:
+        raise ValueError("'%s' is not 'Key=v1,v2,...' or 'Key=start:stop:step'." % spec)
+    if ',' not in values and values.count(':') == 2:
+        (start, stop, step) = (float(value) for value in values.split(':'))
+        if step <= 0 or stop < start:
+            raise ValueError("'%s' is an empty range." % spec)
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        points = [start + i * step for i in range(count)]
+        if all(value.is_integer() for value in (start, stop, step)):
+            points = [int(value) for value in points]
+    else:
+        points = [_value(value.strip()) for value in values.split(',')]
+    for value in points:
+        problem = value_problem(key, value)
+        if problem is not None:
+            raise ValueError(problem)
+    return (key, points)
+
+
+def resolve(profile, axes=()):
+    """Complete the base profile once with the answers SysInfo derives
+
+    The first value of every axis is applied before, so the keys which only
+    matter for some points, e.g. 'Frame Buffer Bandwidth', are checked.
+    Nothing is probed, so the profile must give every value."""
+    profile = copy.deepcopy(profile)
+    for (key, values) in axes:
+        profile[key] = values[0]
+    sysinfo = SysInfo(profile, interactive=False, strict=True)
+    if sysinfo.product_type != 1:
+        raise ValueError("Only Desktop, Integrated Desktop and Notebook Computers can be swept.")
+    snapshot = SystemSnapshot.from_sysinfo(sysinfo)
+    profile = dict(sysinfo.profile)
+    profile['Gigabit Ethernet'] = snapshot.one_glan
+    profile['1~10 Gigabit Ethernet'] = snapshot.one_to_ten_glan or 0
+    profile['10 Gigabit Ethernet'] = snapshot.ten_glan or 0
+    return profile
+
+
+def grid(base, axes):
+    """Profiles of the Cartesian product of the axes, one at a time"""
+    keys = [key for (key, values) in axes]
+    for values in itertools.product(*[values for (key, values) in axes]):
+        profile = dict(base)
+        profile.update(zip(keys, values))
+        yield profile
+
+
+def _columns(fleet):
+    estar70 = fleet.estar70()
+    estar80 = fleet.estar80()
+    erplot3 = fleet.erplot3_2016()
+    columns = [estar70['E_TEC']]
+    columns.extend(estar70['E_TEC_MAX'][:, i, j]
+                   for i in range(len(PSU_TIERS))
+                   for j in range(len(GPU_CATEGORIES)))
+    columns.append(estar80['E_TEC'])
+    columns.extend(estar80['E_TEC_MAX'][:, j, i]
+                   for j in range(2) for i in range(len(PSU_TIERS)))
+    columns.extend((erplot3['APPLICABLE'], erplot3['E_TEC'],
+                    erplot3['E_TEC_WOL']))
+    columns.extend(erplot3['CATEGORY'][:, k]
+                   for k in range(len(ERP_CATEGORIES)))
+    columns.extend(erplot3['E_TEC_MAX'][:, k, j]
+                   for k in range(len(ERP_CATEGORIES))
+                   for j in range(len(GPU_CATEGORIES)))
+    return [column.tolist() for column in columns]
+
+
+def sweep(base, axes, batch_size=BATCH_SIZE):
+    """Yield (axis columns, result columns) of every batch of the grid
+
+    The result columns follow HEADERS and NaN marks what doesn't apply."""
+    points = grid(base, axes)
+    keys = [key for (key, values) in axes]
+    while True:
+        profiles = list(itertools.islice(points, batch_size))
+        if not profiles:
+            return
+        debug("Sweep: %s profiles" % len(profiles))
+        yield ([[profile[key] for profile in profiles] for key in keys],
+               _columns(Fleet(profiles)))
+
+
+def _csv_cell(value):
+    if isinstance(value, float) and math.isnan(value):
+        return ''
+    return value
+
+
+def _write_csv(output, keys, batches):
+    writer = csv.writer(output)
+    writer.writerow(tuple(keys) + HEADERS)
+    count = 0
+    for (axis_columns, result_columns) in batches:
+        for row in zip(*(axis_columns + result_columns)):
+            writer.writerow([_csv_cell(value) for value in row])
+        count = count + len(result_columns[0])
+    return count
+
+
+def _write_parquet(filename, keys, batches):
+    import pyarrow
+    import pyarrow.parquet
+    writer = None
+    count = 0
+    try:
+        for (axis_columns, result_columns) in batches:
+            names = list(keys) + list(HEADERS)
+            columns = dict(zip(names, axis_columns + result_columns))
+            if writer is None:
+                table = pyarrow.Table.from_pydict(columns)
+                writer = pyarrow.parquet.ParquetWriter(filename, table.schema)
+            else:
+                table = pyarrow.Table.from_pydict(columns,
+                                                  schema=writer.schema)
+            writer.write_table(table)
+            count = count + len(result_columns[0])
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def process(args):
+    try:
+        with open(args.profile, 'r') as data:
+            profile = json.load(data)
+        axes = [parse_axis(spec) for spec in args.axis or ()]
+        base = resolve(profile, axes)
+    except (OSError, ValueError, KeyError) as err:
+        error(str(err))
+        return 1
+
+    total = 1
+    for (key, values) in axes:
+        total = total * len(values)
+    keys = [key for (key, values) in axes]
+    batches = sweep(base, axes, args.batch or BATCH_SIZE)
+    info('Sweeping %d profiles.' % total)
+
+    start = time.monotonic()
+    try:
+        if args.output and args.output.endswith('.parquet'):
+            try:
+                count = _write_parquet(args.output, keys, batches)
+            except ImportError:
+                error("You need to install Python pyarrow module or you can not output Parquet format file.")
+                return 1
+        elif args.output and args.output != '-':
+            with open(args.output, 'w', newline='') as output:
+                count = _write_csv(output, keys, batches)
+        else:
+            count = _write_csv(sys.stdout, keys, batches)
+    except KeyError as err:
+        error('%s is needed by some profiles of the grid.' % err)
+        return 1
+    elapsed = time.monotonic() - start
+
+    info('Evaluated %d profiles in %.2f seconds (%.1f profiles/s).'
+         % (count, elapsed, count / max(elapsed, 1e-9)))
+    if args.output and args.output != '-':
+        info('The sweep table is saved to "%s".' % args.output)
+    return 0
@@ -17,37 +17,22 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from logging import debug, info, warning, error
-from pathlib import Path
 
 import json
 import math
 import os
-import re
-import subprocess
+from .probe import Probe, decode_dtd
+from .schema import validate
+from .timing import timed
 
 
 class SysInfo:
     def get_width_height_width_mm_height_mm(self, data_block_of_DTD):
-        havip = bytearray((data_block_of_DTD[4] >> 4).to_bytes(1, byteorder='big'))
-        havip.append(data_block_of_DTD[2])
-        width = int.from_bytes(havip, byteorder='big')
-
-        vavip = bytearray((data_block_of_DTD[7] >> 4).to_bytes(1, byteorder='big'))
-        vavip.append(data_block_of_DTD[5])
-        height = int.from_bytes(vavip, byteorder='big')
-
-        havsimm = bytearray((data_block_of_DTD[14] >> 4).to_bytes(1, byteorder='big'))
-        havsimm.append(data_block_of_DTD[12])
-        width_mm = int.from_bytes(havsimm, byteorder='big')
-
-        vavsimm = bytearray((data_block_of_DTD[14] & 0x0f).to_bytes(1, byteorder='big'))
-        vavsimm.append(data_block_of_DTD[13])
-        height_mm = int.from_bytes(vavsimm, byteorder='big')
-
-        debug("DTD: Horizontal Addressable Video in Pixels: %d" % int.from_bytes(havip, byteorder='big'))
-        debug("DTD: Veritcal Addressable Video in Pixels: %d" % int.from_bytes(vavip, byteorder='big'))
-        debug("DTD: Horizontal Addressable Video Size in mm: %d" % int.from_bytes(havsimm, byteorder='big'))
-        debug("DTD: Veritcal Addressable Video Size in mm: %d" % int.from_bytes(vavsimm, byteorder='big'))
+        (width, height, width_mm, height_mm) = decode_dtd(data_block_of_DTD)
+        debug("DTD: Horizontal Addressable Video in Pixels: %d" % width)
+        debug("DTD: Veritcal Addressable Video in Pixels: %d" % height)
+        debug("DTD: Horizontal Addressable Video Size in mm: %d" % width_mm)
+        debug("DTD: Veritcal Addressable Video Size in mm: %d" % height_mm)
         return width, height, width_mm, height_mm
 
     def read_edid(self, edid_fobj, address, bytelen):
@@ -57,31 +42,38 @@ class SysInfo:
         return rbytes
 
     def edid_decode(self):
-        monitor = None
-        for edid in Path('/sys/devices').glob('**/edid'):
-            try:
-                with open(edid, 'rb') as f:
-                    content = f.read()
-                    if len(content) != 0:
-                        monitor = edid
-                        self.width, self.height, self.width_mm, self.height_mm = self.get_width_height_width_mm_height_mm(self.read_edid(f, 0x36, 18))
-                        break
-            except PermissionError as err:
-                if 'SNAP_NAME' in os.environ and \
-                        os.environ['SNAP_NAME'] == 'energy-tools':
-                    error('Please execute `snap connect energy-tools:'
-                          + 'hardware-observe` to get the permissions.')
-                raise err
+        try:
+            found = self.probe.edid()
+        except PermissionError as err:
+            if 'SNAP_NAME' in os.environ and \
+                    os.environ['SNAP_NAME'] == 'energy-tools':
+                error('Please execute `snap connect energy-tools:'
+                      + 'hardware-observe` to get the permissions.')
+            raise err
 
-        if monitor is None:
+        if found is None or not found[1]:
             return None
 
+        (monitor, timings) = found
+        for timing in timings:
+            debug("DTD: %dx%d pixels, %dx%d mm" % timing)
+        # The first DTD is the preferred timing, but skip the ones without
+        # the image size.
+        sized = [timing for timing in timings if timing[2] and timing[3]]
+        self.width, self.height, self.width_mm, self.height_mm = \
+            (sized or timings)[0]
+
         debug("EDID location is %s" % (monitor))
         debug('%s %s %s %s' % (self.width, self.height, self.width_mm, self.height_mm))
 
+    def _missing(self, name):
+        raise KeyError("'%s' is not in the profile." % name)
+
     def question_str(self, prompt, length, validator, name):
         if name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            self._missing(name)
         while True:
             s = input(prompt + "\n>> ")
             if len(s) == length and set(s).issubset(validator):
@@ -93,6 +85,8 @@ class SysInfo:
     def question_bool(self, prompt, name):
         if name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            self._missing(name)
         while True:
             s = input(prompt + " [y/n]\n>> ")
             if len(s) == 1 and set(s).issubset("YyNn01"):
@@ -109,6 +103,8 @@ class SysInfo:
     def question_int(self, prompt, maximum, name=None):
         if name and name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            self._missing(name or prompt.split('\n')[0])
         while True:
             s = input(prompt + "\n>> ")
             if not set(s).issubset("0123456789"):
@@ -126,6 +122,8 @@ class SysInfo:
     def question_num(self, prompt, name):
         if name in self.profile:
             return self.profile[name]
+        if not self.interactive:
+            self._missing(name)
         while True:
             s = input(prompt + "\n>> ")
             try:
@@ -157,7 +155,13 @@ class SysInfo:
             self.profile[key] = self.width_mm * self.height_mm / 25.4 / 25.4
             return self.profile[key]
 
-    def __init__(self, profile=None, chassis=0, manual=False):
+    def __init__(self, profile=None, chassis=0, manual=False, interactive=True,
+                 strict=False):
+        # A strict profile must answer everything, even what can be probed,
+        # so nothing is read from this machine.
+        self.interactive = interactive and not strict
+        self.strict = strict
+        self.probe = Probe()
         self.ep = False
         self.diagonal = 0.0
         self.width = None
@@ -165,7 +169,7 @@ class SysInfo:
         self.width_mm = None
         self.height_mm = None
 
-        if not manual and not profile and \
+        if not manual and not profile and not strict and \
                 os.path.exists('/sys/class/dmi/id/chassis_type'):
             try:
                 with open('/sys/class/dmi/id/chassis_type') as chassis_type:
@@ -182,8 +186,11 @@ class SysInfo:
         else:
             self.profile = {}
 
+        if not strict:
+            self.probe.prefetch(self._pending_probes())
+
         # Assume there is a X Window System
-        if 'DISPLAY' not in os.environ:
+        if not strict and 'DISPLAY' not in os.environ:
             os.environ['DISPLAY'] = ':0'
 
         product_type = ""
@@ -206,6 +213,9 @@ class SysInfo:
                  + "), it should be a " + product_type + " Computer.")
             info("Use '-m' option to skip this detection if wrong.")
 
+        if not self.interactive:
+            validate(self.profile, strict)
+
         # Product type
         self.product_type = self.question_int("""Which product type would you like to verify?
 [1] Desktop, Integrated Desktop, and Notebook Computers
@@ -291,22 +301,19 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""",
                         self.profile[disk_type] = 0
 
                 if disk_num > 1:
-                    for disk in subprocess.check_output(
-                            'ls /sys/block | grep -e sd -e nvme -e emmc',
-                            shell=True, encoding='utf8').strip().split('\n'):
+                    for disk in self.probe.disks:
                         if not manual:
                             try:
-                                subprocess.check_output("grep " + disk + " /proc/mounts | grep boot", shell=True, encoding='utf8', stderr=subprocess.STDOUT)
-                                self.profile["Unknown / System Disk"] = \
-                                    self.profile["Unknown / System Disk"] + 1
-                                info("/sys/block/" + disk + " is detected as the system disk.")
-                                info("Use '-m' option to skip this detection if wrong.")
-                                continue
-                            except subprocess.CalledProcessError as e:
-                                if 'SNAP_NAME' in os.environ and os.environ['SNAP_NAME'] == 'energy-tools' and 'grep: /proc/mounts: Permission denied' in e.output:
-                                    print(e.output.strip())
+                                if self.probe.is_system_disk(disk):
+                                    self.profile["Unknown / System Disk"] = \
+                                        self.profile["Unknown / System Disk"] + 1
+                                    info("/sys/block/" + disk + " is detected as the system disk.")
+                                    info("Use '-m' option to skip this detection if wrong.")
+                                    continue
+                            except PermissionError as err:
+                                if 'SNAP_NAME' in os.environ and os.environ['SNAP_NAME'] == 'energy-tools':
+                                    print(err)
                                     warning('Please execute `snap connect energy-tools:mount-observe` to get the permissions.')
-                                pass
                         disk_type = self.question_int("""Which storage type for /sys/block/%s?
 [0] Unknown / System Disk
 [1] 3.5" HDD
@@ -419,11 +426,15 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
 
         if "1~10 Gigabit Ethernet" in self.profile:
             self.one_to_ten_glan = self.profile["1~10 Gigabit Ethernet"]
+        elif strict:
+            self.one_to_ten_glan = 0
         else:
             self._check_ethernet_num()
 
         if "10 Gigabit Ethernet" in self.profile:
             self.ten_glan = self.profile["10 Gigabit Ethernet"]
+        elif strict:
+            self.ten_glan = 0
         else:
             self._check_ethernet_num()
 
@@ -436,101 +447,76 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
         if "Memory Size" in self.profile:
             self.mem_size = self.profile["Memory Size"]
 
+    def _pending_probes(self):
+        """Names of the hardware probes which the profile doesn't answer"""
+        probes = []
+        if "CPU Cores" not in self.profile or "CPU Clock" not in self.profile:
+            probes.append('cpuinfo')
+        if "Memory Size" not in self.profile:
+            probes.append('memory')
+        if "Disk Number" not in self.profile:
+            probes.extend(('disks', 'mounts'))
+        for key in ("Display Diagonal", "Screen Area",
+                    "Display Width", "Display Height"):
+            if key not in self.profile:
+                probes.append('edid')
+                break
+        for key in ("Gigabit Ethernet", "1~10 Gigabit Ethernet",
+                    "10 Gigabit Ethernet"):
+            if key not in self.profile:
+                probes.append('ethernet')
+                break
+        if "Wake-on-LAN" not in self.profile:
+            probes.append('wol')
+        return probes
+
     def _check_wol(self):
         if "Wake-on-LAN" in self.profile:
             return self.profile["Wake-on-LAN"]
-        for dev in os.listdir("/sys/class/net/"):
-            if dev.startswith('eth') or dev.startswith('en'):
-                wakeup = os.path.join("/sys", "class", "net", dev,
-                                      "device", "power", "wakeup")
-                debug("Checking " + wakeup)
-                if os.path.exists(wakeup):
-                    with open(wakeup, 'r') as f:
-                        value = f.read()
-                        if 'enabled' in value:
-                            self.profile["Wake-on-LAN"] = True
-                            return True
-        self.profile["Wake-on-LAN"] = False
-        return False
+        self.profile["Wake-on-LAN"] = self.probe.wake_on_lan()
+        return self.profile["Wake-on-LAN"]
 
     def _check_ethernet_num(self):
         self.one_glan = 0
         self.one_to_ten_glan = 0
         self.ten_glan = 0
-        for dev in os.listdir("/sys/class/net/"):
-            if dev.startswith('eth') or dev.startswith('en'):
-                eee_enabled = False
-                try:
-                    output = subprocess.check_output(
-                        "ethtool --show-eee " + dev,
-                        shell=True, encoding='utf8')
-                except subprocess.CalledProcessError:
-                    warning("`ethtool --show-eee " + dev
-                            + "` failed. Please check it.")
-                    continue
-                for line in output.split('\t'):
-                    if eee_enabled:
-                        if "10000baseT/Full" in line:
-                            self.ten_glan = self.ten_glan + 1
-                            break
-                        elif "5000baseT/Full" in line:
-                            self.one_to_ten_glan = self.one_to_ten_glan + 1
-                            break
-                        elif "2500baseT/Full" in line:
-                            self.one_to_ten_glan = self.one_to_ten_glan + 1
-                            break
-                        elif "1000baseT/Full" in line:
-                            self.one_glan = self.one_glan + 1
-                            break
-                    elif "EEE status: enabled" in line:
-                        eee_enabled = True
+        for eee in self.probe.ethernet().values():
+            if eee is None:
+                continue
+            speed = eee.speed_class
+            if speed == '10G':
+                self.ten_glan = self.ten_glan + 1
+            elif speed == '1~10G':
+                self.one_to_ten_glan = self.one_to_ten_glan + 1
+            elif speed == '1G':
+                self.one_glan = self.one_glan + 1
 
     def _get_cpu_vendor(self):
-        vendor = subprocess.check_output(
-            "cat /proc/cpuinfo | grep 'vendor_id' | grep -ioE '(intel|amd)'",
-            shell=True, encoding='utf8').strip()
-        if re.match("intel", vendor, re.IGNORECASE):
-            return 'intel'
-        if re.match("amd", vendor, re.IGNORECASE):
-            return 'amd'
-        return 'unknown'
+        return self.probe.cpu_vendor()
 
     def get_cpu_core(self):
         if "CPU Cores" in self.profile:
             self.cpu_core = self.profile["CPU Cores"]
             return self.cpu_core
 
-        try:
-            subprocess.check_output('cat /proc/cpuinfo | grep cores',
-                                    shell=True, encoding='utf8')
-        except subprocess.CalledProcessError:
+        self.cpu_core = self.probe.cpu_cores()
+        if self.cpu_core is None:
             warning("Can not check the core number by /proc/cpuinfo. Assume the core number is 1")
             self.cpu_core = 1
-        else:
-            self.cpu_core = self._int_cmd(
-                "grep 'cpu cores' /proc/cpuinfo | sort -u | awk '{print $4}'")
 
         debug("CPU core: %s" % (self.cpu_core))
         self.profile["CPU Cores"] = self.cpu_core
         return self.cpu_core
 
-    def _float_cmd(self, command):
-        return float(subprocess.check_output(
-            command, shell=True, encoding='utf8').strip())
-
-    def _int_cmd(self, command):
-        return int(subprocess.check_output(
-            command, shell=True, encoding='utf8').strip())
-
     def get_cpu_clock(self):
         if "CPU Clock" in self.profile:
             self.cpu_clock = self.profile["CPU Clock"]
             return self.cpu_clock
 
+        self.cpu_clock = None
         if self._get_cpu_vendor() == 'intel':
-            self.cpu_clock = self._float_cmd(
-                "grep -oP '[0-9.]+GHz' /proc/cpuinfo | uniq | sed 's/GHz//'")
-        else:
+            self.cpu_clock = self.probe.cpu_clock()
+        if self.cpu_clock is None:
             self.cpu_clock = self.question_num("What is CPU frequency (GHz)?",
                                                "CPU Clock")
 
@@ -544,31 +530,57 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
             self.mem_size = self.profile["Memory Size"]
             return self.mem_size
 
-        total_online = 0
-        block_size = 0
-        for online in Path('/sys/devices/system/memory').glob('*/online'):
-            with open(online, 'r') as f:
-                if f.read().strip() == '1':
-                    total_online = total_online + 1
-
-        with open('/sys/devices/system/memory/block_size_bytes') as f:
-            block_size = int(f.read().strip(), 16)
-
-        self.mem_size = block_size * total_online / 1024 / 1024 / 1024
+        self.mem_size = self.probe.mem_size()
+        if not self.mem_size:
+            self.mem_size = self.question_num("What is the memory size (GB)?",
+                                              "Memory Size")
 
         debug("Memory size: %s GB" % (self.mem_size))
         self.profile["Memory Size"] = self.mem_size
 
         return self.mem_size
 
+    def get_mem_slots(self):
+        """(total slots, used slots) of the system memory from SMBIOS"""
+        if "Memory Total Slots" in self.profile \
+                and "Memory Used Slots" in self.profile:
+            self.mem_total_slots = self.profile["Memory Total Slots"]
+            self.mem_used_slots = self.profile["Memory Used Slots"]
+            return (self.mem_total_slots, self.mem_used_slots)
+
+        try:
+            layout = self.probe.memory_layout()
+        except PermissionError as err:
+            error('Please execute it as root to read the SMBIOS tables.')
+            raise err
+        except OSError as err:
+            warning("Can not read the SMBIOS tables. %s" % err)
+            layout = None
+
+        if layout is not None and layout.total_slots:
+            self.mem_total_slots = layout.total_slots
+            self.mem_used_slots = layout.used_slots
+            self.mem_dimm_sizes = layout.sizes
+        else:
+            self.mem_total_slots = self.question_int(
+                "How many memory slots are there?", 16, "Memory Total Slots")
+            self.mem_used_slots = self.question_int(
+                "How many memory slots are used?", self.mem_total_slots,
+                "Memory Used Slots")
+            self.mem_dimm_sizes = []
+
+        debug("Memory slots: %s used of %s, %s MB"
+              % (self.mem_used_slots, self.mem_total_slots, self.mem_dimm_sizes))
+        self.profile["Memory Total Slots"] = self.mem_total_slots
+        self.profile["Memory Used Slots"] = self.mem_used_slots
+        return (self.mem_total_slots, self.mem_used_slots)
+
     def get_disk_num(self):
         if "Disk Number" in self.profile:
             self.disk_num = self.profile["Disk Number"]
             return self.disk_num
 
-        self.disk_num = len(subprocess.check_output(
-            'ls /sys/block | grep -e sd -e nvme -e emmc',
-            shell=True, encoding='utf8').strip().split('\n'))
+        self.disk_num = len(self.probe.disks)
 
         debug("Disk number: %s" % (self.disk_num))
         self.profile["Disk Number"] = self.disk_num
@@ -614,6 +626,7 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
     def get_display(self):
         return (self.diagonal, self.ep)
 
+    @timed('probe.dmi')
     def get_dmi_info(self, info):
         base = '/sys/devices/virtual/dmi/id/'
         if os.path.exists(base + info):
@@ -643,6 +656,15 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
         self.profile["Display Height"] = self.height
         return (self.width, self.height)
 
+    @property
+    def wol(self):
+        return self.profile.get("Wake-on-LAN")
+
+    def get_storage_info(self):
+        """Numbers of 3.5" HDD, 2.5" HDD, hybrid HDD/SSD and SSD"""
+        return (self.profile["3.5 inch HDD"], self.profile["2.5 inch HDD"],
+                self.profile["Hybrid HDD/SSD"], self.profile["SSD"])
+
     def get_power_consumptions(self):
         return (self.off, self.sleep, self.long_idle, self.short_idle)
 
@@ -650,6 +672,7 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
         return (self.get_cpu_core(), self.get_cpu_clock(),
                 self.get_mem_size(), self.get_disk_num())
 
+    @timed('output.report')
     def report(self, filename):
         product_types = ('Desktop, Integrated Desktop, and Notebook Computers',
                          'Workstations', 'Small-scale Servers', 'Thin Clients')
@@ -699,6 +722,7 @@ iii. Color Gamut greater than or equal to 32.9% of CIE LUV.""", "Enhanced Displa
                 data.write('\n' + k + ': ' + str(self.profile[k]) + ' W')
             data.write('\n')
 
+    @timed('output.profile')
     def save(self, filename):
         try:
             with open(filename, "w") as data:
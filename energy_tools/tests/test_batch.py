@@ -0,0 +1,117 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import copy
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from .. import batch
+from ..core import TEST_CASES
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, name, content):
+        filename = os.path.join(self.root, name)
+        with open(filename, 'w') as data:
+            if isinstance(content, str):
+                data.write(content)
+            else:
+                json.dump(content, data)
+        return filename
+
+    def _process(self, output):
+        args = argparse.Namespace(paths=[self.root], output=output, jobs=1,
+                                  no_cache=True)
+        with self.assertLogs(level='INFO'):
+            return batch.process(args)
+
+    def test_evaluate_profile(self):
+        (comment, profile) = TEST_CASES[1]
+        filename = self._write('Laptop_1.0.0.profile', dict(
+            (key, value) for (key, value) in profile.items()
+            if key not in ('Product name', 'BIOS version')))
+        (name, product, bios, results, err) = batch.evaluate_profile(filename)
+        self.assertIsNone(err)
+        self.assertEqual((name, product, bios), (filename, 'Laptop', '1.0.0'))
+        self.assertTrue(results)
+
+    def test_unreadable(self):
+        filename = os.path.join(self.root, 'missing.profile')
+        (name, product, bios, results, err) = batch.evaluate_profile(filename)
+        self.assertEqual((name, product, bios, results), (filename, '', '', []))
+        self.assertIn('missing.profile', err)
+
+    def test_bad_json(self):
+        filename = self._write('broken.profile', '{"Off Mode": ')
+        (name, product, bios, results, err) = batch.evaluate_profile(filename)
+        self.assertEqual((product, bios, results), ('', '', []))
+        self.assertTrue(err)
+
+    def test_incomplete(self):
+        (comment, profile) = TEST_CASES[1]
+        profile = copy.deepcopy(profile)
+        del profile['Off Mode']
+        filename = self._write('incomplete_A01.profile', profile)
+        (name, product, bios, results, err) = batch.evaluate_profile(filename)
+        self.assertEqual(results, [])
+        self.assertTrue(err.startswith('ProfileError: '))
+        self.assertIn('Off Mode', err)
+
+    def test_no_profiles(self):
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(batch.process(argparse.Namespace(
+                paths=[os.path.join(self.root, '*.profile')], output='-',
+                jobs=1, no_cache=True)), 1)
+
+    def test_failed(self):
+        self._write('good.profile', TEST_CASES[1][1])
+        self._write('broken.profile', '[')
+        output = os.path.join(self.root, 'results.csv')
+        self.assertEqual(self._process(output), 1)
+        with open(output, newline='') as data:
+            rows = list(csv.reader(data))
+        self.assertEqual(tuple(rows[0]), batch.FIELDS)
+        self.assertTrue(rows[1:])
+        self.assertEqual(set(row[0] for row in rows[1:]),
+                         {os.path.join(self.root, 'good.profile')})
+
+    def test_csv(self):
+        for (number, (comment, profile)) in TEST_CASES.items():
+            self._write('%d.profile' % number, profile)
+        output = os.path.join(self.root, 'results.csv')
+        self.assertEqual(self._process(output), 0)
+        with open(output, newline='') as data:
+            rows = list(csv.DictReader(data))
+        self.assertEqual(len(set(row['profile'] for row in rows)), len(TEST_CASES))
+        for row in rows:
+            self.assertIn(row['verdict'], ('PASS', 'FAIL', ''))
+            self.assertTrue(row['standard'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from .. import batch
+from ..cache import ResultCache, profile_key
+from ..core import TEST_CASES, evaluate
+from ..snapshot import SystemSnapshot
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'cache', 'results.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_key(self):
+        (comment, profile) = TEST_CASES[1]
+        reordered = dict(reversed(list(profile.items())))
+        self.assertEqual(profile_key(profile), profile_key(reordered))
+        self.assertNotEqual(profile_key(profile), profile_key(profile, 'other'))
+        changed = dict(profile, **{'Memory Size': 8.0})
+        self.assertNotEqual(profile_key(profile), profile_key(changed))
+
+    def test_roundtrip(self):
+        with ResultCache(self.path) as cache:
+            for (number, (comment, profile)) in TEST_CASES.items():
+                results = evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+                cache.put(profile_key(profile), results)
+        with ResultCache(self.path) as cache:
+            for (number, (comment, profile)) in TEST_CASES.items():
+                results = evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+                cached = cache.get(profile_key(profile))
+                self.assertEqual(cached, results)
+                self.assertEqual([tuple(map(type, result)) for result in cached],
+                                 [tuple(map(type, result)) for result in results])
+            self.assertIsNone(cache.get(profile_key({})))
+            self.assertEqual((cache.hits, cache.misses), (len(TEST_CASES), 1))
+
+    def test_eviction(self):
+        with ResultCache(self.path, max_entries=2) as cache:
+            for key in ('a', 'b', 'c'):
+                cache.put(key, [])
+            self.assertEqual(cache.get('a'), [])
+        with ResultCache(self.path, max_entries=2) as cache:
+            self.assertEqual(len(cache), 2)
+            self.assertIsNone(cache.get('b'))
+            self.assertEqual(cache.get('a'), [])
+            self.assertEqual(cache.get('c'), [])
+
+    def test_batch(self):
+        for (number, (comment, profile)) in TEST_CASES.items():
+            with open(os.path.join(self.root, '%d.profile' % number), 'w') as data:
+                json.dump(profile, data)
+        outputs = []
+        for run in range(2):
+            output = os.path.join(self.root, 'run%d.csv' % run)
+            args = argparse.Namespace(paths=[self.root], output=output, jobs=1,
+                                      cache=self.path, cache_size=None, no_cache=False)
+            self.assertEqual(batch.process(args), 0)
+            with open(output) as data:
+                outputs.append(data.read())
+        self.assertEqual(outputs[0], outputs[1])
+        with ResultCache(self.path) as cache:
+            self.assertEqual(len(cache), len(TEST_CASES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import argparse
+import copy
+import csv
+import json
+import os
+import tempfile
+import unittest
+from ..core import TEST_CASES, evaluate
+from ..diff import FIELDS, Version, _natural, compare, compare_versions, \
+    field_changes, index, load, process
+from ..snapshot import SystemSnapshot
+
+
+def _version(number, bios, **changes):
+    profile = copy.deepcopy(TEST_CASES[number][1])
+    profile.update(changes)
+    profile.update({'Product name': 'Unit %d' % number, 'BIOS version': bios})
+    return Version('%s.profile' % bios, profile['Product name'], bios, profile)
+
+
+def _evaluate(profile):
+    return evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+
+
+class TestDiff(unittest.TestCase):
+    def test_natural(self):
+        self.assertEqual(sorted(['v1.10', 'v1.9', 'v1.09a', 'v2.0'], key=_natural),
+                         ['v1.9', 'v1.09a', 'v1.10', 'v2.0'])
+
+    def test_index(self):
+        versions = [(0, _version(1, '1.10')), (0, _version(2, 'A01')),
+                    (0, _version(1, '1.9')), (1, _version(1, '1.2'))]
+        products = index(versions)
+        self.assertEqual(sorted(products), ['Unit 1', 'Unit 2'])
+        self.assertEqual([version.bios for version in products['Unit 1']],
+                         ['1.9', '1.10', '1.2'])
+
+    def test_field_changes(self):
+        old = _version(1, '1.0')
+        new = _version(1, '1.1', **{'Off Mode': 2.0, 'TV Tuner': True})
+        del new.profile['Sleep Mode']
+        self.assertEqual(field_changes(old.profile, new.profile),
+                         [('Off Mode', old.profile['Off Mode'], 2.0),
+                          ('Sleep Mode', old.profile['Sleep Mode'], None),
+                          ('TV Tuner', old.profile.get('TV Tuner'), True)])
+
+    def test_incremental(self):
+        for number in TEST_CASES:
+            base = TEST_CASES[number][1]
+            versions = [_version(number, '1.0'),
+                        _version(number, '1.1', **{'Off Mode': base['Off Mode'] * 2}),
+                        _version(number, '1.2', **{'Off Mode': base['Off Mode'] * 2}),
+                        _version(number, '1.3', **{'Short Idle Mode': base['Short Idle Mode'] + 3}),
+                        _version(number, '1.4', **{'Disk Number': 2, 'HDD': 2})]
+            comparisons = compare_versions('Unit %d' % number, versions)
+            self.assertEqual(len(comparisons), 4)
+            for (comparison, old, new) in zip(comparisons, versions, versions[1:]):
+                self.assertIsNone(comparison.error)
+                expected = [pair for pair in zip(_evaluate(old.profile), _evaluate(new.profile))
+                            if pair[0] != pair[1]]
+                self.assertEqual(comparison.results, expected)
+            self.assertEqual(comparisons[1].fields, [])
+            self.assertEqual(comparisons[1].results, [])
+
+    def test_regression(self):
+        old = _version(1, '1.0')
+        new = _version(1, '1.1', **{'Short Idle Mode': 100.0})
+        (comparison,) = compare_versions('Unit 1', [old, new])
+        self.assertTrue(comparison.regressions)
+        self.assertEqual(comparison.fixes, [])
+        (comparison,) = compare_versions('Unit 1', [new, old])
+        self.assertEqual(comparison.regressions, [])
+        self.assertTrue(comparison.fixes)
+
+    def test_error(self):
+        old = _version(1, '1.0')
+        new = _version(1, '1.1')
+        del new.profile['Off Mode']
+        (comparison,) = compare_versions('Unit 1', [old, new])
+        self.assertIn('Off Mode', comparison.error)
+
+    def test_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for (number, bios, idle) in ((1, '1.9', 10.0), (1, '1.10', 100.0),
+                                         (2, '1.9', 10.0), (2, '1.10', 10.0)):
+                version = _version(number, bios, **{'Short Idle Mode': idle})
+                with open(os.path.join(directory, '%d_%s.profile' % (number, bios)), 'w') as data:
+                    json.dump(version.profile, data)
+            self.assertEqual(len(load([directory])), 4)
+            self.assertEqual(len(compare([directory], jobs=2)), 2)
+            output = os.path.join(directory, 'diff.csv')
+            args = argparse.Namespace(paths=[directory], jobs=1, regressions=True,
+                                      output=output)
+            self.assertEqual(process(args), 2)
+            with open(output, newline='') as data:
+                rows = list(csv.reader(data))
+            self.assertEqual(tuple(rows[0]), FIELDS)
+            self.assertTrue(rows[1:])
+            self.assertEqual(set(row[0] for row in rows[1:]), {'Unit 1'})
+
+
+if __name__ == '__main__':
+    unittest.main()
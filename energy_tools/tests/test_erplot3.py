@@ -0,0 +1,189 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2014-2018 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from ..erplot3 import ErPLot3_2014
+from ..sysinfo import SysInfo
+
+
+class TestErPLot3(unittest.TestCase):
+    def setUp(self):
+        self.sysinfo = SysInfo({
+            'Product Type': 1,
+            'Computer Type': 3,
+            'CPU Clock': 2.0,
+            'CPU Cores': 2,
+            'Discrete Audio': False,
+            'Discrete Graphics': False,
+            'Discrete Graphics Cards': 0,
+            'Switchable Graphics': False,
+            'Disk Number': 1,
+            'Display Diagonal': 14,
+            'Display Height': 768,
+            'Display Width': 1366,
+            'Enhanced Display': False,
+            'Gigabit Ethernet': 1,
+            'Memory Size': 8,
+            'TV Tuner': False,
+            'Off Mode': 1.0,
+            'Off Mode with WOL': 1.0,
+            'Sleep Mode': 1.7,
+            'Sleep Mode with WOL': 1.7,
+            'Long Idle Mode': 8.0,
+            'Short Idle Mode': 10.0})
+
+    def tearDown(self):
+        self.sysinfo = None
+
+    def test_desktop_category(self):
+        self.sysinfo.computer_type = 1
+        self.sysinfo.cpu_core = 4
+        self.sysinfo.mem_size = 4
+        self.sysinfo.discrete_gpu_num = 1
+
+        inst = ErPLot3_2014(self.sysinfo)
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), 1)
+        self.assertEqual(inst.category('C'), 1)
+        self.assertEqual(inst.category('D'), 1)
+
+        inst.memory_size = 2
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), 1)
+        self.assertEqual(inst.category('C'), 1)
+        self.assertEqual(inst.category('D'), 0)
+
+        inst.discrete_graphics_cards = 0
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), 1)
+        self.assertEqual(inst.category('C'), 1)
+        self.assertEqual(inst.category('D'), -1)
+
+        inst.memory_size = 1
+        inst.discrete_graphics_cards = 1
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), -1)
+        self.assertEqual(inst.category('C'), 1)
+        self.assertEqual(inst.category('D'), 0)
+
+        inst.cpu_core = 2
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), -1)
+        self.assertEqual(inst.category('C'), -1)
+        self.assertEqual(inst.category('D'), -1)
+
+        inst.memory_size = 2
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), 1)
+        self.assertEqual(inst.category('C'), -1)
+        self.assertEqual(inst.category('D'), -1)
+
+    def test_notebook_category(self):
+        self.sysinfo.computer_type = 3
+        self.sysinfo.cpu_core = 2
+        self.sysinfo.mem_size = 2
+        self.sysinfo.discrete_gpu_num = 1
+
+        inst = ErPLot3_2014(self.sysinfo)
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), 1)
+        self.assertEqual(inst.category('C'), 0)
+        self.assertRaises(Exception, inst.category, 'D')
+
+        inst.memory_size = 1
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), 1)
+        self.assertEqual(inst.category('C'), -1)
+
+        inst.discrete_graphics_cards = 0
+        self.assertEqual(inst.category('A'), 1)
+        self.assertEqual(inst.category('B'), -1)
+        self.assertEqual(inst.category('C'), -1)
+
+    def test_TEC_BASE(self):
+        self.sysinfo.computer_type = 1
+
+        inst = ErPLot3_2014(self.sysinfo)
+
+        self.assertEqual(inst.get_TEC_BASE('A'), 133)
+        self.assertEqual(inst.get_TEC_BASE('B'), 158)
+        self.assertEqual(inst.get_TEC_BASE('C'), 188)
+        self.assertEqual(inst.get_TEC_BASE('D'), 211)
+        inst.computer_type = 3
+        self.assertEqual(inst.get_TEC_BASE('A'), 36)
+        self.assertEqual(inst.get_TEC_BASE('B'), 48)
+        self.assertEqual(inst.get_TEC_BASE('C'), 80.5)
+
+    def test_TEC_TV_TUNER(self):
+        self.sysinfo.computer_type = 1
+        self.sysinfo.tvtuner = True
+
+        inst = ErPLot3_2014(self.sysinfo)
+        self.assertEqual(inst.get_TEC_TV_TUNER(), 15)
+        inst.tv_tuner = False
+        self.assertEqual(inst.get_TEC_TV_TUNER(), 0)
+        inst.computer_type = 3
+        self.assertEqual(inst.get_TEC_TV_TUNER(), 0)
+        inst.tv_tuner = True
+        self.assertEqual(inst.get_TEC_TV_TUNER(), 2.1)
+
+    def test_TEC_AUDIO(self):
+        self.sysinfo.computer_type = 1
+        self.sysinfo.audio = True
+
+        inst = ErPLot3_2014(self.sysinfo)
+        self.assertEqual(inst.get_TEC_AUDIO(), 15)
+        inst.discrete_audio = False
+        self.assertEqual(inst.get_TEC_AUDIO(), 0)
+        inst.computer_type = 3
+        self.assertEqual(inst.get_TEC_AUDIO(), 0)
+        inst.discrete_audio = True
+        self.assertEqual(inst.get_TEC_AUDIO(), 0)
+
+    def test_TEC_MEMORY(self):
+        self.sysinfo.computer_type = 1
+        self.sysinfo.mem_size = 8
+
+        inst = ErPLot3_2014(self.sysinfo)
+        self.assertEqual(inst.get_TEC_MEMORY('A'), 6)
+        self.assertEqual(inst.get_TEC_MEMORY('B'), 6)
+        self.assertEqual(inst.get_TEC_MEMORY('C'), 6)
+        self.assertEqual(inst.get_TEC_MEMORY('D'), 4)
+        inst.computer_type = 3
+        self.assertEqual(inst.get_TEC_MEMORY('A'), 1.6)
+        self.assertEqual(inst.get_TEC_MEMORY('B'), 1.6)
+        self.assertEqual(inst.get_TEC_MEMORY('C'), 1.6)
+        self.assertEqual(inst.get_TEC_MEMORY('D'), 1.6)
+
+    def test_TEC_STORAGE(self):
+        self.sysinfo.computer_type = 1
+        self.sysinfo.disk_num = 1
+
+        inst = ErPLot3_2014(self.sysinfo)
+        self.assertEqual(inst.get_TEC_STORAGE(), 0)
+        inst.disk_number = 2
+        self.assertEqual(inst.get_TEC_STORAGE(), 25)
+
+        inst.computer_type = 3
+        self.assertEqual(inst.get_TEC_STORAGE(), 3)
+        inst.disk_number = 1
+        self.assertEqual(inst.get_TEC_STORAGE(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
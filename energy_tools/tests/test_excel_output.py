@@ -0,0 +1,82 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from ..common import Result
+from ..core import TEST_CASES, evaluate
+from ..excel_output import BatchWorkbook, column_index, column_name, cell_name
+from ..excel_output import STYLES, book_formats
+from ..snapshot import SystemSnapshot
+
+
+class TestAddressing(unittest.TestCase):
+    def test_column_name(self):
+        for (column, name) in ((0, 'A'), (25, 'Z'), (26, 'AA'), (51, 'AZ'),
+                               (52, 'BA'), (701, 'ZZ'), (702, 'AAA')):
+            self.assertEqual(column_name(column), name)
+            self.assertEqual(column_index(name), column)
+        self.assertEqual(cell_name(0, 27), 'AB1')
+
+
+class TestFormats(unittest.TestCase):
+    def test_book_formats(self):
+        from xlsxwriter import Workbook
+        book = Workbook(os.path.join(tempfile.gettempdir(), 'unused.xlsx'))
+        formats = book_formats(book)
+        self.assertIs(book_formats(book), formats)
+        header = formats['header']
+        self.assertIs(formats.get(dict(reversed(list(STYLES['header'].items())))), header)
+        self.assertIs(formats.get({'border': 1}), formats['value'])
+        self.assertIsNot(formats['pass'], formats['unsure'])
+        self.assertEqual(len(formats), 4)
+        self.assertIsNot(book_formats(Workbook(book.filename)), formats)
+
+
+class TestBatchWorkbook(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_add(self):
+        output = os.path.join(self.root, 'batch.xlsx')
+        fields = ('profile', 'product', 'bios') + Result._fields + ('verdict', 'margin')
+        workbook = BatchWorkbook('test', output, fields)
+        count = 0
+        for (number, (comment, profile)) in sorted(TEST_CASES.items()):
+            results = evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+            workbook.add('%d.profile' % number, 'Test', str(number), results)
+            count = count + len(results)
+        workbook.add('broken.profile', '', '', [], 'KeyError')
+        workbook.close()
+        with zipfile.ZipFile(output) as book:
+            profiles = book.read('xl/worksheets/sheet1.xml').decode()
+            results = book.read('xl/worksheets/sheet2.xml').decode()
+        self.assertEqual(profiles.count('<row '), len(TEST_CASES) + 2)
+        self.assertIn('KeyError', profiles)
+        self.assertEqual(results.count('<row '), count + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import unittest
+
+import numpy as np
+
+from ..fleet import Fleet, GPU_CATEGORIES, ERP_CATEGORIES
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        from ..core import TEST_CASES
+        from ..sysinfo import SysInfo
+
+        variants = []
+        for (comment, profile) in TEST_CASES.values():
+            if profile['Product Type'] != 1:
+                continue
+            for computer_type in (1, 2, 3):
+                for graphics in ('integrated', 'switchable', 'discrete',
+                                 'multiple'):
+                    for (area, wol, ten_glan) in ((83.4, True, 0),
+                                                  (200.0, False, 1),
+                                                  (250.0, True, 0),
+                                                  (400.0, False, 1)):
+                        variant = copy.deepcopy(profile)
+                        variant['Computer Type'] = computer_type
+                        variant['Discrete Audio'] = wol
+                        variant['TV Tuner'] = not wol
+                        variant['Switchable Graphics'] = \
+                            graphics == 'switchable'
+                        variant['Discrete Graphics Cards'] = \
+                            {'discrete': 1, 'multiple': 2}.get(graphics, 0)
+                        variant['Frame Buffer Bandwidth'] = 64.0 + area
+                        variant['Screen Area'] = area
+                        if area > 300:
+                            variant['Display Width'] = 3840
+                            variant['Display Height'] = 2160
+                            variant['Display Diagonal'] = 28
+                            variant['Enhanced Display'] = True
+                        variant['Wake-on-LAN'] = wol
+                        variant['10 Gigabit Ethernet'] = ten_glan
+                        variant['1~10 Gigabit Ethernet'] = 1 - ten_glan
+                        variant['Memory Size'] = area / 20
+                        variant['CPU Cores'] = int(area // 40)
+                        variant['Disk Number'] = 3
+                        variant['SSD'] = 1
+                        variant['2.5 inch HDD'] = 1
+                        variant['3.5 inch HDD'] = 1
+                        variants.append(variant)
+        self.sysinfos = [SysInfo(variant, interactive=False)
+                         for variant in variants]
+        self.fleet = Fleet([sysinfo.profile for sysinfo in self.sysinfos])
+
+    def tearDown(self):
+        self.sysinfos = None
+        self.fleet = None
+
+    def assertCells(self, expected, actual):
+        self.assertEqual(sorted(expected), sorted(
+            index for index in zip(*np.nonzero(~np.isnan(actual)))))
+        for index, value in expected.items():
+            self.assertEqual(actual[index], value)
+
+    def test_estar70(self):
+        from ..energystar70 import EnergyStar70
+
+        result = self.fleet.estar70()
+        for n, sysinfo in enumerate(self.sysinfos):
+            estar70 = EnergyStar70(sysinfo)
+            self.assertEqual(result['E_TEC'][n], estar70.equation_one())
+            expected = {}
+            if sysinfo.computer_type == 3:
+                if sysinfo.discrete:
+                    expected[(0, 0)] = estar70.equation_two('N/A',
+                                                            sysinfo.fb_bw)
+                else:
+                    expected[(0, 0)] = estar70.equation_two('G1')
+            else:
+                higher = 1.04 if sysinfo.computer_type == 2 else 1.03
+                for i, psu in enumerate((1, 1.015, higher)):
+                    if sysinfo.discrete:
+                        for j, gpu in enumerate(GPU_CATEGORIES):
+                            expected[(i, j)] = estar70.equation_two(gpu) * psu
+                    else:
+                        expected[(i, 0)] = estar70.equation_two('G1') * psu
+            self.assertCells(expected, result['E_TEC_MAX'][n])
+
+    def test_estar80(self):
+        from ..energystar80 import EnergyStar80
+
+        result = self.fleet.estar80()
+        for n, sysinfo in enumerate(self.sysinfos):
+            estar80 = EnergyStar80(sysinfo)
+            self.assertEqual(result['E_TEC'][n], estar80.equation_one())
+            fb_bw = sysinfo.fb_bw
+            expected = {}
+            if sysinfo.computer_type == 1:
+                for j, proxy in enumerate((0, 0.12)):
+                    for i, psu in enumerate((0, 0.015, 0.03)):
+                        expected[(j, i)] = estar80.equation_two(fb_bw) * \
+                            (1 + psu + proxy)
+            elif sysinfo.computer_type == 2:
+                for i, psu in enumerate((0, 0.015, 0.04)):
+                    expected[(0, i)] = estar80.equation_two(fb_bw) * (1 + psu)
+            else:
+                expected[(0, 0)] = estar80.equation_two(fb_bw, False)
+                expected[(1, 0)] = estar80.equation_two(fb_bw, True)
+            self.assertCells(expected, result['E_TEC_MAX'][n])
+
+    def test_erplot3_2016(self):
+        from ..erplot3 import ErPLot3_2016
+
+        result = self.fleet.erplot3_2016()
+        for n, sysinfo in enumerate(self.sysinfos):
+            inst = ErPLot3_2016(sysinfo)
+            self.assertEqual(result['E_TEC'][n], inst.get_E_TEC())
+            if inst.wol:
+                self.assertEqual(result['E_TEC_WOL'][n], inst.get_E_TEC_WOL())
+            else:
+                self.assertTrue(np.isnan(result['E_TEC_WOL'][n]))
+            if sysinfo.computer_type == 3:
+                applicable = sysinfo.diagonal >= 9 and sysinfo.long_idle >= 6
+            else:
+                applicable = True
+            self.assertEqual(bool(result['APPLICABLE'][n]), applicable)
+            expected = {}
+            for k, category in enumerate(ERP_CATEGORIES):
+                if sysinfo.computer_type == 3 and category == 'D':
+                    meet = -1
+                else:
+                    meet = inst.category(category)
+                self.assertEqual(result['CATEGORY'][n][k], meet)
+                if meet < 0:
+                    continue
+                tec = inst.get_TEC_BASE(category) \
+                    + inst.get_TEC_MEMORY(category) \
+                    + inst.get_TEC_STORAGE() \
+                    + inst.get_TEC_TV_TUNER() \
+                    + inst.get_TEC_AUDIO()
+                if inst.discrete_graphics_cards == 0:
+                    expected[(k, 0)] = tec + 0
+                elif inst.discrete_graphics_cards == 1:
+                    for j, gpu in enumerate(GPU_CATEGORIES):
+                        expected[(k, j)] = tec + inst.get_TEC_GRAPHICS(gpu)
+            self.assertCells(expected, result['E_TEC_MAX'][n])
+
+
+if __name__ == '__main__':
+    unittest.main()
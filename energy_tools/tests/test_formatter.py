@@ -0,0 +1,119 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from ..common import new_result
+from ..formatter import (format_estar5, format_estar7, format_estar8,
+                         format_workstation, format_small_scale_server,
+                         format_erplot3, format_erplot26)
+
+
+class TestFormatter(unittest.TestCase):
+    def test_estar5(self):
+        results = [new_result('Energy Star 5.2', 'E_TEC', 100.0, 148.0,
+                              category=category, condition=condition)
+                   for condition in ('FB width <= 128-bit', 'FB width > 128-bit')
+                   for category in ('A', 'B')]
+        self.assertEqual(format_estar5(results), "\n".join([
+            "Energy Star 5:",
+            "\n  Category A: 100.0 (E_TEC) <= 148.0 (E_TEC_MAX), PASS",
+            "\n  Category B: 100.0 (E_TEC) <= 148.0 (E_TEC_MAX), PASS"]))
+        results[-1] = results[-1]._replace(maximum=99.0)
+        self.assertEqual(format_estar5(results), "\n".join([
+            "Energy Star 5:",
+            "\n  If GPU Frame Buffer Width <= 128 bits,",
+            "    Category A: 100.0 (E_TEC) <= 148.0 (E_TEC_MAX), PASS",
+            "    Category B: 100.0 (E_TEC) <= 148.0 (E_TEC_MAX), PASS",
+            "\n  If GPU Frame Buffer Width > 128 bits,",
+            "    Category A: 100.0 (E_TEC) <= 148.0 (E_TEC_MAX), PASS",
+            "    Category B: 100.0 (E_TEC) > 99.0 (E_TEC_MAX), FAIL (1.01% to pass)"]))
+
+    def test_estar7(self):
+        results = [new_result('Energy Star 7.0', 'E_TEC', 100.0, maximum,
+                              gpu=gpu, allowance_psu=allowance_psu)
+                   for (allowance_psu, maximum) in ((0, 200.0), (0.015, 103.0))
+                   for gpu in ('', 'G1')]
+        self.assertEqual(format_estar7(results), "\n".join([
+            "\nEnergy Star 7:\n",
+            "  If power supplies do not meet the requirements of Power Supply Efficiency Allowance,",
+            "    100.0 (E_TEC) <= 200.0 (E_TEC_MAX), PASS",
+            "    100.0 (E_TEC) <= 200.0 (E_TEC_MAX) for G1 (FB_BW <= 16), PASS",
+            "  If power supplies meet lower efficiency requirements,",
+            "    100.0 (E_TEC) <= 103.0 (E_TEC_MAX), marginally PASS (2.91% to fail)",
+            "    100.0 (E_TEC) <= 103.0 (E_TEC_MAX) for G1 (FB_BW <= 16), marginally PASS (2.91% to fail)"]))
+
+    def test_estar8(self):
+        results = [new_result('Energy Star 8.0', 'E_TEC', 100.0, 200.0,
+                              allowance_psu=allowance_psu, allowance_proxy=0.12)
+                   for allowance_psu in (0, 0.03)]
+        results.append(new_result('Energy Star 8.0', 'E_TEC', 100.0, 90.0,
+                                  condition='mobile workstation'))
+        self.assertEqual(format_estar8(results), "\n".join([
+            "\nEnergy Star 8:\n",
+            "  If the desktop computer implements a full capability - full network proxy solution,",
+            "   If power supplies do not meet the requirements of Power Supply Efficiency Allowance,",
+            "     100.0 (E_TEC) <= 200.0 (E_TEC_MAX), PASS",
+            "   If power supplies meet higher efficiency requirements,",
+            "     100.0 (E_TEC) <= 200.0 (E_TEC_MAX), PASS",
+            "  If the system meets the full Mobile Workstation definition,",
+            "    100.0 (E_TEC) > 90.0 (E_TEC_MAX), FAIL (11.11% to pass)"]))
+
+    def test_workstation(self):
+        results = [new_result('Energy Star 6.1', 'P_TEC', 50.0, 60.0)]
+        self.assertEqual(format_workstation(results), "\n".join([
+            "Energy Star 6.1:",
+            "  50.0 (P_TEC) <= 60.0 (P_TEC_MAX), PASS"]))
+
+    def test_small_scale_server(self):
+        results = [new_result('Energy Star 6.0', 'P_OFF', 1.0, 2.0,
+                              category='A', condition='WOL disabled'),
+                   new_result('Energy Star 6.0', 'P_IDLE', 60.0, 50.0,
+                              category='A', condition='WOL disabled')]
+        self.assertEqual(format_small_scale_server(results), "\n".join([
+            "Energy Star 6.0:",
+            "  If Wake-On-LAN (WOL) is disabled by default upon shipment.",
+            "    Category A: 1.0 (P_OFF) <= 2.0 (P_OFF_MAX), 60.0 (P_IDLE) > 50.0 (P_IDLE_MAX), FAIL"]))
+
+    def test_erplot3(self):
+        results = [new_result('ErP Lot 3 2016', 'P_OFF', 1.0, 0.5),
+                   new_result('ErP Lot 3 2016', 'E_TEC', 100.0, 94.0,
+                              category='A'),
+                   new_result('ErP Lot 3 2016', 'E_TEC', 100.0, None,
+                              category='B')]
+        self.assertEqual(format_erplot3(results), "\n".join([
+            "\nErP Lot 3 from 1 January 2016:\n",
+            "  Fail because P_OFF (1.0) > 0.5",
+            "  Category A:",
+            "      100.0 (E_TEC) > 94.0 (E_TEC_MAX), FAIL (6.38% to pass)",
+            "  Category B:",
+            "    No console output because of more than one discrete graphics card."]))
+
+    def test_erplot26(self):
+        results = [new_result('ErP Lot 26', 'P_OFF', 0.3, 0.5),
+                   new_result('ErP Lot 26', 'P_SLEEP', 1.0, 2.0)]
+        self.assertEqual(format_erplot26(results), "\n".join([
+            "\nErP Lot 26 Tier 3 (1 Jan 2019):\n",
+            "  Pass. P_OFF (0.3) <= 0.5 and P_SLEEP (1.0) <= 2.0"]))
+        results[1] = results[1]._replace(value=3.0)
+        self.assertEqual(format_erplot26(results), "\n".join([
+            "\nErP Lot 26 Tier 3 (1 Jan 2019):\n",
+            "  Failed. P_SLEEP (3.0) > 2.0"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class TestImports(unittest.TestCase):
+    def loaded(self, code):
+        output = subprocess.check_output(
+            [sys.executable, '-c', code + '; import sys; print(" ".join(sys.modules))'],
+            cwd=ROOT, encoding='utf8')
+        return output.split()
+
+    def test_core(self):
+        modules = self.loaded('import energy_tools.core')
+        for name in ('unittest', 'xlsxwriter', 'numpy',
+                     'energy_tools.excel_output', 'energy_tools.erplot3',
+                     'energy_tools.energystar80'):
+            self.assertNotIn(name, modules)
+
+    def test_product_type1(self):
+        modules = self.loaded('from energy_tools import core; '
+                              'from energy_tools.snapshot import SystemSnapshot; '
+                              'core.evaluate(SystemSnapshot.from_profile(core.TEST_CASES[1][1]))')
+        self.assertIn('energy_tools.erplot3', modules)
+        self.assertNotIn('energy_tools.excel_output', modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import random
+import unittest
+from ..core import TEST_CASES, evaluate
+from ..incremental import IncrementalEvaluator, MEASUREMENTS
+from ..snapshot import SystemSnapshot
+
+
+def _profile(number, wol):
+    profile = copy.deepcopy(TEST_CASES[number][1])
+    if profile['Product Type'] == 1:
+        profile['Wake-on-LAN'] = wol
+        profile.setdefault('Off Mode with WOL', profile['Off Mode'] + 0.5)
+        profile.setdefault('Sleep Mode with WOL', profile['Sleep Mode'] + 0.5)
+    return profile
+
+
+class TestIncremental(unittest.TestCase):
+    def test_random_updates(self):
+        for number in TEST_CASES:
+            for wol in (False, True):
+                profile = _profile(number, wol)
+                evaluator = IncrementalEvaluator.from_profile(copy.deepcopy(profile))
+                self.assertEqual(evaluator.results(),
+                                 evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile))))
+                rng = random.Random(number)
+                for i in range(50):
+                    changes = dict((key, round(rng.uniform(0, 20), 2))
+                                   for key in MEASUREMENTS
+                                   if key in profile and rng.random() < 0.5)
+                    profile.update(changes)
+                    expected = evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+                    self.assertEqual(evaluator.update_profile(changes), expected)
+
+    def test_allowances_once(self):
+        evaluator = IncrementalEvaluator.from_profile(_profile(6, True))
+        for short_idle in range(1, 40):
+            evaluator.update(short_idle=short_idle)
+        self.assertEqual(evaluator.evaluations, 1)
+
+    def test_notebook_sides(self):
+        # ErP Lot 3 or Lot 26 applies on either side of 6 W of long idle.
+        evaluator = IncrementalEvaluator.from_profile(_profile(1, False))
+        standards = set()
+        for long_idle in (4.0, 8.0, 5.0, 9.0):
+            results = evaluator.update(long_idle=long_idle)
+            standards.add(frozenset(result.standard for result in results))
+        self.assertEqual(len(standards), 2)
+        self.assertEqual(evaluator.evaluations, 2)
+
+    def test_wol_follows(self):
+        evaluator = IncrementalEvaluator.from_profile(_profile(6, False))
+        evaluator.update(off=0.7, sleep=1.3)
+        self.assertEqual((evaluator.snapshot.off_wol, evaluator.snapshot.sleep_wol),
+                         (0.7, 1.3))
+
+    def test_standards(self):
+        profile = _profile(6, True)
+        standards = ('Energy Star 8.0', 'ErP Lot 3')
+        evaluator = IncrementalEvaluator.from_profile(copy.deepcopy(profile),
+                                                      standards=standards)
+        profile['Short Idle Mode'] = 12.0
+        expected = [result for result in
+                    evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+                    if result.standard in standards]
+        self.assertEqual(evaluator.update(short_idle=12.0), expected)
+
+    def test_unknown(self):
+        evaluator = IncrementalEvaluator.from_profile(_profile(6, False))
+        with self.assertRaises(KeyError):
+            evaluator.update(mem_size=8)
+        with self.assertRaises(KeyError):
+            evaluator.update_profile({'Memory Size': 8})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ..meter import Windows, ingest, parse_marker, parse_window, record_dtype
+
+
+class TestMeter(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.times = np.arange(1000) * 0.5
+        self.powers = 1.0 + (np.arange(1000) % 7) * 0.25
+        self.states = np.array(['off', 'sleep', 'long_idle', 'short_idle', 'boot'])[np.arange(1000) // 200]
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write_csv(self, header=True):
+        filename = os.path.join(self.root, 'log.csv')
+        with open(filename, 'w') as data:
+            if header:
+                data.write('Time,Watts,State\n')
+            for row in zip(self.times.tolist(), self.powers.tolist(), self.states.tolist()):
+                data.write('%r,%r,%s\n' % row)
+        return filename
+
+    def test_parse(self):
+        self.assertEqual(parse_window('Off Mode=10:20.5'), ('Off Mode', 10.0, 20.5))
+        self.assertEqual(parse_window('Sleep Mode=2020-01-01T00:00:00/2020-01-01T00:01:00')[1:],
+                         (1577836800.0, 1577836860.0))
+        self.assertEqual(parse_marker('Short Idle Mode= idle '), ('Short Idle Mode', 'idle'))
+        for spec in ('Off Mode=20:10', 'Off Mode=10', 'Idle=1:2'):
+            with self.assertRaises(ValueError):
+                parse_window(spec)
+        self.assertEqual(record_dtype('<f8,<f4,<u1').names, ('time', 'power', 'state'))
+        with self.assertRaises(ValueError):
+            record_dtype('<f8')
+
+    def test_markers(self):
+        for header in (True, False):
+            averages = ingest(self.write_csv(header), chunk_size=64)
+            self.assertEqual(sorted(averages), ['Long Idle Mode', 'Off Mode',
+                                                'Short Idle Mode', 'Sleep Mode'])
+            self.assertAlmostEqual(averages['Sleep Mode'], self.powers[200:400].mean())
+
+    def test_windows(self):
+        filename = self.write_csv()
+        averages = ingest(filename, [('Off Mode', 10, 110), ('Short Idle Mode', 300, 400)],
+                          chunk_size=33, time_column='time', power_column='WATTS')
+        self.assertAlmostEqual(averages['Off Mode'], self.powers[20:220].mean())
+        self.assertAlmostEqual(averages['Short Idle Mode'], self.powers[600:800].mean())
+        with self.assertRaises(ValueError):
+            ingest(filename, [('Off Mode', 1000, 2000)])
+        with self.assertRaises(ValueError):
+            ingest(filename, [('Off Mode', 10, 110)], [('Off Mode', 'off')])
+
+    def test_unsorted(self):
+        order = np.random.default_rng(0).permutation(len(self.times))
+        windows = Windows([('Off Mode', 10, 110)], [('Sleep Mode', 'sleep')])
+        for chunk in np.array_split(order, 3):
+            windows.add(self.times[chunk], self.powers[chunk], self.states[chunk])
+        averages = windows.averages()
+        self.assertAlmostEqual(averages['Off Mode'], self.powers[20:220].mean())
+        self.assertAlmostEqual(averages['Sleep Mode'], self.powers[200:400].mean())
+
+    def test_binary(self):
+        dtype = record_dtype('<f8,<f4,<u1')
+        records = np.zeros(len(self.times), dtype=dtype)
+        records['time'] = self.times
+        records['power'] = self.powers
+        records['state'] = np.arange(1000) // 200
+        filename = os.path.join(self.root, 'log.bin')
+        records.tofile(filename)
+        averages = ingest(filename, [('Off Mode', 0, 100)], [('Sleep Mode', '1')],
+                          dtype=dtype, chunk_size=100)
+        self.assertAlmostEqual(averages['Off Mode'], self.powers[:200].mean(), places=6)
+        self.assertAlmostEqual(averages['Sleep Mode'], self.powers[200:400].mean(), places=6)
+        with self.assertRaises(ValueError):
+            ingest(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from ..probe import Probe, EEEInfo, EDID_HEADER, parse_show_eee
+
+
+class TestProbe(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'proc'))
+        for disk in ('loop0', 'nvme0n1', 'sda', 'sdb'):
+            os.makedirs(os.path.join(self.root, 'sys', 'block', disk))
+        with open(os.path.join(self.root, 'proc', 'cpuinfo'), 'w') as data:
+            for processor in range(4):
+                data.write("processor\t: %d\n"
+                           "vendor_id\t: GenuineIntel\n"
+                           "model name\t: Intel(R) Core(TM) i5-8250U CPU @ 1.60GHz\n"
+                           "cpu cores\t: 4\n\n" % processor)
+        with open(os.path.join(self.root, 'proc', 'mounts'), 'w') as data:
+            data.write("/dev/nvme0n1p2 / ext4 rw,relatime 0 0\n"
+                       "/dev/nvme0n1p1 /boot/efi vfat rw,relatime 0 0\n"
+                       "/dev/sdb1 /media/data ext4 rw,relatime 0 0\n")
+        for (connector, status, size) in (
+                ('card0-HDMI-A-1', 'connected', (1024, 768, 300, 220)),
+                ('card0-eDP-1', 'connected', (1920, 1080, 344, 194)),
+                ('card0-DP-1', 'disconnected', None)):
+            os.makedirs(os.path.join(self.root, 'sys', 'class', 'drm', connector))
+            with open(os.path.join(self.root, 'sys', 'class', 'drm', connector, 'status'), 'w') as data:
+                data.write(status + '\n')
+            with open(os.path.join(self.root, 'sys', 'class', 'drm', connector, 'edid'), 'wb') as data:
+                if size:
+                    data.write(self._edid(*size))
+        self.probe = Probe(self.root)
+
+    def _edid(self, width, height, width_mm, height_mm):
+        content = bytearray(128)
+        content[0:8] = EDID_HEADER
+        # A display descriptor before the DTD
+        content[0x36:0x3b] = b'\x00\x00\x00\xfc\x00'
+        dtd = bytearray(18)
+        dtd[0:2] = b'\x3a\x02'
+        dtd[2] = width & 0xff
+        dtd[4] = (width >> 8) << 4
+        dtd[5] = height & 0xff
+        dtd[7] = (height >> 8) << 4
+        dtd[12] = width_mm & 0xff
+        dtd[13] = height_mm & 0xff
+        dtd[14] = ((width_mm >> 8) << 4) | (height_mm >> 8)
+        content[0x48:0x5a] = dtd
+        return bytes(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_cpu(self):
+        self.assertEqual(self.probe.cpu_vendor(), 'intel')
+        self.assertEqual(self.probe.cpu_cores(), 4)
+        self.assertEqual(self.probe.cpu_clock(), 1.6)
+
+    def test_disks(self):
+        self.assertEqual(self.probe.disks, ['nvme0n1', 'sda', 'sdb'])
+        self.assertTrue(self.probe.is_system_disk('nvme0n1'))
+        self.assertFalse(self.probe.is_system_disk('sda'))
+        self.assertFalse(self.probe.is_system_disk('sdb'))
+
+    def test_edid(self):
+        (edid, timings) = self.probe.edid()
+        self.assertTrue(edid.endswith('card0-eDP-1/edid'))
+        self.assertEqual(timings, [(1920, 1080, 344, 194)])
+
+    def test_prefetch_timeout(self):
+        mounts = os.path.join(self.root, 'proc', 'mounts')
+        os.remove(mounts)
+        # Opening a FIFO without a writer blocks like a hung attribute.
+        os.mkfifo(mounts)
+        start = time.monotonic()
+        with self.assertLogs(level='WARNING'):
+            self.probe.prefetch(['cpuinfo', 'mounts'], timeout=0.2)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(self.probe.cpu_cores(), 4)
+        self.assertFalse(self.probe.is_system_disk('sda'))
+        late = [thread for thread in threading.enumerate()
+                if thread.name == 'probe-mounts']
+        self.assertTrue(late and all(thread.daemon for thread in late))
+        # The late result must not replace the fallback which is in use.
+        writer = os.open(mounts, os.O_WRONLY | os.O_NONBLOCK)
+        os.write(writer, b"/dev/sda1 /boot ext4 rw,relatime 0 0\n")
+        os.close(writer)
+        for thread in late:
+            thread.join(1.0)
+        self.assertFalse(self.probe.is_system_disk('sda'))
+
+    def test_show_eee(self):
+        eee = parse_show_eee('enp3s0', """EEE Settings for enp3s0:
+\tEEE status: enabled - active
+\tTx LPI: 17 (us)
+\tSupported EEE link modes:  100baseT/Full
+\t                           1000baseT/Full
+\t                           2500baseT/Full
+\tAdvertised EEE link modes:  100baseT/Full
+\t                            1000baseT/Full
+\tLink partner advertised EEE link modes:  10000baseT/Full
+""")
+        self.assertEqual(eee, EEEInfo('enp3s0', True, True, (100, 1000, 2500), 'ethtool'))
+        self.assertEqual(eee.speed_class, '1G')
+        eee = parse_show_eee('enp4s0', """EEE Settings for enp4s0:
+\tEEE status: enabled - inactive
+\tSupported EEE link modes:  100baseT/Full
+\t                           2500baseT/Full
+\t                           1000baseT/Full
+""")
+        self.assertEqual(eee.speeds, (100, 2500, 1000))
+        self.assertEqual(eee.speed_class, '1~10G')
+        self.assertIsNone(EEEInfo('eth1', True, False, (100,), 'ioctl').speed_class)
+        eee = parse_show_eee('eth0', """EEE Settings for eth0:
+\tEEE status: disabled
+\tSupported EEE link modes:  1000baseT/Full
+""")
+        self.assertIsNone(eee.speed_class)
+
+    def test_parsed_once(self):
+        self.probe.cpu_vendor()
+        os.remove(os.path.join(self.root, 'proc', 'cpuinfo'))
+        self.assertEqual(self.probe.cpu_cores(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
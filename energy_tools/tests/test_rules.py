@@ -0,0 +1,63 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from ..rules import Bands, Display, GPU_CATEGORIES, Linear, RULES, adders
+
+
+class TestBands(unittest.TestCase):
+    def test_bounds(self):
+        bands = Bands(('<=', 2, 6.5), ('<', 8, 8.0), (None, None, 14.0))
+        for (x, value) in ((0, 6.5), (2, 6.5), (2.01, 8.0), (7.99, 8.0),
+                           (8, 14.0), (100, 14.0)):
+            self.assertEqual(bands(x), value)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, Bands, ('<=', 8, 1.0), ('<=', 2, 2.0), (None, None, 3.0))
+        self.assertRaises(ValueError, Bands, ('>', 8, 1.0), (None, None, 3.0))
+        self.assertRaises(ValueError, Bands, ('<=', 8, 1.0))
+        self.assertRaises(ValueError, adders, 1, 2, 3)
+
+
+class TestCoefficients(unittest.TestCase):
+    def test_linear(self):
+        memory = Linear(0, 1.0, 2, 0.0)
+        self.assertEqual(memory(1), 0.0)
+        self.assertEqual(memory(2), 0.0)
+        self.assertEqual(memory(8), 6.0)
+        self.assertEqual(Linear(2.4, 0.294)(8), 2.4 + 0.294 * 8)
+
+    def test_display(self):
+        display = RULES['Energy Star 8.0']['TEC_INT_DISPLAY']['integrated desktop']
+        for (area, (x_A, constant)) in ((100.0, (0.148, 1.30)), (190.0, (0.018, 26.1)),
+                                        (250.0, (0.078, 13.2)), (315.0, (0.156, -11.3))):
+            self.assertEqual(display(0.3, 3.6864, area),
+                             (3.43 * 3.6864 + x_A * area + constant) * (1 + 0.3))
+        self.assertEqual(Display((None, None, (2, 1, 0, 0)))(0, 1.5, 0), 3.0)
+
+    def test_tables(self):
+        for (standard, tables) in RULES.items():
+            for (table, forms) in tables.items():
+                self.assertTrue(forms, '%s %s' % (standard, table))
+                for rule in forms.values():
+                    if isinstance(rule, dict) and 'G1' in rule:
+                        self.assertEqual(tuple(rule), GPU_CATEGORIES)
+
+
+if __name__ == '__main__':
+    unittest.main()
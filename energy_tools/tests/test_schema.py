@@ -0,0 +1,113 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import time
+import unittest
+from unittest import mock
+from ..core import TEST_CASES, evaluate
+from ..schema import ProfileError, compile_schema, problems, validate
+from ..snapshot import SystemSnapshot
+from ..sysinfo import SysInfo
+
+
+def _complete(number):
+    """Test case with the values SysInfo would probe"""
+    profile = copy.deepcopy(TEST_CASES[number][1])
+    if profile['Product Type'] == 1:
+        profile.setdefault('Wake-on-LAN', False)
+    return profile
+
+
+class TestSchema(unittest.TestCase):
+    def test_test_cases(self):
+        for number in TEST_CASES:
+            self.assertEqual(problems(TEST_CASES[number][1]), [])
+            self.assertEqual(problems(_complete(number), strict=True), [])
+
+    def test_every_problem(self):
+        profile = _complete(1)
+        del profile['Off Mode']
+        profile['Computer Type'] = 5
+        profile['TV Tuner'] = 'no'
+        profile['Short Idle Mode'] = float('nan')
+        with self.assertRaises(ProfileError) as context:
+            validate(profile)
+        self.assertEqual(context.exception.problems, [
+            "'Computer Type' is 5 but it should be an integer between 1 and 3.",
+            "'TV Tuner' is 'no' but it should be true or false.",
+            "'Off Mode' is not in the profile.",
+            "'Short Idle Mode' is nan but it should be a number >= 0."])
+
+    def test_conditional(self):
+        profile = _complete(2)
+        profile.update({'Switchable Graphics': False,
+                        'Discrete Graphics Cards': 0})
+        profile.pop('Frame Buffer Bandwidth', None)
+        self.assertEqual(problems(profile), [])
+        profile['Discrete Graphics Cards'] = 1
+        self.assertEqual(problems(profile),
+                         ["'Frame Buffer Bandwidth' is not in the profile."])
+        profile['Switchable Graphics'] = True
+        self.assertEqual(problems(profile), [])
+
+    def test_probed(self):
+        profile = _complete(1)
+        del profile['Memory Size']
+        self.assertEqual(problems(profile), [])
+        self.assertEqual(problems(profile, strict=True),
+                         ["'Memory Size' is not in the profile."])
+
+    def test_storage(self):
+        profile = _complete(1)
+        profile.update({'Disk Number': 3, 'SSD': 1})
+        self.assertEqual(problems(profile), [
+            "'Disk Number' is 3 but the storage types of 1 disks are given."])
+
+    def test_strict_sysinfo(self):
+        profile = _complete(1)
+        del profile['CPU Cores']
+        with mock.patch('energy_tools.sysinfo.Probe') as probe:
+            with self.assertRaises(ProfileError):
+                SysInfo(copy.deepcopy(profile), strict=True)
+            self.assertEqual(probe.return_value.method_calls, [])
+        with mock.patch('builtins.input', side_effect=AssertionError):
+            with self.assertRaises(ProfileError):
+                SysInfo(copy.deepcopy(profile), interactive=False,
+                        strict=True)
+
+    def test_strict_results(self):
+        for number in TEST_CASES:
+            profile = _complete(number)
+            with mock.patch('energy_tools.sysinfo.Probe') as probe:
+                strict = evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+                self.assertEqual(probe.return_value.method_calls, [])
+            sysinfo = SysInfo(profile, interactive=False)
+            self.assertEqual(strict, evaluate(SystemSnapshot.from_sysinfo(sysinfo)))
+
+    def test_speed(self):
+        validator = compile_schema(strict=True)
+        profiles = [_complete(number) for number in TEST_CASES] * 500
+        start = time.perf_counter()
+        for profile in profiles:
+            validator(profile)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
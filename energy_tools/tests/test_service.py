@@ -0,0 +1,131 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import copy
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from ..core import TEST_CASES, evaluate
+from ..service import Service, evaluate_json, result_json
+from ..snapshot import SystemSnapshot
+
+
+class UnixConnection(http.client.HTTPConnection):
+    """The stand-in client of a test station on the Unix socket"""
+    def __init__(self, path):
+        http.client.HTTPConnection.__init__(self, 'localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'energy-tools.sock')
+        self.service = Service(jobs=2, pool_threshold=4)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.service.start(path=self.path))
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.service.close()
+        self.loop.run_until_complete(self.service.server.wait_closed())
+        self.loop.close()
+        self.assertFalse(os.path.exists(self.path))
+        os.rmdir(self.root)
+
+    def request(self, connection, method, target, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        connection.request(method, target, body)
+        response = connection.getresponse()
+        return (response.status, json.loads(response.read()))
+
+    def expected(self, profile):
+        return [json.loads(json.dumps(result_json(result))) for result in
+                evaluate(SystemSnapshot.from_profile(dict(profile)))]
+
+    def test_evaluate(self):
+        connection = UnixConnection(self.path)
+        for (comment, profile) in TEST_CASES.values():
+            (status, outcome) = self.request(connection, 'POST', '/evaluate', profile)
+            self.assertEqual(status, 200)
+            self.assertEqual(outcome['results'], self.expected(profile))
+        (status, outcome) = self.request(connection, 'POST', '/evaluate', {})
+        self.assertEqual(status, 422)
+        self.assertIn('Product Type', outcome['error'])
+        connection.close()
+
+    def test_warm_up(self):
+        saved = copy.deepcopy(TEST_CASES)
+        with mock.patch('energy_tools.sysinfo.Probe') as probe:
+            Service(jobs=1)
+            self.assertEqual(probe.return_value.method_calls, [])
+        self.assertEqual(TEST_CASES, saved)
+
+    def test_incomplete(self):
+        profile = copy.deepcopy(TEST_CASES[6][1])
+        del profile['Wake-on-LAN']
+        del profile['Memory Size']
+        with mock.patch('energy_tools.sysinfo.Probe') as probe:
+            outcome = evaluate_json(profile)
+            self.assertEqual(probe.return_value.method_calls, [])
+        self.assertEqual(outcome['problems'],
+                         ["'Memory Size' is not in the profile.",
+                          "'Wake-on-LAN' is not in the profile."])
+
+    def test_pool(self):
+        connection = UnixConnection(self.path)
+        profiles = [profile for (comment, profile) in TEST_CASES.values()] + [{}]
+        (status, outcome) = self.request(connection, 'POST', '/evaluate', profiles)
+        self.assertEqual(status, 200)
+        self.assertEqual([item.get('results') for item in outcome['profiles']],
+                         [self.expected(profile) for profile in profiles[:-1]] + [None])
+        (status, stats) = self.request(connection, 'GET', '/stats')
+        self.assertEqual((stats['requests'], stats['profiles'], stats['failed'],
+                          stats['pooled']), (1, len(profiles), 1, 1))
+        self.assertIn('latency_p99_ms', stats)
+        connection.close()
+
+    def test_errors(self):
+        connection = UnixConnection(self.path)
+        self.assertEqual(self.request(connection, 'GET', '/evaluate')[0], 405)
+        self.assertEqual(self.request(connection, 'GET', '/nowhere')[0], 404)
+        self.assertEqual(self.request(connection, 'POST', '/evaluate', 'profile')[0], 400)
+        connection.request('POST', '/evaluate', '{')
+        self.assertEqual(connection.getresponse().status, 400)
+        connection.close()
+        connection = UnixConnection(self.path)
+        connection.request('POST', '/evaluate', '', {'Content-Length': '-1'})
+        self.assertEqual(connection.getresponse().status, 400)
+        connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
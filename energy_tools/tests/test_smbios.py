@@ -0,0 +1,80 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import struct
+import unittest
+from ..smbios import (END_OF_TABLE, MEMORY_DEVICE, PHYSICAL_MEMORY_ARRAY,
+                      SYSTEM_MEMORY, MemoryDevice, entry_point_length,
+                      memory_layout, parse)
+
+
+class TestSMBIOS(unittest.TestCase):
+    def _structure(self, kind, handle, data, strings=()):
+        body = struct.pack('<BBH', kind, 4 + len(data), handle) + data
+        if strings:
+            return body + b'\0'.join(s.encode() for s in strings) + b'\0\0'
+        return body + b'\0\0'
+
+    def _device(self, handle, array, size, locator, extended=0):
+        data = bytearray(0x1c)
+        struct.pack_into('<H', data, 0x00, array)
+        struct.pack_into('<H', data, 0x08, size)
+        data[0x0c] = 1
+        struct.pack_into('<I', data, 0x18, extended)
+        return self._structure(MEMORY_DEVICE, handle, bytes(data), [locator])
+
+    def setUp(self):
+        array = bytearray(0x0b)
+        array[0x01] = SYSTEM_MEMORY
+        struct.pack_into('<H', array, 0x09, 4)
+        flash = bytearray(0x0b)
+        flash[0x01] = 0x04
+        struct.pack_into('<H', flash, 0x09, 1)
+        self.table = self._structure(PHYSICAL_MEMORY_ARRAY, 0x10, bytes(array)) \
+            + self._structure(PHYSICAL_MEMORY_ARRAY, 0x20, bytes(flash)) \
+            + self._device(0x11, 0x10, 8192, 'DIMM A1') \
+            + self._device(0x12, 0x10, 0, 'DIMM A2') \
+            + self._device(0x13, 0x10, 0x7fff, 'DIMM B1', 65536) \
+            + self._device(0x14, 0x10, 0x8000 | 512, 'DIMM B2') \
+            + self._device(0x21, 0x20, 16, 'FLASH') \
+            + self._structure(END_OF_TABLE, 0xfeff, b'')
+
+    def test_parse(self):
+        structures = parse(self.table + b'garbage after the end')
+        self.assertEqual([structure.type for structure in structures],
+                         [16, 16, 17, 17, 17, 17, 17, 127])
+        self.assertEqual(structures[2].strings, ['DIMM A1'])
+
+    def test_memory_layout(self):
+        layout = memory_layout(parse(self.table))
+        self.assertEqual(layout.total_slots, 4)
+        self.assertEqual(layout.used_slots, 3)
+        self.assertEqual(layout.sizes, [8192, 65536, 0.5])
+        self.assertEqual(layout.devices[1], MemoryDevice('DIMM A2', 0))
+
+    def test_entry_point(self):
+        entry = bytearray(0x18)
+        entry[0:4] = b'_SM3'
+        entry[4] = ord('_')
+        struct.pack_into('<I', entry, 0x0c, 1234)
+        self.assertEqual(entry_point_length(bytes(entry)), 1234)
+        self.assertIsNone(entry_point_length(b'garbage'))
+
+
+if __name__ == '__main__':
+    unittest.main()
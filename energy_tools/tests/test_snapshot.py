@@ -0,0 +1,64 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import pickle
+import unittest
+from unittest import mock
+from ..schema import ProfileError
+from ..snapshot import SystemSnapshot
+from ..sysinfo import SysInfo
+
+
+class TestSystemSnapshot(unittest.TestCase):
+    def setUp(self):
+        from ..core import TEST_CASES
+        self.cases = TEST_CASES
+
+    def test_from_profile(self):
+        for (comment, profile) in self.cases.values():
+            snapshot = SystemSnapshot.from_profile(copy.deepcopy(profile))
+            self.assertEqual(snapshot.product_type, profile['Product Type'])
+            self.assertEqual(snapshot.off, profile['Off Mode'])
+            with self.assertRaises(AttributeError):
+                snapshot.off = 0
+            self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+            self.assertEqual(copy.deepcopy(snapshot), snapshot)
+
+    def test_saved_profile(self):
+        profile = copy.deepcopy(self.cases[1][1])
+        profile['Computer Type'] = 1
+        saved = copy.deepcopy(profile)
+        with mock.patch('energy_tools.sysinfo.Probe') as probe:
+            with self.assertRaises(ProfileError) as context:
+                SystemSnapshot.from_profile(profile)
+            self.assertEqual(probe.return_value.method_calls, [])
+        self.assertEqual(context.exception.problems,
+                         ["'1~10 Gigabit Ethernet' is not in the profile."])
+        self.assertEqual(profile, saved)
+
+    def test_same_results(self):
+        from ..core import evaluate
+        for (comment, profile) in self.cases.values():
+            sysinfo = SysInfo(copy.deepcopy(profile), interactive=False)
+            snapshot = SystemSnapshot.from_sysinfo(sysinfo)
+            self.assertEqual(evaluate(snapshot), evaluate(sysinfo))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import unittest
+from ..core import evaluate
+from ..solver import MODES, WOL_MODES, format_budgets, solve, weights
+
+
+class TestSolver(unittest.TestCase):
+    def setUp(self):
+        from ..core import TEST_CASES
+        from ..snapshot import SystemSnapshot
+        self.snapshots = [SystemSnapshot.from_profile(copy.deepcopy(profile))
+                          for (comment, profile) in TEST_CASES.values()]
+        (comment, profile) = TEST_CASES[1]
+        self.snapshots.append(SystemSnapshot.from_profile(dict(
+            copy.deepcopy(profile), **{'Wake-on-LAN': True,
+                                       'Off Mode with WOL': 1.2,
+                                       'Sleep Mode with WOL': 1.9})))
+
+    def test_boundary(self):
+        from ..incremental import IncrementalEvaluator
+        for snapshot in self.snapshots:
+            results = evaluate(snapshot)
+            budgets = solve(snapshot, results)
+            self.assertTrue(budgets)
+            for budget in budgets:
+                # update() keeps the WOL powers of computers without
+                # Wake-on-LAN equal to the others as SysInfo does.
+                changed = IncrementalEvaluator(snapshot).update(
+                    **{MODES[budget.mode]: budget.budget})
+                key = tuple(budget)[:7]
+                for result in changed:
+                    if tuple(result)[:7] == key:
+                        self.assertAlmostEqual(result.value, result.maximum)
+                        break
+                else:
+                    self.fail("%s disappeared" % (key,))
+
+    def test_wol(self):
+        for snapshot in self.snapshots:
+            modes = set(budget.mode for budget in solve(snapshot))
+            if snapshot.product_type == 1 and not snapshot.wol:
+                self.assertFalse(modes & set(WOL_MODES))
+            elif snapshot.product_type == 1:
+                self.assertEqual(modes & set(WOL_MODES), set(WOL_MODES))
+
+    def test_weights(self):
+        for snapshot in self.snapshots:
+            for result in evaluate(snapshot):
+                total = sum(getattr(snapshot, MODES[mode]) * weight
+                            for (mode, weight) in
+                            weights(snapshot, result).items())
+                self.assertAlmostEqual(total, result.value)
+
+    def test_format(self):
+        text = format_budgets(solve(self.snapshots[0]))
+        self.assertIn("P_SHORT_IDLE <= ", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
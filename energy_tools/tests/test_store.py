@@ -0,0 +1,146 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import copy
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from .. import batch
+from ..core import TEST_CASES, evaluate
+from ..snapshot import SystemSnapshot
+from ..store import ResultStore, parse_predicate, query
+
+
+class TestStore(unittest.TestCase):
+    format = 'csv'
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'store')
+        self.results = {}
+        for (number, (comment, profile)) in TEST_CASES.items():
+            self.results[number] = evaluate(SystemSnapshot.from_profile(copy.deepcopy(profile)))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, bios='1.0'):
+        with ResultStore(self.path, self.format) as store:
+            for (number, (comment, profile)) in TEST_CASES.items():
+                store.add('%d.profile' % number, 'Unit %d' % (number % 2), bios,
+                          profile, self.results[number])
+        return store
+
+    def test_roundtrip(self):
+        store = self.write()
+        rows = query(self.path)
+        self.assertEqual(len(rows), sum(len(results) for results in self.results.values()))
+        self.assertEqual(store.rows, len(rows))
+        row = [row for row in rows if row['profile'] == '6.profile'][0]
+        result = self.results[6][0]
+        self.assertEqual((row['product'], row['bios']), ('Unit 0', '1.0'))
+        self.assertEqual((row['standard'], row['value'], row['maximum'], row['verdict']),
+                         (result.standard, result.value, result.maximum, result.verdict))
+        profile = TEST_CASES[6][1]
+        self.assertIs(row['TV Tuner'], profile['TV Tuner'])
+        self.assertEqual(row['Computer Type'], profile['Computer Type'])
+        self.assertIsInstance(row['Computer Type'], int)
+        self.assertIsInstance(row['Memory Size'], float)
+        self.assertIsNone(row['Maximum Power'])
+
+    def test_predicates(self):
+        self.write()
+        predicates = [parse_predicate(spec) for spec in
+                      ('Computer Type == 3', 'standard == "Energy Star 6.0"',
+                       'verdict == FAIL', 'margin >= -5')]
+        rows = query(self.path, predicates, ['profile', 'margin'])
+        expected = [('%d.profile' % number, result.margin)
+                    for (number, results) in self.results.items()
+                    if TEST_CASES[number][1].get('Computer Type') == 3
+                    for result in results
+                    if result.standard == 'Energy Star 6.0' and result.verdict == 'FAIL'
+                    and result.margin >= -5]
+        self.assertTrue(expected)
+        self.assertEqual(sorted((row['profile'], row['margin']) for row in rows),
+                         sorted(expected))
+
+    def test_partitions(self):
+        self.write('1.0')
+        self.write('1.1')
+        rows = query(self.path, [('product', '==', 'Unit 1'), ('bios', '>', '1.0')],
+                     ['product', 'bios', 'profile'])
+        self.assertEqual(sorted(set(row['profile'] for row in rows)),
+                         ['1.profile', '3.profile', '5.profile'])
+        self.assertEqual(set((row['product'], row['bios']) for row in rows),
+                         {('Unit 1', '1.1')})
+        self.assertEqual(len(query(self.path, [('product', '==', 'Unit 2')])), 0)
+
+    def test_append(self):
+        self.write()
+        self.write()
+        parts = [name for (directory, dirs, files) in os.walk(self.path)
+                 for name in files]
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(len(query(self.path)),
+                         2 * sum(len(results) for results in self.results.values()))
+
+    def test_part_rows(self):
+        total = sum(len(results) for results in self.results.values())
+        store = ResultStore(self.path, self.format, part_rows=2 * len(self.results[1]))
+        for (number, (comment, profile)) in TEST_CASES.items():
+            store.add('%d.profile' % number, 'Unit', '1.0', profile, self.results[number])
+            self.assertLess(store.pending, store.part_rows)
+        self.assertGreater(store.rows, 0)
+        store.close()
+        parts = [name for (directory, dirs, files) in os.walk(self.path)
+                 for name in files]
+        self.assertGreater(len(parts), 1)
+        self.assertEqual((store.rows, len(query(self.path))), (total, total))
+
+    def test_parse(self):
+        self.assertEqual(parse_predicate('Computer Type==3'), ('Computer Type', '==', 3))
+        self.assertEqual(parse_predicate("bios != '1.0'"), ('bios', '!=', '1.0'))
+        self.assertEqual(parse_predicate('Wake-on-LAN == true'), ('Wake-on-LAN', '==', True))
+        for spec in ('margin', 'nothing == 1', 'margin < much'):
+            with self.assertRaises(ValueError):
+                parse_predicate(spec)
+
+    def test_batch(self):
+        for (number, (comment, profile)) in TEST_CASES.items():
+            profile = dict(profile, **{'Product name': 'Unit', 'BIOS version': str(number)})
+            with open(os.path.join(self.root, '%d.profile' % number), 'w') as data:
+                json.dump(profile, data)
+        args = argparse.Namespace(paths=[self.root], output=os.path.join(self.root, 'out.csv'),
+                                  jobs=1, no_cache=True, store=self.path,
+                                  store_format=self.format)
+        self.assertEqual(batch.process(args), 0)
+        rows = query(self.path, [('bios', '==', '6')])
+        self.assertEqual(len(rows), len(self.results[6]))
+
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+class TestParquetStore(TestStore):
+    format = 'parquet'
+
+
+if __name__ == '__main__':
+    unittest.main()
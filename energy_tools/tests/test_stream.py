@@ -0,0 +1,131 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from ..core import TEST_CASES, evaluate
+from ..snapshot import SystemSnapshot
+from .. import stream
+
+
+def _profile():
+    profile = copy.deepcopy(TEST_CASES[6][1])
+    profile['Wake-on-LAN'] = False
+    del profile['Short Idle Mode']
+    del profile['Long Idle Mode']
+    return profile
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_rolling(self):
+        rng = random.Random(1)
+        values = [rng.uniform(0, 100) for i in range(1000)]
+        everything = stream.Rolling()
+        last = stream.Rolling(64)
+        for (i, value) in enumerate(values):
+            everything.add(value)
+            last.add(value)
+            window = values[max(0, i - 63):i + 1]
+            self.assertAlmostEqual(last.average, sum(window) / len(window))
+        self.assertAlmostEqual(everything.average, sum(values) / len(values))
+        self.assertEqual(last.count, len(values))
+        self.assertIsNone(stream.Rolling(8).average)
+
+    def test_verdicts(self):
+        samples = stream.Stream(_profile())
+        self.assertIsNone(samples.add('Short Idle Mode', 9.0))
+        summaries = None
+        for power in (7.0, 7.5, 6.5):
+            summaries = samples.add('Long Idle Mode', power)
+        profile = dict(_profile(), **{'Short Idle Mode': 9.0, 'Long Idle Mode': 7.0})
+        results = evaluate(SystemSnapshot.from_profile(profile))
+        self.assertEqual(summaries, stream.summarize(results))
+        self.assertEqual([summary.standard for summary in summaries],
+                         ['Energy Star 7.0', 'Energy Star 8.0', 'ErP Lot 3'])
+        self.assertEqual(samples.stable, 2)
+
+    def test_failing(self):
+        samples = stream.Stream(_profile())
+        samples.add('Long Idle Mode', 7.0)
+        summaries = samples.add('Short Idle Mode', 7.0)
+        self.assertEqual(summaries[2].failing, ())
+        summaries = samples.add('Off Mode', 1.0)
+        erp = dict((summary.standard, summary) for summary in summaries)['ErP Lot 3']
+        self.assertEqual(erp.failing, ('P_OFF', 'P_OFF_WOL'))
+        self.assertLess(erp.worst, 0)
+        self.assertEqual(samples.stable, 0)
+
+    def test_missing(self):
+        profile = _profile()
+        del profile['CPU Cores']
+        with self.assertRaises(ValueError):
+            stream.Stream(profile)
+
+    def test_samples(self):
+        lines = ['Time,Watts,Mode\n', '0,1.5,short_idle\n', '1,2.5,boot\n',
+                 '2,oops,short_idle\n', '3,3.5,long_idle\n', '4,4.5,\n']
+        with self.assertLogs(level='WARNING'):
+            samples = list(stream.read_samples(lines, mode='Off Mode'))
+        self.assertEqual(samples, [('0', 'Short Idle Mode', 1.5),
+                                   ('1', 'Off Mode', 2.5),
+                                   ('3', 'Long Idle Mode', 3.5),
+                                   ('4', 'Off Mode', 4.5)])
+        self.assertEqual(list(stream.read_samples(['0,1.0\n', '1,2.0\n'])), [])
+        self.assertEqual(list(stream.read_samples(['0,1.0\n'], mode='Sleep Mode')),
+                         [('0', 'Sleep Mode', 1.0)])
+
+    def test_process(self):
+        filename = os.path.join(self.root, 'unit.profile')
+        with open(filename, 'w') as data:
+            json.dump(_profile(), data)
+        log = os.path.join(self.root, 'feed.csv')
+        with open(log, 'w') as data:
+            for i in range(500):
+                data.write('%d,%s,%s\n' % (i, 9.0 if i % 2 else 7.0,
+                                           'short_idle' if i % 2 else 'long_idle'))
+        args = argparse.Namespace(profile=filename, source=log, follow=False,
+                                  marker=None, mode=None, window=16, strict=False,
+                                  every=None, stable=100, time_column=None,
+                                  power_column=None, state_column=None)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(stream.process(args), 0)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('[1] 2 samples, Short Idle Mode 9.000 W: '))
+        self.assertTrue(lines[-1].startswith('Energy Star 7.0 PASS'))
+        args.source = os.path.join(self.root, 'missing.csv')
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(stream.process(args), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import csv
+import tempfile
+import unittest
+from ..snapshot import SystemSnapshot
+from ..sweep import HEADERS, _write_csv, grid, parse_axis, resolve, sweep
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        from ..core import TEST_CASES
+        self.profile = TEST_CASES[1][1]
+
+    def test_parse_axis(self):
+        self.assertEqual(parse_axis('Memory Size=4,8,16'),
+                         ('Memory Size', [4, 8, 16]))
+        self.assertEqual(parse_axis('Memory Size=4:16:4'),
+                         ('Memory Size', [4, 8, 12, 16]))
+        self.assertEqual(parse_axis('Short Idle Mode=1:2:0.5'),
+                         ('Short Idle Mode', [1.0, 1.5, 2.0]))
+        self.assertEqual(parse_axis('TV Tuner=true,false'),
+                         ('TV Tuner', [True, False]))
+        with self.assertRaises(ValueError):
+            parse_axis('Memory Size')
+        for spec in ('Memory Size=8,abc', 'TV Tuner=true,2', 'SSD=1:2:0.5'):
+            with self.assertRaises(ValueError):
+                parse_axis(spec)
+
+    def test_grid(self):
+        axes = [('Memory Size', [4, 8]), ('SSD', [1, 2, 3])]
+        points = grid(self.profile, axes)
+        self.assertEqual(next(points)['SSD'], 1)
+        self.assertEqual(len(list(points)), 5)
+
+    def test_sweep(self):
+        from ..core import estar7_results, estar8_results
+        axes = [('Memory Size', [4, 8, 16]),
+                ('Short Idle Mode', [5.0, 10.0])]
+        base = resolve(self.profile, axes)
+        batches = list(sweep(base, axes, batch_size=4))
+        self.assertEqual([len(columns[0]) for (axis, columns) in batches],
+                         [4, 2])
+        headers = dict((name, i) for (i, name) in enumerate(HEADERS))
+        points = list(grid(base, axes))
+        rows = [row for (axis, columns) in batches for row in zip(*columns)]
+        for (profile, row) in zip(points, rows):
+            snapshot = SystemSnapshot.from_profile(dict(profile))
+            estar7 = estar7_results(snapshot)[0]
+            self.assertEqual(row[headers['estar70_e_tec']], estar7.value)
+            self.assertEqual(row[headers['estar70_e_tec_max_none_g1']],
+                             estar7.maximum)
+            estar8 = estar8_results(snapshot)
+            self.assertEqual(row[headers['estar80_e_tec_max_none_proxy']],
+                             estar8[1].maximum)
+
+    def test_csv(self):
+        axes = [('Memory Size', [4, 8])]
+        with tempfile.TemporaryFile('w+', newline='') as output:
+            count = _write_csv(output, ['Memory Size'],
+                               sweep(resolve(self.profile, axes), axes))
+            output.seek(0)
+            rows = list(csv.reader(output))
+        self.assertEqual(count, 2)
+        self.assertEqual(rows[0][:2], ['Memory Size', 'estar70_e_tec'])
+        self.assertEqual(len(rows), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
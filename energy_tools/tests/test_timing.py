@@ -0,0 +1,82 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import io
+import json
+import unittest
+from .. import core, timing
+from ..snapshot import SystemSnapshot
+from ..timing import Timings, load_hook
+
+
+class TestTiming(unittest.TestCase):
+    def setUp(self):
+        self.saved = (timing.TIMINGS.enabled, timing.TIMINGS.hook)
+        timing.TIMINGS.reset()
+
+    def tearDown(self):
+        (timing.TIMINGS.enabled, timing.TIMINGS.hook) = self.saved
+        timing.TIMINGS.reset()
+
+    def test_disabled(self):
+        timing.TIMINGS.enabled = False
+        core.evaluate(SystemSnapshot.from_profile(dict(core.TEST_CASES[1][1])))
+        self.assertEqual(timing.TIMINGS.as_dict(), {})
+
+    def test_sections(self):
+        timing.TIMINGS.enable()
+        for number in (1, 3, 4, 5):
+            core.evaluate(SystemSnapshot.from_profile(dict(core.TEST_CASES[number][1])))
+        sections = timing.TIMINGS.as_dict()
+        for name in ('calculator.estar52', 'calculator.estar80', 'calculator.erplot3',
+                     'calculator.workstation', 'calculator.small_scale_server',
+                     'calculator.thin_client'):
+            self.assertEqual(sections[name]['count'], 1, name)
+        self.assertNotIn('probe.prefetch', sections)
+        report = timing.TIMINGS.report()
+        self.assertIn('calculator.estar70', report)
+        self.assertIn('wall time', report)
+        output = io.StringIO()
+        timing.TIMINGS.dump(output)
+        self.assertEqual(json.loads(output.getvalue())['sections'], sections)
+
+    def test_merge(self):
+        timings = Timings()
+        timings.add('probe.edid', 0.5)
+        timings.merge({'probe.edid': {'count': 2, 'total': 1.0, 'max': 0.75}})
+        self.assertEqual(timings.as_dict()['probe.edid'],
+                         {'count': 3, 'total': 1.5, 'max': 0.75})
+
+    def test_hook(self):
+        entered = []
+
+        @contextlib.contextmanager
+        def hook(name):
+            entered.append(name)
+            yield
+        timing.TIMINGS.enable(hook)
+        core.estar8_results(SystemSnapshot.from_profile(dict(core.TEST_CASES[1][1])))
+        self.assertIn('calculator.estar80', entered)
+        self.assertIs(load_hook('contextlib:nullcontext'), contextlib.nullcontext)
+        with self.assertRaises(ValueError):
+            load_hook('contextlib')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8; indent-tabs-mode: nil; tab-width: 4; c-basic-offset: 4;-*-
+#
+# Copyright (C) 2020 Canonical Ltd.
+# Author: Shih-Yuan Lee (FourDollars) <sylee@canonical.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Timers and counters of the probes, the calculators and the writers
+
+The timed sections are named 'probe.*', 'calculator.*' and 'output.*'.
+Timing is off by default and a timed call then only costs one more function
+call.  enable() turns it on and report() or dump() give the breakdown.  The
+probes which are prefetched run concurrently, so their total may be more
+than the wall time.
+
+The ENERGY_TOOLS_TIMING_HOOK environment variable names a 'module:callable'
+which is called with the name of every timed section and returns a context
+manager entered around it, e.g. a cProfile.Profile only for 'probe.*', so a
+profiler can be attached without editing the code.  Setting it turns the
+timing on."""
+
+import contextlib
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from logging import warning
+
+__all__ = [
+        "HOOK_VARIABLE",
+        "Timings",
+        "TIMINGS",
+        "timed",
+        "section",
+        "enable",
+        "enabled",
+        "finish"]
+
+HOOK_VARIABLE = 'ENERGY_TOOLS_TIMING_HOOK'
+
+_NULL = contextlib.nullcontext()
+
+
+def load_hook(spec):
+    """The callable of 'module:callable'"""
+    (module, sep, name) = spec.partition(':')
+    if not sep:
+        raise ValueError("%s is not 'module:callable'." % spec)
+    return getattr(importlib.import_module(module), name)
+
+
+class Timings:
+    """Count, total and maximum seconds of every timed section"""
+    def __init__(self):
+        self.enabled = False
+        self.hook = None
+        self.started = time.perf_counter()
+        self.sections = {}
+        self.lock = threading.Lock()
+
+    def enable(self, hook=None):
+        if not self.enabled:
+            self.started = time.perf_counter()
+        self.enabled = True
+        if hook is not None:
+            self.hook = hook
+
+    def reset(self):
+        with self.lock:
+            self.sections = {}
+        self.started = time.perf_counter()
+
+    def add(self, name, elapsed, count=1, maximum=None):
+        with self.lock:
+            entry = self.sections.get(name)
+            if entry is None:
+                entry = self.sections[name] = [0, 0.0, 0.0]
+            entry[0] = entry[0] + count
+            entry[1] = entry[1] + elapsed
+            entry[2] = max(entry[2], elapsed if maximum is None else maximum)
+
+    def merge(self, sections):
+        """Add the sections of as_dict(), e.g. of a worker process"""
+        for (name, entry) in sections.items():
+            self.add(name, entry['total'], entry['count'], entry['max'])
+
+    @contextlib.contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            if self.hook is None:
+                yield
+            else:
+                with self.hook(name):
+                    yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def section(self, name):
+        """Context manager timing the name"""
+        if not self.enabled:
+            return _NULL
+        return self._timer(name)
+
+    def as_dict(self):
+        with self.lock:
+            return dict((name, {'count': count, 'total': total, 'max': maximum})
+                        for (name, (count, total, maximum)) in self.sections.items())
+
+    def report(self):
+        """Text table of the sections, the slowest first"""
+        lines = ["%-36s %8s %12s %12s %12s" % ('Section', 'Count', 'Total (ms)',
+                                               'Mean (us)', 'Max (ms)')]
+        for (name, entry) in sorted(self.as_dict().items(),
+                                    key=lambda item: -item[1]['total']):
+            lines.append("%-36s %8d %12.3f %12.1f %12.3f"
+                         % (name, entry['count'], entry['total'] * 1000,
+                            entry['total'] * 1e6 / entry['count'], entry['max'] * 1000))
+        lines.append("%-36s %8s %12.3f" % ('wall time', '',
+                                            (time.perf_counter() - self.started) * 1000))
+        return "\n".join(lines)
+
+    def dump(self, output):
+        json.dump({'wall': time.perf_counter() - self.started,
+                   'sections': self.as_dict()}, output, indent=4, sort_keys=True)
+        output.write('\n')
+
+
+TIMINGS = Timings()
+
+
+def section(name):
+    """Context manager timing the name in TIMINGS"""
+    return TIMINGS.section(name)
+
+
+def timed(name):
+    """Decorator timing every call of the function as the name"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TIMINGS.enabled:
+                return function(*args, **kwargs)
+            with TIMINGS._timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable():
+    """Turn the timing on, with the hook of ENERGY_TOOLS_TIMING_HOOK if set"""
+    hook = None
+    spec = os.environ.get(HOOK_VARIABLE)
+    if spec:
+        try:
+            hook = load_hook(spec)
+        except (ImportError, AttributeError, ValueError) as err:
+            warning("%s=%s can not be loaded: %s" % (HOOK_VARIABLE, spec, err))
+    TIMINGS.enable(hook)
+
+
+def enabled():
+    return TIMINGS.enabled
+
+
+def finish(destination):
+    """Print the breakdown to stderr if destination is '-' or dump it as JSON"""
+    if not destination:
+        return
+    if destination == '-':
+        sys.stderr.write(TIMINGS.report() + '\n')
+        return
+    with open(destination, 'w') as output:
+        TIMINGS.dump(output)
+
+
+if os.environ.get(HOOK_VARIABLE):
+    enable()
@@ -36,5 +36,9 @@ ErP Lot 3 (Jan. 2016) or Lot 26 Tier 3 (Jan. 2019).''',
       author_email='sylee@canonical.com',
       url='https://github.com/fourdollars/energy-tools',
       packages=['energy_tools'],
-      scripts=['bin/energy-tools'],
+      scripts=['bin/energy-tools', 'bin/energy-tools-batch',
+               'bin/energy-tools-budget', 'bin/energy-tools-sweep',
+               'bin/energy-tools-meter', 'bin/energy-tools-service',
+               'bin/energy-tools-stream', 'bin/energy-tools-store',
+               'bin/energy-tools-diff'],
       )